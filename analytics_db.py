@@ -1,8 +1,15 @@
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import clip_actions
+import clip_rollups
+from clip_events import publish_clip_change
+from clip_fields import parse_float, typed_values
+import schema_migrations
 
 PROJECT_ROOT = Path(__file__).resolve().parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -10,86 +17,27 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 DB_PATH = DATA_DIR / "analytics.sqlite"
 
-CREATE_STATEMENTS = [
-    """
-    CREATE TABLE IF NOT EXISTS clips (
-        id TEXT PRIMARY KEY,
-        filename TEXT NOT NULL,
-        path TEXT NOT NULL,
-        game_id INTEGER,
-        canonical_game_id TEXT,
-        canonical_clip_id TEXT,
-        opponent TEXT,
-        opponent_slug TEXT,
-        location TEXT,
-        game_score TEXT,
-        quarter INTEGER,
-        possession INTEGER,
-        situation TEXT,
-        formation TEXT,
-        play_name TEXT,
-        scout_coverage TEXT,
-        play_trigger TEXT,
-        action_types TEXT,
-        action_sequence TEXT,
-        coverage TEXT,
-        ball_screen TEXT,
-        off_ball_screen TEXT,
-        help_rotation TEXT,
-        disruption TEXT,
-        breakdown TEXT,
-        result TEXT,
-        paint_touch TEXT,
-        shooter TEXT,
-        shot_location TEXT,
-        contest TEXT,
-        rebound TEXT,
-        points INTEGER,
-        has_shot TEXT,
-        shot_x TEXT,
-        shot_y TEXT,
-        shot_result TEXT,
-        player_designation TEXT,
-        notes TEXT,
-        start_time TEXT,
-        end_time TEXT,
-        actions_json TEXT,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_clips_game ON clips (game_id)",
-    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_game ON clips (canonical_game_id)",
-    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_clip ON clips (canonical_clip_id)",
-    """
-    CREATE TABLE IF NOT EXISTS comm_segments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        clip_id TEXT NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
-        start REAL NOT NULL,
-        "end" REAL NOT NULL,
-        duration REAL NOT NULL,
-        peak_dbfs REAL,
-        rms REAL,
-        rms_dbfs REAL,
-        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_comm_clip ON comm_segments (clip_id)",
-    "CREATE INDEX IF NOT EXISTS idx_comm_start ON comm_segments (clip_id, start)",
-]
+SHOT_COLUMNS = ("has_shot", "shot_x", "shot_y", "shot_result", "shooter")
 
 
 def _dict_factory(cursor: sqlite3.Cursor, row: sqlite3.Row) -> Dict[str, Any]:
     return {col[0]: row[idx] for idx, col in enumerate(cursor.description)}
 
 
-def get_connection() -> sqlite3.Connection:
+def _connect() -> sqlite3.Connection:
     conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
     conn.row_factory = _dict_factory
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
 
+def get_connection() -> sqlite3.Connection:
+    # Servers call init_db() at start-up; scripts get the schema check on first use
+    if _schema_checked is not DB_PATH:
+        init_db()
+    return _connect()
+
+
 @contextmanager
 def db_cursor():
     conn = get_connection()
@@ -100,23 +48,31 @@ def db_cursor():
         conn.close()
 
 
+_schema_checked: Optional[Path] = None  # DB_PATH the check ran against (benchmarks repoint it)
+_schema_lock = threading.Lock()
+
+
 def init_db() -> None:
+    """Apply pending light migrations; only a version check when the schema is current"""
+    global _schema_checked
+    with _schema_lock:
+        if _schema_checked is DB_PATH:
+            return
+        conn = _connect()
+        try:
+            cur = conn.cursor()
+            if not schema_migrations.is_current(cur, schema_migrations.SQLITE):
+                schema_migrations.migrate(cur, schema_migrations.SQLITE)
+            conn.commit()
+        finally:
+            conn.close()
+        _schema_checked = DB_PATH
+
+
+def run_heavy_migrations() -> List[int]:
+    """Backfills and index builds deferred from init_db; safe to run repeatedly"""
     with db_cursor() as cur:
-        for stmt in CREATE_STATEMENTS:
-            cur.execute(stmt)
-
-        # Migration: Add player_designation column if it doesn't exist
-        cur.execute("PRAGMA table_info(clips)")
-        columns = [col['name'] for col in cur.fetchall()]
-        if 'player_designation' not in columns:
-            cur.execute("ALTER TABLE clips ADD COLUMN player_designation TEXT")
-        if 'play_trigger' not in columns:
-            if 'action_trigger' in columns:
-                cur.execute("ALTER TABLE clips RENAME COLUMN action_trigger TO play_trigger")
-            else:
-                cur.execute("ALTER TABLE clips ADD COLUMN play_trigger TEXT")
-        if 'actions_json' not in columns:
-            cur.execute("ALTER TABLE clips ADD COLUMN actions_json TEXT")
+        return schema_migrations.migrate(cur, schema_migrations.SQLITE, include_heavy=True)
 
 
 def upsert_clip(clip: Dict[str, Any]) -> None:
@@ -127,6 +83,7 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
     now = datetime.utcnow().isoformat()
     normalized.setdefault("created_at", now)
     normalized["updated_at"] = now
+    normalized.update(typed_values(normalized))
 
     # Debug: log what we're about to save
     with open('/tmp/upsert_debug.log', 'a') as f:
@@ -177,6 +134,11 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
         "game_score",
         "player_designation",
         "actions_json",
+        "hls_url",
+        "start_seconds",
+        "end_seconds",
+        "shot_x_num",
+        "shot_y_num",
     ]
 
     placeholders = ", ".join("?" for _ in columns)
@@ -211,7 +173,34 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
             for i, (col, val) in enumerate(zip(columns, values)):
                 f.write(f"{i}: {col} = {repr(val)}\n")
 
+        cur.execute("SELECT game_id FROM clips WHERE id = ?", (normalized.get("id"),))
+        previous = cur.fetchone()
         cur.execute(sql, values)
+        cur.execute("SELECT game_id FROM clips WHERE id = ?", (normalized.get("id"),))
+        games = [cur.fetchone()["game_id"]] + ([previous["game_id"]] if previous else [])
+        clip_rollups.refresh_games(cur, clip_rollups.SQLITE, games)
+        clip_actions.sync(cur, clip_actions.SQLITE, normalized.get("id"), normalized.get("actions_json"))
+
+    publish_clip_change("upsert", [normalized.get("id")])
+
+
+def update_shot(clip_id: str, fields: Dict[str, Any]) -> int:
+    """Set the given shot columns (SHOT_COLUMNS) and refresh the clip's game rollups"""
+    values = {col: fields[col] for col in SHOT_COLUMNS if col in fields}
+    for col in ("shot_x", "shot_y"):
+        if col in values:
+            values[f"{col}_num"] = parse_float(values[col])
+    values["updated_at"] = datetime.utcnow().isoformat()
+    assignments = ", ".join(f"{col} = ?" for col in values)
+    with db_cursor() as cur:
+        cur.execute(f"UPDATE clips SET {assignments} WHERE id = ?", [*values.values(), clip_id])
+        updated = cur.rowcount or 0
+        if updated:
+            cur.execute("SELECT game_id FROM clips WHERE id = ?", (clip_id,))
+            clip_rollups.refresh_games(cur, clip_rollups.SQLITE, [cur.fetchone()["game_id"]])
+    if updated:
+        publish_clip_change("upsert", [clip_id])
+    return updated
 
 
 def upsert_comm_segments(clip_id: str, segments: Iterable[Dict[str, Any]]) -> None:
@@ -250,6 +239,131 @@ def fetch_clip(clip_id: str) -> Optional[Dict[str, Any]]:
         return cur.fetchone()
 
 
+# Columns that callers may filter exports/listings on (whitelisted so they can be interpolated safely)
+FILTER_COLUMNS = (
+    "game_id",
+    "canonical_game_id",
+    "opponent",
+    "quarter",
+    "situation",
+    "coverage",
+    "ball_screen",
+    "result",
+    "has_shot",
+    "player_designation",
+)
+
+
+def _filter_clause(filters: Optional[Dict[str, Any]]) -> tuple:
+    clauses = []
+    params: List[Any] = []
+    for col in FILTER_COLUMNS:
+        value = (filters or {}).get(col)
+        if value is None or value == "":
+            continue
+        clauses.append(f"{col} = ?")
+        params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def clips_query(filters: Optional[Dict[str, Any]] = None) -> tuple:
+    """The iter_clips SELECT and its params (filter columns are indexed by schema_migrations)"""
+    where, params = _filter_clause(filters)
+    return f"SELECT * FROM clips {where} ORDER BY game_id, quarter, possession, created_at", params
+
+
+def iter_clips(filters: Optional[Dict[str, Any]] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Stream clips matching `filters` without materialising the full result set.
+    Rows are pulled from the cursor `batch_size` at a time; the connection stays
+    open until the generator is exhausted or closed.
+    """
+    conn = get_connection()
+    try:
+        cur = conn.execute(*clips_query(filters))
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def shots_query(filters: Optional[Dict[str, Any]] = None) -> tuple:
+    """The fetch_shots SELECT and its params; filters on the idx_clips_shots predicate"""
+    where, params = _filter_clause(filters)
+    located = schema_migrations.LOCATED_SHOT
+    where = f"{where} AND {located}" if where else f"WHERE {located}"
+    return f"SELECT shot_x_num, shot_y_num, shot_result, points FROM clips {where}", params
+
+
+def fetch_shots(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Located shots (has_shot = 'Yes' with numeric court coordinates) for clips matching `filters`"""
+    with db_cursor() as cur:
+        cur.execute(*shots_query(filters))
+        return cur.fetchall()
+
+
+def clips_version() -> tuple:
+    """Cheap fingerprint of the clips table; changes whenever a clip is written or deleted"""
+    with db_cursor() as cur:
+        cur.execute("""
+            SELECT (SELECT COUNT(*) FROM clips) AS n,
+                   (SELECT value FROM clip_change_counter WHERE id = 1) AS seq
+        """)
+        row = cur.fetchone()
+        return (row["n"], row["seq"])
+
+
+def fetch_file_refs() -> List[Dict[str, Any]]:
+    """Every file a clip row points at (one query, for the Clips/ garbage collector)"""
+    with db_cursor() as cur:
+        cur.execute("SELECT id, filename, path, source_video FROM clips")
+        return cur.fetchall()
+
+
+def _change_seq(cursor: Optional[str]) -> Optional[int]:
+    """The change number in a delta-sync cursor; None for no cursor or an old timestamp one"""
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_changes(since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rows inserted/updated and ids deleted after the `since` cursor (a change number
+    from clip_change_counter). Without a usable cursor every clip is returned and
+    "full" is set, so the caller replaces its copy. The returned cursor goes back
+    in on the next call.
+    """
+    seq = _change_seq(since)
+    with db_cursor() as cur:
+        # Read the counter first: whatever commits after this is numbered above it
+        cur.execute("SELECT value FROM clip_change_counter WHERE id = 1")
+        latest = cur.fetchone()["value"]
+        if seq is not None and seq > latest:
+            seq = None  # cursor from another database (e.g. before a restore)
+        if seq is not None:
+            cur.execute("SELECT * FROM clips WHERE change_seq > ? ORDER BY change_seq", (seq,))
+            upserts = cur.fetchall()
+            cur.execute("SELECT clip_id FROM clip_tombstones WHERE change_seq > ? ORDER BY change_seq", (seq,))
+            deleted = [row["clip_id"] for row in cur.fetchall()]
+        else:
+            cur.execute("SELECT * FROM clips ORDER BY change_seq")
+            upserts = cur.fetchall()
+            deleted = []
+
+    return {
+        "cursor": str(latest),
+        "full": seq is None,
+        "upserts": upserts,
+        "deleted": deleted,
+    }
+
+
 def fetch_comm_segments(clip_id: str) -> List[Dict[str, Any]]:
     with db_cursor() as cur:
         cur.execute(
@@ -264,9 +378,16 @@ def fetch_comm_segments(clip_id: str) -> List[Dict[str, Any]]:
         return cur.fetchall()
 
 
-def remove_clip(clip_id: str) -> None:
+def remove_clip(clip_id: str) -> int:
     with db_cursor() as cur:
+        cur.execute("SELECT game_id FROM clips WHERE id = ?", (clip_id,))
+        games = [row["game_id"] for row in cur.fetchall()]
         cur.execute("DELETE FROM clips WHERE id = ?", (clip_id,))
+        deleted = cur.rowcount or 0
+        clip_rollups.refresh_games(cur, clip_rollups.SQLITE, games)
+    if deleted:
+        publish_clip_change("delete", [clip_id])
+    return deleted
 
 
 def remove_game(game_identifier: Any, canonical_game_id: Optional[str] = None) -> int:
@@ -284,19 +405,46 @@ def remove_game(game_identifier: Any, canonical_game_id: Optional[str] = None) -
         except (ValueError, TypeError):
             normalized_game_id = None
 
+    removed_ids: List[str] = []
+    games: List[Any] = []
     with db_cursor() as cur:
         if normalized_game_id is not None:
+            cur.execute("SELECT id, game_id FROM clips WHERE game_id = ?", (normalized_game_id,))
+            rows = cur.fetchall()
+            removed_ids += [row["id"] for row in rows]
+            games += [row["game_id"] for row in rows]
             cur.execute("DELETE FROM clips WHERE game_id = ?", (normalized_game_id,))
             deleted += cur.rowcount or 0
         if canonical_game_id:
+            cur.execute("SELECT id, game_id FROM clips WHERE canonical_game_id = ?", (canonical_game_id,))
+            rows = cur.fetchall()
+            removed_ids += [row["id"] for row in rows]
+            games += [row["game_id"] for row in rows]
             cur.execute("DELETE FROM clips WHERE canonical_game_id = ?", (canonical_game_id,))
             deleted += cur.rowcount or 0
+        clip_rollups.refresh_games(cur, clip_rollups.SQLITE, games)
+    publish_clip_change("delete", dict.fromkeys(removed_ids))
     return deleted
 
 
+def fetch_rollups(group_by: Iterable[str] = (), filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Defensive rollups (possessions, points, stops, breakdowns, ...) grouped by rollup dimensions"""
+    with db_cursor() as cur:
+        return clip_rollups.query(cur, clip_rollups.SQLITE, tuple(group_by), filters)
+
+
+def fetch_actions(filters: Optional[Dict[str, Any]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+    """Individual tagged actions with their clip context"""
+    with db_cursor() as cur:
+        return clip_actions.query(cur, clip_actions.SQLITE, filters, limit)
+
+
+def summarize_actions(group_by: Iterable[str] = ("type", "coverage"),
+                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    with db_cursor() as cur:
+        return clip_actions.summarize(cur, clip_actions.SQLITE, tuple(group_by), filters)
+
+
 def import_clips(records: Iterable[Dict[str, Any]]) -> None:
     for record in records:
         upsert_clip(record)
-
-
-init_db()
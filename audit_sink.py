@@ -0,0 +1,130 @@
+"""
+Buffered audit-log sink
+Requests hand audit entries to a bounded in-process queue and return at once;
+a background thread drains it and writes batches of up to BATCH_SIZE rows,
+at the latest FLUSH_MS after the first entry of a batch arrived. When the
+queue is full, callers wait up to ENQUEUE_TIMEOUT for room and the entry is
+dropped after that, so a stalled database cannot stall requests. Counters in
+metrics() show how often that happens. Pending entries are flushed at exit.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '200'))
+FLUSH_MS = int(os.getenv('AUDIT_FLUSH_MS', '250'))
+ENQUEUE_TIMEOUT = 0.05
+WRITE_RETRIES = 3
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class AuditSink:
+    def __init__(self, writer: Callable[[List[Dict[str, Any]]], None], queue_size: int = QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE, flush_ms: int = FLUSH_MS):
+        self._writer = writer
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._batch_size = batch_size
+        self._flush_seconds = flush_ms / 1000.0
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0, 'written': 0, 'batches': 0, 'dropped': 0, 'blocked': 0,
+            'write_errors': 0, 'max_depth': 0, 'last_batch_ms': 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+        self._thread.start()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def submit(self, entry: Dict[str, Any]) -> bool:
+        """Queue one entry; False if it was dropped because the queue stayed full"""
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self._count('blocked')
+            try:
+                self._queue.put(entry, timeout=ENQUEUE_TIMEOUT)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self._queue.qsize())
+        return True
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self._flush_seconds
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        for attempt in range(WRITE_RETRIES):
+            try:
+                self._writer(batch)
+                break
+            except Exception as e:
+                if attempt == WRITE_RETRIES - 1:
+                    self._count('write_errors')
+                    self._count('dropped', len(batch))
+                    print(f"⚠️  Audit log write failed, dropped {len(batch)} entries: {e}")
+                    return
+                time.sleep(0.1 * 2 ** attempt)
+        with self._stats_lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['last_batch_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued entry has been written (or dropped); False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['depth'] = self._queue.qsize()
+        stats['capacity'] = self._queue.maxsize
+        return stats
+
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_sink(writer: Callable[[List[Dict[str, Any]]], None]) -> AuditSink:
+    """Process-wide sink, created on first use and flushed at interpreter exit"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = AuditSink(writer)
+            atexit.register(_sink.flush, SHUTDOWN_TIMEOUT)
+        return _sink
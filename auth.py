@@ -3,9 +3,12 @@ Authentication system with JWT tokens and role-based access control
 """
 import jwt
 import bcrypt
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from functools import wraps
-from flask import request, jsonify
+from functools import lru_cache, wraps
+from flask import g, request, jsonify
 from cloud_config import JWT_SECRET_KEY, JWT_EXPIRATION_DAYS, USERS, is_cloud
 
 # Parse users from environment variable
@@ -26,11 +29,14 @@ def parse_users():
     return users
 
 
-USER_DB = parse_users()
-
-# Debug: Print loaded users (without password hashes)
-if is_cloud():
-    print(f"🔐 Loaded {len(USER_DB)} users: {list(USER_DB.keys())}")
+@lru_cache(maxsize=1)
+def user_db():
+    """USERS parsed on the first login rather than at import"""
+    users = parse_users()
+    # Debug: Print loaded users (without password hashes)
+    if is_cloud():
+        print(f"🔐 Loaded {len(users)} users: {list(users.keys())}")
+    return users
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -57,15 +63,64 @@ def create_jwt_token(username: str, role: str) -> str:
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm='HS256')
 
 
+# Verified token -> claims, so repeated requests (video range requests while
+# scrubbing) skip the HMAC check and JSON decode. Entries expire with the token,
+# and at most TOKEN_CACHE_TTL seconds after they were verified.
+TOKEN_CACHE_SIZE = 1024
+TOKEN_CACHE_TTL = 300
+
+
+class TokenCache:
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        expires_at = time.time() + self.ttl
+        if isinstance(claims.get('exp'), (int, float)):
+            expires_at = min(expires_at, claims['exp'])
+        with self._lock:
+            self._entries[token] = (claims, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
 def verify_jwt_token(token: str) -> dict:
-    """Verify and decode a JWT token"""
+    """Verify and decode a JWT token (cached until it expires)"""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    # Invalid tokens are not cached, so garbage can't evict real sessions
+    token_cache.put(token, payload)
+    return payload
 
 
 def get_user_from_token():
@@ -79,76 +134,68 @@ def get_user_from_token():
     return verify_jwt_token(token)
 
 
-def require_auth(f):
-    """Decorator to require authentication (any role)"""
+def current_user():
+    """The request's user, resolved once per request and shared by every decorator"""
+    if '_auth_user' not in g:
+        claims = get_user_from_token()
+        g._auth_user = dict(claims) if claims else None
+    return g._auth_user
+
+
+def _authorize(f, role_error=None, local_user=None):
+    """
+    Wrap `f` so cloud requests need a valid token; `role_error(user)` may return an
+    error message to reject an authenticated user with 403
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
         # In local mode, auth is optional (for your local development)
         if not is_cloud():
+            if local_user:
+                request.user = g.user = dict(local_user)
             return f(*args, **kwargs)
 
-        # In cloud mode, auth is required
-        user = get_user_from_token()
+        user = current_user()
 
         if not user:
             return jsonify({'error': 'Authentication required'}), 401
 
+        message = role_error(user) if role_error else None
+        if message:
+            return jsonify({'error': message}), 403
+
         # Add user info to request context
-        request.user = user
+        request.user = g.user = user
 
         return f(*args, **kwargs)
 
     return decorated
 
 
-def require_admin(f):
-    """Decorator to require admin role"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # In local mode, treat as admin
-        if not is_cloud():
-            request.user = {'username': 'local', 'role': 'admin'}
-            return f(*args, **kwargs)
-
-        # In cloud mode, check role
-        user = get_user_from_token()
-
-        if not user:
-            return jsonify({'error': 'Authentication required'}), 401
+LOCAL_USER = {'username': 'local', 'role': 'admin'}
 
-        if user.get('role') != 'admin':
-            return jsonify({'error': 'Admin access required'}), 403
 
-        request.user = user
+def require_auth(f):
+    """Decorator to require authentication (any role)"""
+    return _authorize(f)
 
-        return f(*args, **kwargs)
 
-    return decorated
+def require_admin(f):
+    """Decorator to require admin role"""
+    return _authorize(
+        f,
+        role_error=lambda user: None if user.get('role') == 'admin' else 'Admin access required',
+        local_user=LOCAL_USER,
+    )
 
 
 def require_write(f):
     """Decorator to require write access (admin or coach, but not guest)"""
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        # In local mode, allow writes
-        if not is_cloud():
-            request.user = {'username': 'local', 'role': 'admin'}
-            return f(*args, **kwargs)
-
-        # In cloud mode, check role
-        user = get_user_from_token()
-
-        if not user:
-            return jsonify({'error': 'Authentication required'}), 401
-
-        if user.get('role') == 'guest':
-            return jsonify({'error': 'Write access not allowed for guest users'}), 403
-
-        request.user = user
-
-        return f(*args, **kwargs)
-
-    return decorated
+    return _authorize(
+        f,
+        role_error=lambda user: 'Write access not allowed for guest users' if user.get('role') == 'guest' else None,
+        local_user=LOCAL_USER,
+    )
 
 
 def hash_password(plain_password: str) -> str:
@@ -160,11 +207,11 @@ def hash_password(plain_password: str) -> str:
 
 def authenticate_user(username: str, password: str) -> dict:
     """Authenticate a user and return user info if valid"""
-    user = USER_DB.get(username)
+    user = user_db().get(username)
 
     if not user:
         if is_cloud():
-            print(f"🔍 User '{username}' not found in database. Available users: {list(USER_DB.keys())}")
+            print(f"🔍 User '{username}' not found in database. Available users: {list(user_db().keys())}")
         return None
 
     if not verify_password(password, user['password_hash']):
@@ -1,55 +1,192 @@
 #!/usr/bin/env python3
 """
 Database Backup Utility
-Automatically backs up analytics.sqlite with timestamp
+Online backups of analytics.sqlite through SQLite's backup API: pages are copied
+in small steps with a pause between them, so the server keeps writing while a
+consistent snapshot is taken. Snapshots are compressed (zstd when the
+`zstandard` package is installed, gzip otherwise) and stored once per distinct
+content hash; each run just adds an index entry when nothing changed.
 Keeps last 30 days of backups
 """
 
+import gzip
+import hashlib
+import json
 import os
 import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
-DB_PATH = Path("data/analytics.sqlite")
-BACKUP_DIR = Path("data/backups")
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DB_PATH = PROJECT_ROOT / "data" / "analytics.sqlite"
+BACKUP_DIR = PROJECT_ROOT / "data" / "backups"
+OBJECTS_DIR = BACKUP_DIR / "objects"
+INDEX_PATH = BACKUP_DIR / "index.json"
 RETENTION_DAYS = 30
 
-def backup_database():
-    """Create timestamped backup of database"""
+# Backup API throttling: copy PAGES_PER_STEP pages, then yield for STEP_PAUSE seconds
+PAGES_PER_STEP = int(os.getenv('BACKUP_PAGES_PER_STEP', '256'))
+STEP_PAUSE = float(os.getenv('BACKUP_STEP_PAUSE', '0.005'))
+HASH_CHUNK = 1024 * 1024
+
+_index_lock = threading.Lock()
+
+
+def _codec() -> str:
+    return "zst" if ZSTD_AVAILABLE else "gz"
+
+
+def _compress(src: Path, dest: Path, codec: str) -> None:
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        if codec == "zst":
+            zstandard.ZstdCompressor(level=10, threads=-1).copy_stream(fin, fout)
+        else:
+            with gzip.GzipFile(fileobj=fout, mode='wb', compresslevel=6, mtime=0) as gz:
+                shutil.copyfileobj(fin, gz, HASH_CHUNK)
+
+
+def _decompress(src: Path, dest: Path) -> None:
+    with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+        if src.suffix == ".zst":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Backup is zstd-compressed; install zstandard to restore it")
+            zstandard.ZstdDecompressor().copy_stream(fin, fout)
+        elif src.suffix == ".gz":
+            with gzip.GzipFile(fileobj=fin, mode='rb') as gz:
+                shutil.copyfileobj(gz, fout, HASH_CHUNK)
+        else:
+            shutil.copyfileobj(fin, fout, HASH_CHUNK)
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_index() -> List[Dict[str, Any]]:
+    if INDEX_PATH.exists():
+        with open(INDEX_PATH, 'r') as f:
+            return json.load(f)
+    return []
+
+
+def _save_index(entries: List[Dict[str, Any]]) -> None:
+    tmp = INDEX_PATH.with_suffix('.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(entries, f, indent=2)
+    os.replace(tmp, INDEX_PATH)
+
+
+def snapshot(dest: Path, pages: int = PAGES_PER_STEP, pause: float = STEP_PAUSE) -> None:
+    """Consistent copy of the live DB; the source lock is released between page steps"""
+    src = sqlite3.connect(DB_PATH)
+    dst = sqlite3.connect(dest)
+    try:
+        with dst:
+            src.backup(dst, pages=pages, progress=lambda status, remaining, total: time.sleep(pause) if remaining else None)
+    finally:
+        dst.close()
+        src.close()
+
+
+def _unique_name(name: str, entries: List[Dict[str, Any]]) -> str:
+    """`name`, or `name-2`, `name-3`... if a backup in the same millisecond already has it"""
+    taken = {e["name"] for e in entries}
+    candidate, n = name, 1
+    while candidate in taken:
+        n += 1
+        candidate = f"{name}-{n}"
+    return candidate
+
+
+def backup_database(label: str = "backup") -> Optional[Dict[str, Any]]:
+    """Create a compressed, deduplicated snapshot; returns its index entry"""
     if not DB_PATH.exists():
         print(f"⚠️  Database not found: {DB_PATH}")
-        return False
+        return None
 
-    # Create backup directory if needed
-    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    OBJECTS_DIR.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    timestamp = f"{now:%Y-%m-%d_%H-%M-%S}-{now.microsecond // 1000:03d}"
+    try:
+        with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as tmpdir:
+            raw = Path(tmpdir) / "snapshot.sqlite"
+            started = time.perf_counter()
+            snapshot(raw)
+            sha = _sha256(raw)
+            size = raw.stat().st_size
 
-    # Generate timestamp filename
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    backup_name = f"analytics.backup.{timestamp}.sqlite"
-    backup_path = BACKUP_DIR / backup_name
+            with _index_lock:
+                existing = next(OBJECTS_DIR.glob(f"{sha}.sqlite.*"), None)
+                if existing is None:
+                    existing = OBJECTS_DIR / f"{sha}.sqlite.{_codec()}"
+                    part = existing.with_name(existing.name + ".part")
+                    _compress(raw, part, _codec())
+                    os.replace(part, existing)
+                    deduplicated = False
+                else:
+                    deduplicated = True
 
-    # Copy database
-    try:
-        shutil.copy2(DB_PATH, backup_path)
-        size_kb = backup_path.stat().st_size / 1024
-        print(f"✅ Backup created: {backup_name} ({size_kb:.1f} KB)")
-        return True
+                entries = load_index()
+                entry = {
+                    "name": _unique_name(f"analytics.{label}.{timestamp}", entries),
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "sha256": sha,
+                    "size": size,
+                    "object": existing.name,
+                    "compressed_size": existing.stat().st_size,
+                    "deduplicated": deduplicated,
+                }
+                entries.append(entry)
+                _save_index(entries)
+
+        elapsed = time.perf_counter() - started
+        note = "unchanged, reused existing snapshot" if deduplicated else \
+            f"{entry['compressed_size'] / 1024:.1f} KB compressed"
+        print(f"✅ Backup created: {entry['name']} ({size / 1024:.1f} KB, {note}, {elapsed:.2f}s)")
+        return entry
     except Exception as e:
         print(f"❌ Backup failed: {e}")
-        return False
+        return None
+
 
 def cleanup_old_backups():
-    """Remove backups older than RETENTION_DAYS"""
+    """Remove index entries older than RETENTION_DAYS and snapshots nothing refers to any more"""
     if not BACKUP_DIR.exists():
         return
 
     cutoff_date = datetime.now() - timedelta(days=RETENTION_DAYS)
     removed = 0
 
+    with _index_lock:
+        entries = load_index()
+        kept = [e for e in entries if datetime.fromisoformat(e["created"]) >= cutoff_date]
+        removed += len(entries) - len(kept)
+        if removed:
+            _save_index(kept)
+        live_objects = {e["object"] for e in kept}
+        if OBJECTS_DIR.exists():
+            for obj in OBJECTS_DIR.iterdir():
+                if obj.name not in live_objects and not obj.name.endswith(".part"):
+                    obj.unlink()
+
+    # Uncompressed copies written by earlier versions of this script
     for backup_file in BACKUP_DIR.glob("analytics.backup.*.sqlite"):
-        # Get file modification time
         mtime = datetime.fromtimestamp(backup_file.stat().st_mtime)
-
         if mtime < cutoff_date:
             try:
                 backup_file.unlink()
@@ -60,23 +197,25 @@ def cleanup_old_backups():
     if removed > 0:
         print(f"🧹 Removed {removed} old backup(s)")
 
+
 def list_backups():
     """List all available backups"""
     if not BACKUP_DIR.exists():
         print("No backups directory found")
         return
 
-    backups = sorted(BACKUP_DIR.glob("analytics.backup.*.sqlite"), reverse=True)
+    entries = sorted(load_index(), key=lambda e: e["created"], reverse=True)
+    legacy = sorted(BACKUP_DIR.glob("analytics.backup.*.sqlite"), reverse=True)
 
-    if not backups:
+    if not entries and not legacy:
         print("No backups found")
         return
 
-    print(f"\n📋 Available backups ({len(backups)} total):")
-    for backup in backups[:10]:  # Show most recent 10
-        size_kb = backup.stat().st_size / 1024
-        mtime = datetime.fromtimestamp(backup.stat().st_mtime)
-        age = datetime.now() - mtime
+    stored = sum((OBJECTS_DIR / name).stat().st_size for name in {e["object"] for e in entries}
+                 if (OBJECTS_DIR / name).exists())
+    print(f"\n📋 Available backups ({len(entries) + len(legacy)} total, {stored / 1024:.1f} KB stored):")
+    for entry in entries[:10]:  # Show most recent 10
+        age = datetime.now() - datetime.fromisoformat(entry["created"])
 
         if age.days > 0:
             age_str = f"{age.days}d ago"
@@ -85,30 +224,118 @@ def list_backups():
         else:
             age_str = f"{age.seconds // 60}m ago"
 
-        print(f"  • {backup.name} ({size_kb:.1f} KB, {age_str})")
+        print(f"  • {entry['name']} ({entry['size'] / 1024:.1f} KB, {age_str}, {entry['sha256'][:12]})")
+    for backup in legacy[:10]:
+        print(f"  • {backup.name} (legacy, {backup.stat().st_size / 1024:.1f} KB)")
 
-def restore_backup(backup_name):
-    """Restore database from backup"""
-    backup_path = BACKUP_DIR / backup_name
 
-    if not backup_path.exists():
+def _find_backup(backup_name: str):
+    """
+    (snapshot file, expected sha256 or None) for an index entry name, a sha256 prefix
+    or a legacy file name. Raises ValueError when a prefix matches different snapshots.
+    """
+    entries = load_index()
+    for entry in entries:
+        if entry["name"] == backup_name:
+            return OBJECTS_DIR / entry["object"], entry["sha256"]
+    matches = {e["sha256"]: e for e in entries if backup_name and e["sha256"].startswith(backup_name)}
+    if len(matches) > 1:
+        names = ", ".join(sorted(e["name"] for e in matches.values()))
+        raise ValueError(f"'{backup_name}' matches {len(matches)} different snapshots ({names}); "
+                         f"use a longer sha prefix or the backup name")
+    if matches:
+        entry = next(iter(matches.values()))
+        return OBJECTS_DIR / entry["object"], entry["sha256"]
+    legacy = BACKUP_DIR / backup_name
+    return (legacy, None) if legacy.exists() else (None, None)
+
+
+def verify_backup(backup_name: str, keep_path: Optional[Path] = None) -> bool:
+    """Decompress, check the content hash and run PRAGMA integrity_check"""
+    try:
+        source, expected = _find_backup(backup_name)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    if source is None or not source.exists():
         print(f"❌ Backup not found: {backup_name}")
         return False
 
-    # Create backup of current database first
-    if DB_PATH.exists():
-        emergency_backup = DB_PATH.parent / f"{DB_PATH.name}.before-restore"
-        shutil.copy2(DB_PATH, emergency_backup)
-        print(f"🛡️  Current database saved to: {emergency_backup.name}")
+    target = keep_path
+    if target is None:
+        fd, name = tempfile.mkstemp(suffix=".sqlite", dir=BACKUP_DIR)
+        os.close(fd)
+        target = Path(name)
+    try:
+        _decompress(source, target)
+        if expected and _sha256(target) != expected:
+            print(f"❌ Backup {backup_name} is corrupt: content hash mismatch")
+            return False
+        conn = sqlite3.connect(target)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+        finally:
+            conn.close()
+        if result != "ok":
+            print(f"❌ Backup {backup_name} failed integrity check: {result}")
+            return False
+        print(f"✅ Backup verified: {backup_name}")
+        return True
+    finally:
+        if keep_path is None and target.exists():
+            target.unlink()
+
+
+def restore_backup(backup_name):
+    """Verify a backup, snapshot the current DB, then copy the backup into the live DB"""
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    fd, restored = tempfile.mkstemp(suffix=".sqlite", dir=BACKUP_DIR)
+    os.close(fd)
+    restored = Path(restored)
 
-    # Restore
     try:
-        shutil.copy2(backup_path, DB_PATH)
+        if not verify_backup(backup_name, keep_path=restored):
+            return False
+
+        # Create backup of current database first
+        if DB_PATH.exists():
+            safety = backup_database(label="before-restore")
+            if safety is None:
+                print("❌ Restore aborted: could not back up the current database")
+                return False
+            print(f"🛡️  Current database saved as: {safety['name']}")
+
+        # Backup API in one step: open connections see the swap atomically instead of a half-copied file
+        src = sqlite3.connect(restored)
+        dst = sqlite3.connect(DB_PATH)
+        try:
+            with dst:
+                src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
         print(f"✅ Database restored from: {backup_name}")
         return True
     except Exception as e:
         print(f"❌ Restore failed: {e}")
         return False
+    finally:
+        if restored.exists():
+            restored.unlink()
+
+
+def start_scheduler(interval_hours: float) -> threading.Thread:
+    """Back up every `interval_hours` in a daemon thread (used by media_server when BACKUP_INTERVAL_HOURS is set)"""
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            if backup_database():
+                cleanup_old_backups()
+
+    thread = threading.Thread(target=run, name='db-backup', daemon=True)
+    thread.start()
+    return thread
+
 
 if __name__ == "__main__":
     import sys
@@ -119,15 +346,30 @@ if __name__ == "__main__":
         if command == "list":
             list_backups()
         elif command == "restore" and len(sys.argv) > 2:
-            restore_backup(sys.argv[2])
+            sys.exit(0 if restore_backup(sys.argv[2]) else 1)
+        elif command == "verify" and len(sys.argv) > 2:
+            sys.exit(0 if verify_backup(sys.argv[2]) else 1)
         elif command == "cleanup":
             cleanup_old_backups()
+        elif command == "export-cloud":
+            from cloud_db import export_snapshot
+            snapshot_info = export_snapshot(Path(sys.argv[2]) if len(sys.argv) > 2 else None)
+            for table in snapshot_info["tables"]:
+                print(f"  • {table['table']}: {table['rows']} rows in {len(table['chunks'])} chunk(s)")
+            print(f"✅ Cloud snapshot written to: {snapshot_info['path']}")
+        elif command == "import-cloud" and len(sys.argv) > 2:
+            from cloud_db import import_snapshot
+            counts = import_snapshot(Path(sys.argv[2]))
+            print(f"✅ Cloud database restored: {', '.join(f'{t}={n}' for t, n in counts.items())}")
         else:
             print("Usage:")
             print("  python backup_database.py          # Create backup")
             print("  python backup_database.py list     # List backups")
-            print("  python backup_database.py restore <filename>")
+            print("  python backup_database.py restore <name|sha>")
+            print("  python backup_database.py verify <name|sha>")
             print("  python backup_database.py cleanup  # Remove old backups")
+            print("  python backup_database.py export-cloud [dir]   # COPY Postgres tables to data/pg_backups")
+            print("  python backup_database.py import-cloud <dir>    # Replace Postgres tables from a snapshot")
     else:
         # Default: create backup and cleanup
         print("🔄 Creating database backup...")
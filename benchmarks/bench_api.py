@@ -0,0 +1,132 @@
+"""
+API endpoints through the Flask test client (local mode, SQLite)
+For each dataset size it times GET /api/clips (with the gzip size of the
+body), PUT /api/clip/<id> on a sample of clips and POST
+/api/search/semantic. Semantic search uses a local fake embedding provider:
+a hashed bag of words, so no API key or network is involved. Its embeddings
+rebuild (rebuild-embeddings endpoint) is timed too. Semantic search loads every
+embedding from JSON on each query, so it only runs up to --semantic-max clips.
+Server logging goes to stderr; the JSON result is the only thing on stdout.
+
+    python benchmarks/bench_api.py [--sizes 1000 10000 100000] [--repeat 3] [--ops 100]
+"""
+import argparse
+import contextlib
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import use_database
+
+with contextlib.redirect_stdout(sys.stderr):
+    import analytics_db
+    import media_server
+    import semantic_search
+
+QUERIES = ["horns flare with drop coverage", "late closeout corner 3", "switch on ball screen turnover"]
+
+
+def fake_embeddings(dimensions: int):
+    def embed(texts):
+        vectors = []
+        for text in texts:
+            vector = [0.0] * dimensions
+            for word in text.lower().split():
+                vector[zlib.crc32(word.encode()) % dimensions] += 1.0
+            norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+            vectors.append([round(v / norm, 6) for v in vector])
+        return vectors
+    return embed
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_size(client, workdir: Path, size: int, repeat: int, ops: int, semantic_max: int) -> dict:
+    use_database(workdir, size)
+    ids = [row['id'] for row in analytics_db.fetch_clips()]
+    sample = random.Random(size).sample(ids, min(ops, len(ids)))
+
+    def list_clips(headers=None):
+        response = client.get('/api/clips', headers=headers)
+        assert response.status_code == 200, response.status_code
+        return response
+
+    def put_clip(index_id):
+        index, clip_id = index_id
+        response = client.put(f'/api/clip/{clip_id}', json={'notes': f'bench {index}', 'coverage': 'Switch'})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    result = {
+        'clips': size,
+        'list_ms': round(best_of(list_clips, repeat) * 1000, 1),
+        'list_bytes': len(list_clips().get_data()),
+        'list_gzip_ms': round(best_of(lambda: list_clips({'Accept-Encoding': 'gzip'}), repeat) * 1000, 1),
+        'list_gzip_bytes': len(list_clips({'Accept-Encoding': 'gzip'}).get_data()),
+    }
+    start = time.perf_counter()
+    for item in enumerate(sample):
+        put_clip(item)
+    result['put_ms'] = round((time.perf_counter() - start) / len(sample) * 1000, 2)
+
+    if size <= semantic_max:
+        start = time.perf_counter()
+        response = client.post('/api/search/rebuild-embeddings')
+        assert response.get_json()['ok'], response.get_json()
+        result['embeddings_rebuild_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        result['embeddings_mb'] = round(semantic_search.EMBEDDINGS_FILE.stat().st_size / 1e6, 1)
+
+        def search():
+            for query in QUERIES:
+                response = client.post('/api/search/semantic', json={'query': query, 'top_k': 20})
+                assert response.status_code == 200, response.get_data(as_text=True)
+
+        result['semantic_ms'] = round(best_of(search, repeat) / len(QUERIES) * 1000, 1)
+    else:
+        result['semantic_ms'] = None
+    return result
+
+
+def run(sizes, repeat: int, ops: int, semantic_max: int, dimensions: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        workdir = Path(tmp)
+        # Keep the real metadata file and embeddings out of it
+        media_server.METADATA_FILE = workdir / 'clips_metadata.json'
+        semantic_search.EMBEDDINGS_FILE = workdir / 'clip_embeddings.json'
+        semantic_search.embed_texts = fake_embeddings(dimensions)
+        media_server.OPENAI_AVAILABLE = True
+        use_database(workdir, min(sizes))
+        media_server.startup()
+        client = media_server.app.test_client()
+        results = [run_size(client, workdir, size, repeat, ops, semantic_max) for size in sizes]
+    return {
+        'benchmark': 'api',
+        'repeat': repeat,
+        'ops': ops,
+        'embedding_dimensions': dimensions,
+        'sizes': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=100)
+    parser.add_argument('--semantic-max', type=int, default=20000)
+    parser.add_argument('--dimensions', type=int, default=64)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.repeat, args.ops, args.semantic_max, args.dimensions), indent=2))
@@ -0,0 +1,90 @@
+"""
+Auth overhead per request
+Times token verification on its own (uncached jwt.decode vs the token cache) and
+a full Flask request through @require_auth + @require_write handlers with cloud
+auth enforced, with the cache cleared before every request vs kept warm.
+
+    python benchmarks/bench_auth.py [--requests N]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import jwt
+from flask import Flask, jsonify
+
+import auth
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def build_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.route('/read')
+    @auth.require_auth
+    def read():
+        return jsonify(ok=True)
+
+    @app.route('/write', methods=['POST'])
+    @auth.require_auth
+    @auth.require_write
+    def write():
+        return jsonify(ok=True)
+
+    return app
+
+
+def run(requests: int) -> dict:
+    # Enforce token checks as in cloud mode
+    auth.is_cloud = lambda: True
+    token = auth.create_jwt_token('coach', 'coach')
+    headers = {'Authorization': f'Bearer {token}'}
+    client = build_app().test_client()
+
+    def uncached_verify():
+        jwt.decode(token, auth.JWT_SECRET_KEY, algorithms=['HS256'])
+
+    def cached_verify():
+        auth.verify_jwt_token(token)
+
+    def cold_request(path, method='get'):
+        def call():
+            auth.token_cache.clear()
+            getattr(client, method)(path, headers=headers)
+        return call
+
+    def warm_request(path, method='get'):
+        return lambda: getattr(client, method)(path, headers=headers)
+
+    def no_auth_request():
+        client.get('/read')
+
+    results = {
+        'benchmark': 'auth',
+        'requests': requests,
+        'verify_uncached_us': per_call_us(uncached_verify, requests),
+        'verify_cached_us': per_call_us(cached_verify, requests),
+        'read_cold_us': per_call_us(cold_request('/read'), requests),
+        'read_warm_us': per_call_us(warm_request('/read'), requests),
+        'write_cold_us': per_call_us(cold_request('/write', 'post'), requests),
+        'write_warm_us': per_call_us(warm_request('/write', 'post'), requests),
+        'rejected_us': per_call_us(no_auth_request, requests),
+    }
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in results.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.requests), indent=2))
@@ -0,0 +1,79 @@
+"""
+SQLite backup, verify and restore time vs database size
+backup_database runs against a copy of the synthetic dataset, with its
+backup directory in a temporary folder. The snapshot is paced, with
+BACKUP_STEP_PAUSE sleeps between page steps. Timings:
+  backup_s            first backup (snapshot, hash, compress)
+  backup_unchanged_s  the next one, deduplicated against the stored object
+  backup_changed_s    after one clip update, so a new object is written
+  verify_s, restore_s decompress + hash + integrity_check; restore adds a
+                      before-restore backup and the copy into the live DB
+
+    python benchmarks/bench_backup.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import contextlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analytics_db
+import backup_database
+from benchmarks.synthetic import use_database
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, round(time.perf_counter() - start, 3)
+
+
+def run_size(workdir: Path, size: int) -> dict:
+    db_path = use_database(workdir, size)
+    backups = workdir / f'backups-{size}'
+    backup_database.DB_PATH = db_path
+    backup_database.BACKUP_DIR = backups
+    backup_database.OBJECTS_DIR = backups / 'objects'
+    backup_database.INDEX_PATH = backups / 'index.json'
+
+    first, backup_s = timed(backup_database.backup_database, 'bench')
+    _, unchanged_s = timed(backup_database.backup_database, 'bench')
+    clip = analytics_db.fetch_clips()[0]
+    analytics_db.upsert_clip({**clip, 'notes': 'bench backup'})
+    _, changed_s = timed(backup_database.backup_database, 'bench')
+    verified, verify_s = timed(backup_database.verify_backup, first['name'])
+    restored, restore_s = timed(backup_database.restore_backup, first['name'])
+    assert verified and restored
+    return {
+        'clips': size,
+        'db_mb': round(first['size'] / 1e6, 1),
+        'compressed_mb': round(first['compressed_size'] / 1e6, 2),
+        'backup_s': backup_s,
+        'backup_unchanged_s': unchanged_s,
+        'backup_changed_s': changed_s,
+        'verify_s': verify_s,
+        'restore_s': restore_s,
+    }
+
+
+def run(sizes) -> dict:
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        results = [run_size(Path(tmp), size) for size in sizes]
+    return {
+        'benchmark': 'backup',
+        'codec': backup_database._codec(),
+        'pages_per_step': backup_database.PAGES_PER_STEP,
+        'step_pause': backup_database.STEP_PAUSE,
+        'sizes': results,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes), indent=2))
@@ -0,0 +1,83 @@
+"""
+SQLite data layer: fetch_clips, fetch_clip, upsert_clip and transform_db_clip
+For each dataset size, analytics_db is pointed at a copy of the synthetic
+database. It times the full listing, single-clip lookups, updates of existing
+clips, inserts of new ones, and transforming the listing one row at a time
+(transform_db_clip) vs in one pass (transform_db_clips).
+
+    python benchmarks/bench_db.py [--sizes 1000 10000 100000] [--repeat 3] [--ops 200]
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analytics_db
+from benchmarks.synthetic import make_clip, use_database
+from clip_transform import transform_db_clip, transform_db_clips
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def per_op_ms(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - start) / len(items) * 1000
+
+
+def run_size(workdir: Path, size: int, repeat: int, ops: int) -> dict:
+    start = time.perf_counter()
+    path = use_database(workdir, size)
+    setup_s = time.perf_counter() - start
+
+    rows = analytics_db.fetch_clips()
+    rng = random.Random(size)
+    sample = rng.sample(rows, min(ops, len(rows)))
+    updates = [{**row, 'notes': f"bench update {i}", 'coverage': 'Switch'} for i, row in enumerate(sample)]
+    inserts = [make_clip(size + i, rng) for i in range(ops)]
+
+    result = {
+        'clips': size,
+        'db_mb': round(path.stat().st_size / 1e6, 1),
+        'setup_s': round(setup_s, 2),
+        'fetch_clips_ms': round(best_of(analytics_db.fetch_clips, repeat) * 1000, 1),
+        'fetch_clip_ms': round(per_op_ms(analytics_db.fetch_clip, [row['id'] for row in sample]), 3),
+        'upsert_update_ms': round(per_op_ms(analytics_db.upsert_clip, updates), 3),
+        'upsert_insert_ms': round(per_op_ms(analytics_db.upsert_clip, inserts), 3),
+        'transform_per_row_ms': round(best_of(lambda: [transform_db_clip(row) for row in rows], repeat) * 1000, 1),
+        'transform_batch_ms': round(best_of(lambda: transform_db_clips(rows), repeat) * 1000, 1),
+    }
+    path.unlink()
+    return result
+
+
+def run(sizes, repeat: int, ops: int) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        return {
+            'benchmark': 'db',
+            'repeat': repeat,
+            'ops': ops,
+            'sizes': [run_size(Path(workdir), size, repeat, ops) for size in sizes],
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--ops', type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.repeat, args.ops), indent=2))
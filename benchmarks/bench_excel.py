@@ -0,0 +1,85 @@
+"""
+Excel bridge append latency vs workbook size
+Drives excel_bridge_rowaware_plus_v2's /append through its Flask test client.
+The workbook is a temporary copy already holding N tagged rows. Every append
+loads the workbook, finds the next empty row from row 2, writes and saves.
+That cost grows with the sheet, which is what this tracks.
+
+    python benchmarks/bench_excel.py [--rows 100 500 1000] [--appends 10]
+"""
+import argparse
+import contextlib
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from openpyxl import Workbook
+
+import excel_bridge_rowaware_plus_v2 as bridge
+from benchmarks.synthetic import make_clip
+
+COLUMNS = {
+    'Game #': 'game_id', 'Opponent': 'opponent', 'Quarter': 'quarter', 'Possession #': 'possession',
+    'Situation': 'situation', 'Offensive Formation': 'formation', 'Play Name': 'play_name',
+    'Play Trigger': 'play_trigger', 'Action Type(s)': 'action_types', 'Action Sequence': 'action_sequence',
+    'Defensive Coverage': 'coverage', 'Ball Screen Coverage': 'ball_screen',
+    'Off-Ball Screen Coverage': 'off_ball_screen', 'Help/Rotation': 'help_rotation',
+    'Defensive Breakdown': 'breakdown', 'Play Result': 'result', 'Paint Touches': 'paint_touch',
+    'Shooter Designation': 'shooter', 'Shot Location': 'shot_location', 'Shot Contest': 'contest',
+    'Rebound Outcome': 'rebound', 'Points': 'points', 'Notes': 'notes',
+    'Start Time': 'start_time', 'End Time': 'end_time',
+}
+
+
+def excel_row(clip: dict) -> dict:
+    return {header: clip[key] for header, key in COLUMNS.items()}
+
+
+def make_workbook(path: Path, rows: int, rng: random.Random) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = bridge.SHEET_NAME
+    ws.append(list(COLUMNS))
+    for index in range(rows):
+        ws.append(list(excel_row(make_clip(index, rng)).values()))
+    wb.save(path)
+
+
+def run(sizes, appends: int) -> dict:
+    client = bridge.app.test_client()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+        for rows in sizes:
+            rng = random.Random(rows)
+            path = Path(tmp) / f'tagging-{rows}.xlsx'
+            make_workbook(path, rows, rng)
+            bridge.WORKBOOK_PATH = path
+            payloads = [excel_row(make_clip(rows + i, rng)) for i in range(appends)]
+            times = []
+            for payload in payloads:
+                start = time.perf_counter()
+                response = client.post('/append', json=payload)
+                times.append(time.perf_counter() - start)
+                assert response.get_json()['ok'], response.get_json()
+            times.sort()
+            results.append({
+                'rows': rows,
+                'workbook_kb': round(path.stat().st_size / 1024),
+                'append_ms': round(sum(times) / len(times) * 1000, 1),
+                'append_p50_ms': round(times[len(times) // 2] * 1000, 1),
+                'append_max_ms': round(times[-1] * 1000, 1),
+            })
+    return {'benchmark': 'excel', 'appends': appends, 'sizes': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--appends', type=int, default=10)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.appends), indent=2))
@@ -0,0 +1,74 @@
+"""
+Cold-start import profile for media_server
+Runs `python -X importtime -c "import media_server"` in fresh interpreters and
+reports the best total, the slowest modules, and whether any optional
+heavy dependency was loaded. Those are numpy/openai via semantic_search,
+requests via the bridge client, boto3, openpyxl and psycopg. Locally none of
+them should load at import; routes load them on first use. Exits 1 when the
+budget is exceeded or one of them was imported, so it can guard start-up time
+in CI.
+
+    python benchmarks/bench_import.py [--repeat N] [--budget-ms MS] [--top N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+LAZY_MODULES = ('numpy', 'openai', 'requests', 'boto3', 'openpyxl', 'psycopg', 'semantic_search')
+DEFAULT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '400'))
+
+
+def profile_once(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every import, in -X importtime order"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run(repeat: int, top: int, module: str = 'media_server') -> Dict:
+    best: List[Tuple[str, int, int]] = []
+    best_total = None
+    for _ in range(repeat):
+        rows = profile_once(module)
+        total = sum(self_us for _, self_us, _ in rows)
+        if best_total is None or total < best_total:
+            best, best_total = rows, total
+    loaded = {name.split('.')[0] for name, _, _ in best}
+    slowest = sorted(best, key=lambda row: row[2], reverse=True)
+    return {
+        'benchmark': 'import',
+        'module': module,
+        'repeat': repeat,
+        'total_ms': round(best_total / 1000, 1),
+        'module_ms': round(next(c for name, _, c in best if name == module) / 1000, 1),
+        'modules_imported': len(best),
+        'slowest_cumulative_ms': {name: round(c / 1000, 1) for name, _, c in slowest[:top]},
+        'lazy_modules_loaded': sorted(loaded.intersection(LAZY_MODULES)),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.top)
+    result['budget_ms'] = args.budget_ms
+    result['ok'] = result['total_ms'] <= args.budget_ms and not result['lazy_modules_loaded']
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result['ok'] else 1)
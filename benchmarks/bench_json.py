@@ -0,0 +1,86 @@
+"""
+JSON serialisation and response compression for /api/clips-sized payloads
+Builds N synthetic clips in the API's shape and times jsonify with Flask's
+default provider and with the orjson provider, then compares payload
+size/time for identity, gzip and (if installed) brotli encoding.
+
+    python benchmarks/bench_json.py [--clips 20000] [--repeat 3]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+import json_provider
+import response_compression
+from benchmarks.synthetic import make_clips
+
+
+def api_shape(row):
+    """Roughly what transform_db_clip returns: every column plus derived URL/location fields"""
+    clip = dict(row)
+    clip.update({
+        'video_url': f"/legacy/Clips/{row['filename']}?exp=1792382400&sig=Ri_JCEEM4qbTlkKg_P-FZQ",
+        'hls_url': None,
+        'thumbnail_url': f"/api/clip/{row['id']}/thumb?exp=1792382400&sig=Ri_JCEEM4qbTlkKg_P-FZQ",
+        'location_display': row['location'],
+        'location_code': row['location'],
+        'game_location': row['location'],
+        'locationLabel': row['location'],
+        'actions': json.loads(row['actions_json']),
+    })
+    return clip
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(count: int, repeat: int) -> dict:
+    clips = [api_shape(row) for row in make_clips(count)]
+    app = Flask(__name__)
+    results = {'benchmark': 'json', 'clips': count, 'fields_per_clip': len(clips[0]), 'providers': {}}
+
+    providers = {'std': DefaultJSONProvider(app)}
+    if json_provider.ORJSON_AVAILABLE:
+        providers['orjson'] = json_provider.OrjsonProvider(app)
+
+    body = b''
+    for name, provider in providers.items():
+        app.json = provider
+        with app.app_context():
+            seconds = best_of(lambda: jsonify(clips).get_data(), repeat)
+            body = jsonify(clips).get_data()
+        results['providers'][name] = {'serialize_ms': round(seconds * 1000, 1), 'bytes': len(body)}
+
+    encodings = {'gzip': lambda: response_compression.gzip.compress(
+        body, compresslevel=response_compression.GZIP_LEVEL, mtime=0)}
+    if response_compression.BROTLI_AVAILABLE:
+        encodings['br'] = lambda: response_compression.brotli.compress(
+            body, quality=response_compression.BROTLI_QUALITY)
+    results['encodings'] = {'identity': {'bytes': len(body), 'compress_ms': 0.0}}
+    for name, compress in encodings.items():
+        results['encodings'][name] = {
+            'bytes': len(compress()),
+            'compress_ms': round(best_of(compress, repeat) * 1000, 1),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clips', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.clips, args.repeat), indent=2))
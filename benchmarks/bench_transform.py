@@ -0,0 +1,134 @@
+"""
+Clip transformation: per-row fallback chains vs compiled accessor plans
+The baseline is the previous transform_db_clip (dict.get chains, a Path.exists
+per row; its debug prints are left out). The candidate is
+clip_transform.transform_db_clips, timed with an empty actions cache (first
+listing) and a warm one (repeat listings). Half of the clips have a file in a temporary
+Clips/ directory and a quarter a poster frame, so both local and missing-file URL
+paths are exercised.
+
+    python benchmarks/bench_transform.py [--sizes 1000 10000 50000] [--repeat 3]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import clip_transform
+from benchmarks.synthetic import make_clips
+from clip_actions import normalize_actions
+from media_urls import sign_path
+
+
+def legacy_transform(clips_dir: Path):
+    def derive_video_url(filename, fallback=None):
+        for raw in (filename, fallback):
+            if not raw:
+                continue
+            raw_str = str(raw)
+            if raw_str.startswith('https://') or raw_str.startswith('http://'):
+                return raw_str
+            name = Path(raw).name
+            if (clips_dir / name).exists():
+                return sign_path(f"/legacy/Clips/{name}")
+        return None
+
+    def derive_thumbnail_url(clip_id, filename):
+        if clip_id and filename and ((clips_dir / f"{Path(filename).stem}.thumb.jpg").exists()
+                                     or (clips_dir / Path(filename).name).exists()):
+            return sign_path(f"/api/clip/{clip_id}/thumb")
+        return None
+
+    def transform_db_clip(clip):
+        location_code = (
+            clip.get('location_code') or clip.get('location') or clip.get('game_location') or
+            clip.get('locationCode') or clip.get('Location Code') or ''
+        )
+        location_display = (
+            clip.get('location_display') or clip.get('location') or clip.get('locationLabel') or
+            clip.get('locationDisplay') or clip.get('Location') or ''
+        )
+        out = {
+            'id': clip.get('id'),
+            'filename': clip.get('filename'),
+            'source_video': clip.get('source_video'),
+            'path': clip.get('path'),
+            'video_url': derive_video_url(clip.get('filename'), clip.get('path')),
+            'hls_url': clip.get('hls_url'),
+            'thumbnail_url': derive_thumbnail_url(clip.get('id'), clip.get('filename')),
+        }
+        for key in ('game_id', 'opponent', 'game_score', 'quarter', 'possession', 'situation', 'formation',
+                    'play_name', 'scout_coverage'):
+            out[key] = clip.get(key)
+        out['play_trigger'] = clip.get('play_trigger') or clip.get('action_trigger')
+        for key in ('action_types', 'action_sequence', 'coverage', 'ball_screen', 'off_ball_screen',
+                    'help_rotation', 'disruption', 'breakdown', 'result', 'paint_touch', 'shooter',
+                    'shot_location', 'contest', 'rebound', 'points', 'has_shot', 'shot_x', 'shot_y',
+                    'shot_result', 'player_designation', 'notes', 'start_time', 'end_time'):
+            out[key] = clip.get(key)
+        out.update({
+            'location': location_code,
+            'location_display': location_display,
+            'location_code': location_code,
+            'game_location': location_code,
+            'locationLabel': location_display,
+            'actions': normalize_actions(clip.get('actions') or clip.get('actions_json')),
+        })
+        return out
+
+    return transform_db_clip
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(sizes, repeat: int) -> dict:
+    results = {'benchmark': 'transform', 'sizes': []}
+    with tempfile.TemporaryDirectory() as tmp:
+        clips_dir = Path(tmp)
+        clip_transform.clip_files = clip_transform.ClipFiles(clips_dir)
+        legacy = legacy_transform(clips_dir)
+        for size in sizes:
+            rows = make_clips(size)
+            for row in rows[::2]:
+                (clips_dir / row['filename']).touch()
+            for row in rows[::4]:
+                (clips_dir / f"{Path(row['filename']).stem}.thumb.jpg").touch()
+            assert [legacy(r) for r in rows[:50]] == clip_transform.transform_db_clips(rows[:50])
+
+            def cold():
+                clip_transform._actions_cache.clear()
+                clip_transform.transform_db_clips(rows)
+
+            baseline = best_of(lambda: [legacy(r) for r in rows], repeat)
+            compiled_cold = best_of(cold, repeat)
+            compiled = best_of(lambda: clip_transform.transform_db_clips(rows), repeat)
+            results['sizes'].append({
+                'clips': size,
+                'per_row_ms': round(baseline * 1000, 1),
+                'compiled_cold_ms': round(compiled_cold * 1000, 1),
+                'compiled_ms': round(compiled * 1000, 1),
+                'per_row_us_per_clip': round(baseline / size * 1e6, 2),
+                'compiled_us_per_clip': round(compiled / size * 1e6, 2),
+                'speedup_cold': round(baseline / compiled_cold, 2),
+                'speedup': round(baseline / compiled, 2),
+            })
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.repeat), indent=2))
@@ -0,0 +1,142 @@
+"""
+Run the benchmark suite and write one JSON results file per run
+Each bench_*.py runs in its own interpreter (several repoint module globals
+such as analytics_db.DB_PATH) and its JSON output is collected under its name,
+together with the git commit, Python version and platform. Results go to
+benchmarks/results/<timestamp>.json. --compare prints every timing that
+moved by more than --threshold against an earlier file.
+
+    python benchmarks/run_all.py [--quick] [--only db api ...] [--compare benchmarks/results/<old>.json]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / 'results'
+FULL_SIZES = ['1000', '10000', '100000']
+QUICK_SIZES = ['1000', '10000']
+TIMING_SUFFIXES = ('_ms', '_us', '_s')
+
+
+def bench_args(quick: bool) -> Dict[str, List[str]]:
+    sizes = QUICK_SIZES if quick else FULL_SIZES
+    return {
+        'import': [],
+        'db': ['--sizes', *sizes],
+        'transform': ['--sizes', *sizes],
+        'json': ['--clips', sizes[-1]],
+        'api': ['--sizes', *sizes],
+        'auth': ['--requests', '500' if quick else '2000'],
+        'excel': ['--rows', '100', '500'] if quick else [],
+        'backup': ['--sizes', *sizes],
+    }
+
+
+def _last_json(stdout: str) -> Dict[str, Any]:
+    """The pretty-printed object each benchmark ends its output with"""
+    start = stdout.rfind('\n{\n')
+    return json.loads(stdout[start + 1:] if start >= 0 else stdout)
+
+
+def run_benchmark(name: str, args: List[str]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(BENCH_DIR / f'bench_{name}.py'), *args],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    elapsed = round(time.perf_counter() - started, 1)
+    try:
+        result = _last_json(proc.stdout)
+    except ValueError:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-5:]
+        return {'error': f'exit {proc.returncode}', 'output': tail, 'wall_s': elapsed}
+    result['wall_s'] = elapsed
+    if proc.returncode:
+        result['exit_code'] = proc.returncode
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def flatten(value: Any, prefix: str = '') -> Dict[str, float]:
+    """Numeric leaves keyed by path; per-size lists are keyed by their size, e.g. db.sizes[10000].fetch_clips_ms"""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            out.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+        return out
+    if isinstance(value, list):
+        out = {}
+        for index, item in enumerate(value):
+            label = index
+            if isinstance(item, dict):
+                label = item.get('clips', item.get('rows', index))
+            out.update(flatten(item, f"{prefix}[{label}]"))
+        return out
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    now, before = flatten(current['results']), flatten(baseline['results'])
+    lines = []
+    for key in sorted(now.keys() & before.keys()):
+        if not key.endswith(TIMING_SUFFIXES) or key.endswith('wall_s') or not before[key]:
+            continue
+        ratio = now[key] / before[key]
+        if abs(ratio - 1) >= threshold:
+            mark = '🔴 slower' if ratio > 1 else '🟢 faster'
+            lines.append(f"{mark} {key}: {before[key]} -> {now[key]} ({ratio:.2f}x)")
+    return lines
+
+
+if __name__ == '__main__':
+    all_args = bench_args(quick=False)
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='1k/10k datasets only')
+    parser.add_argument('--only', nargs='+', choices=list(all_args), help='benchmarks to run')
+    parser.add_argument('--out', type=Path, help='results file (default benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', type=Path, help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='relative change worth reporting')
+    args = parser.parse_args()
+
+    selected = bench_args(args.quick)
+    names = args.only or list(selected)
+    run = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'quick': args.quick,
+        'results': {},
+    }
+    for name in names:
+        print(f"⏱️  {name}...", flush=True)
+        run['results'][name] = result = run_benchmark(name, selected[name])
+        status = f"❌ {result['error']}" if 'error' in result else '✅'
+        print(f"   {status} ({result['wall_s']}s)")
+
+    out = args.out or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(run, indent=2))
+    print(f"💾 Results written to {out}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        changes = compare(run, baseline, args.threshold)
+        print(f"\n📊 vs {args.compare.name} ({baseline.get('commit') or 'unknown commit'}):")
+        print("\n".join(changes) if changes else f"   no timing moved by {args.threshold:.0%} or more")
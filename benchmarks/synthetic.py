@@ -0,0 +1,173 @@
+"""
+Synthetic clip datasets for the benchmarks
+Rows have every clips column, drawn from the tagger's vocabularies, with 1-4
+actions in actions_json and court coordinates for shot possessions.
+Generation is seeded, so a given (count, seed) always yields the same rows.
+
+use_database() gives analytics_db a SQLite file holding such a dataset. Each
+(count, seed, schema version) is built once into the temp directory, and
+every call gets a fresh copy, so benchmarks that write don't affect later runs.
+"""
+import json
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+OPPONENTS = ["Kansas City", "Belmont", "Texas Tech", "Baylor", "Iowa State", "TCU", "West Virginia",
+             "Oklahoma State", "Houston", "Cincinnati", "UCF", "BYU"]
+SITUATIONS = ["Half Court", "Transition", "Early Offense", "BLOB", "SLOB", "Press Break"]
+FORMATIONS = ["4-Out 1-In", "5-Out", "Horns", "1-4 High", "Box", "Stack"]
+TRIGGERS = ["Baseline Runner", "Wing Entry", "Post Entry", "DHO", "Ball Screen", "Flare"]
+COVERAGES = ["Man", "Zone 2-3", "Zone 3-2", "Switch", "Box-and-1"]
+BALL_SCREEN = ["Drop", "Hedge", "Switch", "Ice", "Blitz", "Over / At Level", ""]
+OFF_BALL = ["Lock & Trail", "Switch", "Top Lock", "Chase", ""]
+HELP = ["No Help / Stay Home", "Tag Roller", "X-Out", "Sink & Fill", ""]
+BREAKDOWNS = ["", "No", "Yes (Stuck On Screen)", "Yes (Late Closeout)", "Yes (Missed Rotation)"]
+RESULTS = ["Made FG", "Missed FG", "Turnover", "Foul", "Made 3PT", "Missed 3PT"]
+SHOOTERS = ["Blue (Perimeter)", "Green (Shooter)", "Black (Post)"]
+SHOT_LOCATIONS = ["Rim (0–4 ft)", "Short Midrange (11–14 ft)", "Corner 3", "Wing 3", "Top 3"]
+CONTESTS = ["Open", "Light Contest / Late High-Hand (2–4 ft)", "Heavy Contest", "Blocked"]
+ACTION_PHASES = ["On-Ball", "Off-Ball", "Transition"]
+ACTION_TYPES = ["Cross Screen", "Pick & Pop / Side / Step-Up", "Pick & Roll", "DHO", "Pin Down", "Flare", "Iso"]
+ACTION_COVERAGES = ["Over / At Level", "Under / Drop", "Switch", "Hedge", "Ice"]
+ACTION_BREAKDOWNS = ["", "Late Chase / Slow Recovery", "Stuck on Screen", "Miscommunication"]
+COMMUNICATION = ["Confirmed Verbal", "Unknown", "None"]
+OUTCOMES = ["Contained", "Advantage Created", "Score", "Reset"]
+
+
+def _clock(seconds: int) -> str:
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def make_clip(index: int, rng: random.Random) -> Dict[str, Any]:
+    """One clips-table row"""
+    game_id = index // 80 + 1
+    opponent = OPPONENTS[game_id % len(OPPONENTS)]
+    slug = opponent.lower().replace(" ", "-")
+    quarter = index % 80 // 20 + 1
+    possession = index % 20 + 1
+    result = rng.choice(RESULTS)
+    shot = result in ("Made FG", "Missed FG", "Made 3PT", "Missed 3PT")
+    points = {"Made FG": 2, "Made 3PT": 3}.get(result, 0)
+    start = quarter * 600 + possession * 25 + rng.randint(0, 10)
+    created = datetime(2025, 11, 1) + timedelta(minutes=index)
+    stamp = created.strftime("%Y%m%d_%H%M%S")
+    filename = f"G{game_id}_Q{quarter}_P{possession}_{slug.replace('-', '_')}_{stamp}.mp4"
+    actions = [
+        {
+            "phase": rng.choice(ACTION_PHASES),
+            "type": rng.choice(ACTION_TYPES),
+            "coverage": rng.choice(ACTION_COVERAGES),
+            "help": rng.choice(HELP),
+            "breakdown": rng.choice(ACTION_BREAKDOWNS),
+            "communication": rng.choice(COMMUNICATION),
+            "outcome": rng.choice(OUTCOMES),
+        }
+        for _ in range(rng.randint(1, 4))
+    ]
+    clip_id = f"G{game_id}_{slug}_Q{quarter}P{possession}_{index:06d}"
+    return {
+        "id": clip_id,
+        "filename": filename,
+        "path": f"/data/Clips/{filename}",
+        "source_video": f"{opponent.replace(' ', '_')}_vs_OU_1080p60.mp4",
+        "game_id": game_id,
+        "canonical_game_id": f"G{game_id}_{slug}",
+        "canonical_clip_id": clip_id,
+        "opponent": opponent,
+        "opponent_slug": slug,
+        "location": rng.choice(["Home", "Away", "Neutral"]),
+        "game_score": f"{rng.randint(55, 95)}-{rng.randint(55, 95)} {rng.choice('WL')}",
+        "quarter": quarter,
+        "possession": possession,
+        "situation": rng.choice(SITUATIONS),
+        "formation": rng.choice(FORMATIONS),
+        "play_name": rng.choice(["", "Floppy", "Horns Flare", "Spain PnR", "Chin"]),
+        "scout_coverage": rng.choice(["Yes – Exact", "Partial – Similar Action", "No"]),
+        "play_trigger": rng.choice(TRIGGERS),
+        "action_types": ", ".join(a["type"] for a in actions),
+        "action_sequence": " → ".join(a["type"] for a in actions),
+        "coverage": rng.choice(COVERAGES),
+        "ball_screen": rng.choice(BALL_SCREEN),
+        "off_ball_screen": rng.choice(OFF_BALL),
+        "help_rotation": rng.choice(HELP),
+        "disruption": rng.choice(["", "Deflection", "Steal", "Charge Taken"]),
+        "breakdown": rng.choice(BREAKDOWNS),
+        "result": result,
+        "paint_touch": rng.choice(["No Paint Touch", "Paint Touch", "Multiple Paint Touches"]),
+        "shooter": rng.choice(SHOOTERS) if shot else "",
+        "shot_location": rng.choice(SHOT_LOCATIONS) if shot else "",
+        "contest": rng.choice(CONTESTS) if shot else "",
+        "rebound": rng.choice(["", "Defensive Rebound", "Offensive Rebound"]),
+        "points": points,
+        "has_shot": "Yes" if shot else "No",
+        "shot_x": f"{rng.uniform(0, 100):.2f}" if shot else "",
+        "shot_y": f"{rng.uniform(0, 94):.2f}" if shot else "",
+        "shot_result": result if shot else "",
+        "player_designation": rng.choice(["primary", "secondary", ""]),
+        "notes": rng.choice(["", "Stuck On Screen", "Good rotation", "Late closeout on the wing"]),
+        "start_time": _clock(start),
+        "end_time": _clock(start + rng.randint(8, 30)),
+        "actions_json": json.dumps(actions),
+        "created_at": created.isoformat(),
+        "updated_at": created.isoformat(),
+    }
+
+
+def iter_clips(count: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for index in range(count):
+        yield make_clip(index, rng)
+
+
+def make_clips(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    return list(iter_clips(count, seed))
+
+
+DATASET_DIR = Path(tempfile.gettempdir()) / "clip-benchmarks"
+INSERT_BATCH = 5000
+
+
+def _build(path: Path, count: int, seed: int) -> None:
+    import analytics_db
+    import clip_actions
+    import clip_rollups
+    from clip_fields import typed_values
+
+    tmp = path.with_suffix(".building")
+    tmp.unlink(missing_ok=True)
+    analytics_db.DB_PATH = tmp
+    analytics_db.run_heavy_migrations()
+    with analytics_db.db_cursor() as cur:
+        cur.execute("PRAGMA table_info(clips)")
+        columns = [row["name"] for row in cur.fetchall()]
+        sql = f"INSERT INTO clips ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        batch = []
+        for clip in iter_clips(count, seed):
+            clip.update(typed_values(clip))
+            batch.append([clip.get(col) for col in columns])
+            if len(batch) >= INSERT_BATCH:
+                cur.executemany(sql, batch)
+                batch = []
+        cur.executemany(sql, batch)
+        clip_actions.backfill(cur, clip_actions.SQLITE)
+        clip_rollups.rebuild(cur, clip_rollups.SQLITE)
+    tmp.replace(path)
+
+
+def use_database(workdir: Path, count: int, seed: int = 7) -> Path:
+    """Point analytics_db at a private copy of the (count, seed) dataset in `workdir`"""
+    import analytics_db
+    from schema_migrations import LATEST_VERSION
+
+    DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    cached = DATASET_DIR / f"clips-{count}-s{seed}-v{LATEST_VERSION}.sqlite"
+    if not cached.exists():
+        _build(cached, count, seed)
+    path = Path(workdir) / f"clips-{count}.sqlite"
+    shutil.copyfile(cached, path)
+    analytics_db.DB_PATH = path
+    return path
@@ -0,0 +1,183 @@
+"""
+Pooled HTTP client for the local Excel bridge processes
+Keeps keep-alive connections in a shared requests.Session, trips a circuit
+breaker when a bridge stops answering, and records per-upstream metrics.
+requests is only imported when the first bridge call is made.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+FAILURE_THRESHOLD = 3       # consecutive failures before the breaker opens
+RESET_TIMEOUT = 15.0        # seconds the breaker stays open before a trial request
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an upstream is short-circuited instead of being called"""
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures, half-open after RESET_TIMEOUT"""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let a single trial request through; re-arm the timer so others keep failing fast
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class UpstreamMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.last_latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def observe(self, latency_ms: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.requests += 1
+            self.total_latency_ms += latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self.last_latency_ms = latency_ms
+            if error:
+                self.errors += 1
+                self.last_error = error
+
+    def short_circuit(self) -> None:
+        with self._lock:
+            self.short_circuited += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'short_circuited': self.short_circuited,
+                'avg_latency_ms': round(self.total_latency_ms / self.requests, 2) if self.requests else None,
+                'max_latency_ms': round(self.max_latency_ms, 2),
+                'last_latency_ms': round(self.last_latency_ms, 2) if self.last_latency_ms is not None else None,
+                'last_error': self.last_error,
+            }
+
+
+class BridgeClient:
+    """JSON client for one bridge upstream (controller or workbook app)"""
+
+    def __init__(self, name: str, base_url: str, timeout: float, session: Optional['requests.Session'] = None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._session = session
+        self.breaker = CircuitBreaker()
+        self.metrics = UpstreamMetrics()
+
+    @property
+    def session(self) -> 'requests.Session':
+        return self._session or shared_session()
+
+    def request(self, method: str, endpoint: str, **kwargs) -> Any:
+        import requests
+
+        if not self.breaker.allow():
+            self.metrics.short_circuit()
+            raise CircuitOpenError(f"{self.name} bridge unavailable (circuit open)")
+
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            self.metrics.observe((time.perf_counter() - started) * 1000, error=str(exc))
+            # Only connection-level problems mean the bridge is down. An HTTP error means it
+            # answered, which also closes a half-open breaker after a trial request
+            if isinstance(exc, requests.HTTPError):
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise RuntimeError(str(exc))
+
+        # It answered, so a body that isn't JSON is a bad response, not a down bridge.
+        # requests' JSONDecodeError is also a RequestException, hence the separate try.
+        self.breaker.record_success()
+        try:
+            data = response.json()
+        except ValueError as exc:
+            error = f"{self.name} bridge sent invalid JSON: {exc}"
+            self.metrics.observe((time.perf_counter() - started) * 1000, error=error)
+            raise RuntimeError(error)
+
+        self.metrics.observe((time.perf_counter() - started) * 1000)
+        return data
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'base_url': self.base_url,
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            **self.metrics.snapshot(),
+        }
+
+
+def create_session() -> 'requests.Session':
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_shared_session: Optional['requests.Session'] = None
+_shared_lock = threading.Lock()
+
+
+def shared_session() -> 'requests.Session':
+    """Process-wide pooled session for clients created without one"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
@@ -0,0 +1,146 @@
+"""
+Per-action tags as rows
+The tagger records a list of actions per possession (phase, type, coverage,
+help, breakdown, communication, outcome) which is stored on the clip as
+actions_json. clip_actions mirrors that list one row per action so
+action-level questions ("every DHO defended with Switch") are an indexed
+query instead of a decode of every clip. upsert_clip rewrites a clip's rows
+in the same transaction as the clip itself.
+"""
+import json
+from typing import Any, Dict, List, Optional
+
+from clip_fields import filter_value
+
+SQLITE = "sqlite"
+POSTGRES = "postgresql"
+
+ACTION_FIELDS = ("phase", "type", "coverage", "help", "breakdown", "communication", "outcome")
+# Clip columns returned alongside each action
+CLIP_FIELDS = ("game_id", "opponent", "quarter", "possession", "situation", "result", "points")
+FILTER_FIELDS = ACTION_FIELDS + ("game_id", "opponent", "quarter")
+MAX_LIMIT = 5000
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS clip_actions (
+        clip_id TEXT NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        phase TEXT,
+        type TEXT,
+        coverage TEXT,
+        help TEXT,
+        breakdown TEXT,
+        communication TEXT,
+        outcome TEXT,
+        PRIMARY KEY (clip_id, position)
+    )
+"""
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_actions_type_coverage ON clip_actions (type, coverage)",
+    "CREATE INDEX IF NOT EXISTS idx_actions_coverage ON clip_actions (coverage)",
+]
+
+
+def normalize_actions(raw: Any) -> List[Dict[str, str]]:
+    """Decode actions_json (or an already-decoded list) into dicts with every ACTION_FIELDS key"""
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(raw, list):
+        return []
+    return [
+        {field: entry.get(field) or '' for field in ACTION_FIELDS}
+        for entry in raw
+        if isinstance(entry, dict)
+    ]
+
+
+def _placeholder(dialect: str) -> str:
+    return "?" if dialect == SQLITE else "%s"
+
+
+def _insert_sql(dialect: str) -> str:
+    ph = _placeholder(dialect)
+    columns = ("clip_id", "position") + ACTION_FIELDS
+    return f"INSERT INTO clip_actions ({', '.join(columns)}) VALUES ({', '.join(ph for _ in columns)})"
+
+
+def _rows(clip_id: str, raw: Any) -> List[tuple]:
+    return [
+        (clip_id, position, *(action[field] or None for field in ACTION_FIELDS))
+        for position, action in enumerate(normalize_actions(raw))
+    ]
+
+
+def sync(cur, dialect: str, clip_id: str, raw: Any) -> None:
+    """Replace the stored actions for one clip"""
+    cur.execute(f"DELETE FROM clip_actions WHERE clip_id = {_placeholder(dialect)}", (clip_id,))
+    rows = _rows(clip_id, raw)
+    if rows:
+        cur.executemany(_insert_sql(dialect), rows)
+
+
+def backfill(cur, dialect: str) -> None:
+    """Rebuild every clip's action rows from actions_json"""
+    cur.execute("DELETE FROM clip_actions")
+    cur.execute("SELECT id, actions_json FROM clips WHERE actions_json IS NOT NULL")
+    rows = [row for clip in cur.fetchall() for row in _rows(clip["id"], clip["actions_json"])]
+    if rows:
+        cur.executemany(_insert_sql(dialect), rows)
+
+
+def _where(dialect: str, filters: Optional[Dict[str, Any]]) -> tuple:
+    ph = _placeholder(dialect)
+    clauses, params = [], []
+    for field in FILTER_FIELDS:
+        value = (filters or {}).get(field)
+        if value is None or value == "":
+            continue
+        column = f"a.{field}" if field in ACTION_FIELDS else f"c.{field}"
+        if dialect == POSTGRES:
+            value = filter_value(field, value)
+            if value is None:
+                clauses.append("FALSE")
+                continue
+        clauses.append(f"{column} = {ph}")
+        params.append(value)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def query(cur, dialect: str, filters: Optional[Dict[str, Any]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+    """Actions matching `filters` (action fields plus game_id/opponent/quarter), with their clip context"""
+    where, params = _where(dialect, filters)
+    columns = ", ".join(
+        ["a.clip_id", "a.position"]
+        + [f"a.{f}" for f in ACTION_FIELDS]
+        + [f"c.{f}" for f in CLIP_FIELDS]
+    )
+    cur.execute(
+        f"SELECT {columns} FROM clip_actions a JOIN clips c ON c.id = a.clip_id {where} "
+        f"ORDER BY c.game_id, c.quarter, c.possession, a.position LIMIT {max(1, min(int(limit), MAX_LIMIT))}",
+        params,
+    )
+    return [dict(row) for row in cur.fetchall()]
+
+
+def summarize(cur, dialect: str, group_by: tuple = ("type", "coverage"),
+              filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Action and distinct-possession counts grouped by action fields"""
+    unknown = [f for f in group_by if f not in ACTION_FIELDS]
+    if unknown or not group_by:
+        raise ValueError(f"group_by must be a subset of: {', '.join(ACTION_FIELDS)}")
+    where, params = _where(dialect, filters)
+    groups = ", ".join(f"a.{f}" for f in group_by)
+    cur.execute(
+        f"""
+        SELECT {groups}, COUNT(*) AS actions, COUNT(DISTINCT a.clip_id) AS possessions
+        FROM clip_actions a JOIN clips c ON c.id = a.clip_id
+        {where}
+        GROUP BY {groups}
+        ORDER BY actions DESC
+        """,
+        params,
+    )
+    return [dict(row) for row in cur.fetchall()]
@@ -0,0 +1,117 @@
+"""
+Live clip change notifications
+An in-process pub/sub that fans clip upsert/delete events out to every open
+Server-Sent Events stream. Locally analytics_db publishes straight into it;
+in the cloud cloud_db issues pg_notify() and a LISTEN thread republishes, so
+events reach every worker process.
+
+A stream occupies a server thread for as long as it is open, so streams end
+after STREAM_MAX_SECONDS; EventSource reconnects on its own (after the
+`retry` delay) and the client catches up through /api/clips/changes. Serve
+with threaded workers (gunicorn.conf.py) so open streams don't starve requests.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+PG_CHANNEL = 'clip_changes'
+SUBSCRIBER_QUEUE_SIZE = 256
+KEEPALIVE_SECONDS = 15
+STREAM_MAX_SECONDS = float(os.getenv('SSE_MAX_SECONDS', '300'))
+
+
+class ClipChangeNotifier:
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Slow consumer: drop its backlog and tell it to resync via /api/clips/changes
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait({'type': 'resync'})
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+notifier = ClipChangeNotifier()
+
+
+def clip_event(kind: str, clip_ids: Iterable[str]) -> Dict[str, Any]:
+    return {'type': kind, 'ids': [str(i) for i in clip_ids], 'at': time.time()}
+
+
+def publish_clip_change(kind: str, clip_ids: Iterable[str]) -> None:
+    ids = list(clip_ids)
+    if ids:
+        notifier.publish(clip_event(kind, ids))
+
+
+def sse_stream(q: queue.Queue, keepalive: float = KEEPALIVE_SECONDS,
+               max_seconds: float = STREAM_MAX_SECONDS) -> Iterator[str]:
+    """Format queued events as text/event-stream; unsubscribes when the client goes away or time is up"""
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield 'retry: 3000\n\n'
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                event = q.get(timeout=min(keepalive, remaining))
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        notifier.unsubscribe(q)
+
+
+_listener_thread: Optional[threading.Thread] = None
+
+
+def start_pg_listener(dsn: str) -> None:
+    """LISTEN on PG_CHANNEL in a daemon thread and republish into `notifier`"""
+    global _listener_thread
+    if _listener_thread and _listener_thread.is_alive():
+        return
+
+    def run():
+        import psycopg
+
+        while True:
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {PG_CHANNEL}")
+                    for note in conn.notifies():
+                        try:
+                            notifier.publish(json.loads(note.payload))
+                        except ValueError:
+                            continue
+            except Exception as e:
+                print(f"⚠️  Clip change listener error: {e}; reconnecting")
+                time.sleep(5)
+
+    _listener_thread = threading.Thread(target=run, name='clip-change-listener', daemon=True)
+    _listener_thread.start()
@@ -0,0 +1,120 @@
+"""
+Server-side clip export (CSV / XLSX)
+Streams rows straight from a DB cursor so a full-season export never holds
+the whole clip list in memory.
+"""
+import csv
+import io
+import tempfile
+from importlib.util import find_spec
+from typing import Any, Dict, Iterable, Iterator
+
+# (db column, spreadsheet header) - headers match the Tagging sheet written by the Excel bridge
+EXPORT_COLUMNS = [
+    ("id", "Clip ID"),
+    ("game_id", "Game #"),
+    ("opponent", "Opponent"),
+    ("location", "Location"),
+    ("game_score", "Game Score"),
+    ("quarter", "Quarter"),
+    ("possession", "Possession #"),
+    ("situation", "Situation"),
+    ("formation", "Offensive Formation"),
+    ("play_name", "Play Name"),
+    ("scout_coverage", "Covered in Scout?"),
+    ("play_trigger", "Play Trigger"),
+    ("action_types", "Action Type(s)"),
+    ("action_sequence", "Action Sequence"),
+    ("coverage", "Defensive Coverage"),
+    ("ball_screen", "Ball Screen Coverage"),
+    ("off_ball_screen", "Off-Ball Screen Coverage"),
+    ("help_rotation", "Help/Rotation"),
+    ("disruption", "Defensive Disruption"),
+    ("breakdown", "Defensive Breakdown"),
+    ("result", "Play Result"),
+    ("paint_touch", "Paint Touches"),
+    ("shooter", "Shooter Designation"),
+    ("shot_location", "Shot Location"),
+    ("contest", "Shot Contest"),
+    ("rebound", "Rebound Outcome"),
+    ("points", "Points"),
+    ("has_shot", "Has Shot"),
+    ("shot_x", "Shot X"),
+    ("shot_y", "Shot Y"),
+    ("shot_result", "Shot Result"),
+    ("player_designation", "Player Designation"),
+    ("notes", "Notes"),
+    ("start_time", "Start Time"),
+    ("end_time", "End Time"),
+    ("filename", "Filename"),
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+CHUNK_ROWS = 200
+CHUNK_BYTES = 64 * 1024
+# Checked before a response starts; openpyxl itself is imported only for an actual export
+XLSX_AVAILABLE = find_spec("openpyxl") is not None
+
+
+def _row_values(clip: Dict[str, Any]) -> list:
+    values = []
+    for col, _ in EXPORT_COLUMNS:
+        value = clip.get(col)
+        if col == "play_trigger" and not value:
+            value = clip.get("action_trigger")
+        values.append("" if value is None else value)
+    return values
+
+
+def stream_csv(clips: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield CSV text in chunks of CHUNK_ROWS rows; the header goes out immediately"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for clip in clips:
+        writer.writerow(_row_values(clip))
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+def stream_xlsx(clips: Iterable[Dict[str, Any]], sheet_name: str = "Clips") -> Iterator[bytes]:
+    """
+    Write rows with openpyxl's write-only workbook (rows are flushed to disk as
+    they are appended) and stream the finished file back in CHUNK_BYTES pieces.
+    openpyxl is imported here, not in the generator, so a missing package raises
+    before the response has started.
+    """
+    from openpyxl import Workbook
+
+    return _xlsx_chunks(Workbook(write_only=True), clips, sheet_name)
+
+
+def _xlsx_chunks(wb, clips: Iterable[Dict[str, Any]], sheet_name: str) -> Iterator[bytes]:
+    ws = wb.create_sheet(sheet_name)
+    ws.append([header for _, header in EXPORT_COLUMNS])
+    for clip in clips:
+        ws.append(_row_values(clip))
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
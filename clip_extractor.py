@@ -5,8 +5,10 @@ from pathlib import Path
 import json
 import datetime
 import re
+import threading
 
-from analytics_db import upsert_clip
+from analytics_db import init_db, upsert_clip
+from clip_thumbnails import submit_thumbnails
 
 app = Flask(__name__)
 
@@ -24,12 +26,18 @@ BASE_DIR = PROJECT_ROOT
 CLIPS_DIR = BASE_DIR / "Clips"
 METADATA_FILE = CLIPS_DIR / "clips_metadata.json"
 
+SUGGESTIONS_DIR = PROJECT_ROOT / "data" / "possession_suggestions"
+
 # Ensure directories exist
 CLIPS_DIR.mkdir(exist_ok=True)
 
 # Store current video path
 current_video_path = None
 
+# Possession-boundary analysis jobs, keyed by source video path
+suggestion_jobs = {}
+suggestion_lock = threading.Lock()
+
 def time_to_seconds(time_str):
     """Convert HH:MM:SS or MM:SS to total seconds"""
     parts = time_str.strip().split(':')
@@ -308,6 +316,9 @@ def extract_clip():
             "created_at": clip_data["createdAt"],
         }
         upsert_clip(db_record)
+
+        # Poster + sprite sheet are built in the background so this response isn't delayed
+        submit_thumbnails(output_path)
         
         print(f"✅ Clip extracted: {filename}")
         return jsonify({"ok": True, "clip_id": clip_id, "filename": filename, "path": str(output_path)})
@@ -316,6 +327,69 @@ def extract_clip():
         print(f"❌ Error: {str(e)}")
         return jsonify({"ok": False, "error": str(e)}), 500
 
+def suggestions_file(video_path):
+    return SUGGESTIONS_DIR / f"{Path(video_path).stem}.json"
+
+def load_suggestions(video_path):
+    """Cached analysis for a video, if it is newer than the video itself"""
+    cached = suggestions_file(video_path)
+    if cached.exists() and cached.stat().st_mtime >= os.path.getmtime(video_path):
+        with open(cached, 'r') as f:
+            return json.load(f)
+    return None
+
+def run_suggestions(video_path):
+    from possession_segmenter import suggest_possessions
+
+    try:
+        result = suggest_possessions(Path(video_path))
+        SUGGESTIONS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(suggestions_file(video_path), 'w') as f:
+            json.dump(result, f, indent=2)
+        job = {"status": "done", "result": result}
+        print(f"✅ {len(result['possessions'])} possessions suggested for {Path(video_path).name} "
+              f"({result['realtime_factor']}x real time)")
+    except Exception as e:
+        print(f"❌ Possession analysis failed: {str(e)}")
+        job = {"status": "error", "error": str(e)}
+    with suggestion_lock:
+        suggestion_jobs[video_path] = job
+
+@app.route("/suggest_possessions", methods=["GET", "POST", "OPTIONS"])
+def suggest_possessions_route():
+    """
+    POST starts possession-boundary analysis of the loaded video (or body.video_path) in the background;
+    GET returns its status and, once done, the suggested possessions for bulk acceptance.
+    """
+    if request.method == "OPTIONS":
+        return jsonify({"ok": True})
+
+    try:
+        data = request.get_json(silent=True) or {}
+        video_path = data.get("video_path") or request.args.get("video_path") or current_video_path
+        if not video_path or not os.path.exists(video_path):
+            return jsonify({"ok": False, "error": "No video file loaded. Load a video first."}), 400
+
+        force = request.method == "POST" and bool(data.get("force"))
+        with suggestion_lock:
+            job = suggestion_jobs.get(video_path)
+            if job is None and not force:
+                cached = load_suggestions(video_path)
+                if cached:
+                    job = suggestion_jobs[video_path] = {"status": "done", "result": cached}
+            if request.method == "POST" and (job is None or force or job["status"] == "error"):
+                if not job or job["status"] != "running":
+                    job = suggestion_jobs[video_path] = {"status": "running"}
+                    threading.Thread(target=run_suggestions, args=(video_path,), daemon=True).start()
+        job = job or {"status": "idle"}
+
+        status_code = 202 if job["status"] == "running" else 200
+        return jsonify({"ok": job["status"] != "error", "video_path": video_path, **job}), status_code
+
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({"ok": False, "error": str(e)}), 500
+
 @app.route("/get_clips", methods=["GET"])
 def get_clips():
     """Get all clips metadata"""
@@ -335,4 +409,5 @@ def health():
     })
 
 if __name__ == "__main__":
+    init_db()
     app.run(host="127.0.0.1", port=5002, debug=False)
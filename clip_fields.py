@@ -0,0 +1,76 @@
+"""
+Typed shadow values for clip columns stored as TEXT
+shot_x/shot_y and start_time/end_time are kept as the strings the tagger sent;
+these helpers derive the numeric copies (REAL columns) that queries and indexes use.
+"""
+from typing import Any, Dict, Optional
+
+# text column -> typed shadow column
+TYPED_COLUMNS = {
+    "start_time": "start_seconds",
+    "end_time": "end_seconds",
+    "shot_x": "shot_x_num",
+    "shot_y": "shot_y_num",
+}
+
+# INTEGER clip columns; query-string filter values arrive as text and are converted
+INTEGER_COLUMNS = ("game_id", "quarter", "possession", "points")
+
+
+def parse_float(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        text = str(value).strip()
+        return float(text) if text else None
+    except ValueError:
+        return None
+
+
+def parse_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def filter_value(column: str, value: Any) -> Any:
+    """
+    `value` typed for `column = %s` on Postgres: an int for INTEGER_COLUMNS (None when
+    it isn't a whole number, which matches nothing), else text. Binding the column's
+    own type instead of casting the column keeps its indexes usable.
+    """
+    return parse_int(value) if column in INTEGER_COLUMNS else str(value)
+
+
+def parse_seconds(value: Any) -> Optional[float]:
+    """'HH:MM:SS', 'MM:SS', 'SS' or a number -> seconds"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    if not text:
+        return None
+    total = 0.0
+    try:
+        for part in text.split(":"):
+            total = total * 60 + float(part)
+    except ValueError:
+        return None
+    return total
+
+
+def typed_values(clip: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    return {
+        "start_seconds": parse_seconds(clip.get("start_time")),
+        "end_seconds": parse_seconds(clip.get("end_time")),
+        "shot_x_num": parse_float(clip.get("shot_x")),
+        "shot_y_num": parse_float(clip.get("shot_y")),
+    }
@@ -0,0 +1,303 @@
+"""
+Clips/ garbage collection and integrity checks
+Walks Clips/ once with os.scandir and compares it with every file reference
+in the clips table (fetched in one query) and in Clips/clips_metadata.json,
+which the extractor writes before the row exists:
+  orphans  - extracted clips (…_YYYYmmdd_HHMMSS.mp4) nothing points at, plus their
+             poster/sprite JPEGs and HLS renditions; removable
+  derived  - thumbnails / HLS folders whose clip file is gone; removable
+  missing  - rows whose clip file is not on disk
+  corrupt  - files whose size or SHA-256 no longer matches the manifest
+Full-game source videos and anything not named like an extracted clip are
+never deleted, only listed as unreferenced. Files modified in the last
+MIN_AGE_SECONDS are left alone (listed as recent): an extraction or thumbnail
+render may still be writing them.
+
+The manifest (data/clip_manifest.json) records size, mtime and SHA-256 per clip
+so unchanged files are not re-hashed, and the hash last uploaded to R2 so deploy
+can skip files the bucket already has.
+
+    python clip_gc.py                 # report
+    python clip_gc.py --delete        # remove orphans
+    python clip_gc.py --verify        # re-hash every clip against the manifest
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from media_files import is_content_addressed
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+MANIFEST_PATH = PROJECT_ROOT / "data" / "clip_manifest.json"
+VIDEO_SUFFIXES = {'.mp4', '.mov', '.m4v', '.webm'}
+# Poster/sprite JPEGs from clip_thumbnails, plus temp files left by interrupted writes
+# (<poster>.<random>.part.jpg; older builds used <poster>.part.jpg)
+DERIVED_SUFFIXES = ('.thumb.jpg', '.sprite.jpg')
+PARTIAL_SUFFIX = '.part.jpg'
+METADATA_NAME = 'clips_metadata.json'
+KEEP_FILES = {METADATA_NAME}
+MIN_AGE_SECONDS = float(os.getenv('CLIP_GC_MIN_AGE_SECONDS', '3600'))
+HLS_DIRNAME = 'hls'
+HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> Dict[str, Dict[str, Any]]:
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest: Dict[str, Dict[str, Any]], path: Path = MANIFEST_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def manifest_entry(manifest: Dict[str, Dict[str, Any]], path: Path, stat: Optional[os.stat_result] = None,
+                   verify: bool = False) -> Dict[str, Any]:
+    """Current manifest entry for `path`, hashing only when size/mtime changed (or verify)"""
+    stat = stat or path.stat()
+    entry = manifest.get(path.name)
+    unchanged = entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+    if unchanged and not verify:
+        return entry
+    sha = file_sha256(path)
+    updated = {**(entry or {}), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha}
+    if unchanged and entry.get('sha256') != sha:
+        updated['corrupt'] = True
+    else:
+        updated.pop('corrupt', None)
+    manifest[path.name] = updated
+    return updated
+
+
+def needs_upload(manifest: Dict[str, Dict[str, Any]], path: Path) -> bool:
+    entry = manifest_entry(manifest, path)
+    return entry.get('uploaded_sha256') != entry['sha256']
+
+
+def mark_uploaded(manifest: Dict[str, Dict[str, Any]], path: Path) -> None:
+    entry = manifest_entry(manifest, path)
+    entry['uploaded_sha256'] = entry['sha256']
+
+
+def needs_hls_upload(manifest: Dict[str, Dict[str, Any]], path: Path) -> bool:
+    """True until the HLS ladder built from this exact MP4 has been uploaded"""
+    entry = manifest_entry(manifest, path)
+    return entry.get('hls_uploaded_sha256') != entry['sha256']
+
+
+def mark_hls_uploaded(manifest: Dict[str, Dict[str, Any]], path: Path) -> None:
+    entry = manifest_entry(manifest, path)
+    entry['hls_uploaded_sha256'] = entry['sha256']
+
+
+def _derived_owner(name: str) -> Optional[str]:
+    """Stem of the clip a derived file belongs to"""
+    candidates = [name]
+    if name.endswith(PARTIAL_SUFFIX):
+        base = name[:-len(PARTIAL_SUFFIX)]
+        candidates = [base, base.rsplit('.', 1)[0]]
+    for candidate in candidates:
+        for suffix in DERIVED_SUFFIXES:
+            if candidate.endswith(suffix):
+                return candidate[:-len(suffix)]
+    return None
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                total += _dir_size(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
+def referenced_names(rows: Iterable[Dict[str, Any]]) -> set:
+    names = set()
+    for row in rows:
+        for key in ('filename', 'path', 'source_video'):
+            value = row.get(key)
+            if value:
+                names.add(os.path.basename(str(value).replace('\\', '/')))
+    return names
+
+
+def metadata_refs(clips_dir: Path) -> List[Dict[str, Any]]:
+    """Clip entries from clips_metadata.json (empty if it is missing or unreadable)"""
+    try:
+        with open(clips_dir / METADATA_NAME, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    clips = data.get('clips', []) if isinstance(data, dict) else data
+    return [clip for clip in clips if isinstance(clip, dict)]
+
+
+def scan(clips_dir: Path, rows: List[Dict[str, Any]], manifest: Dict[str, Dict[str, Any]],
+         verify: bool = False, extra_refs: Iterable[Dict[str, Any]] = (),
+         min_age: float = MIN_AGE_SECONDS) -> Dict[str, Any]:
+    """
+    Classify everything in `clips_dir` against DB rows (plus `extra_refs`, e.g. the
+    metadata file's entries); updates `manifest` in place
+    """
+    referenced = referenced_names(rows) | referenced_names(extra_refs)
+    cutoff = time.time() - min_age
+    videos: Dict[str, os.DirEntry] = {}
+    derived: Dict[str, List[os.DirEntry]] = {}
+    hls_dirs: Dict[str, os.DirEntry] = {}
+    other: List[str] = []
+
+    with os.scandir(clips_dir) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name == HLS_DIRNAME:
+                    with os.scandir(entry.path) as renditions:
+                        hls_dirs.update({r.name: r for r in renditions if r.is_dir(follow_symlinks=False)})
+                continue
+            if not entry.is_file(follow_symlinks=False) or entry.name in KEEP_FILES:
+                continue
+            owner = _derived_owner(entry.name)
+            if owner is not None:
+                derived.setdefault(owner, []).append(entry)
+            elif os.path.splitext(entry.name)[1].lower() in VIDEO_SUFFIXES:
+                videos[entry.name] = entry
+            else:
+                other.append(entry.name)
+
+    report: Dict[str, Any] = {
+        'orphans': [], 'derived_orphans': [], 'unreferenced': [], 'missing': [], 'corrupt': [],
+        'recent': [], 'referenced_files': 0, 'referenced_bytes': 0, 'reclaimable_bytes': 0,
+        'other': sorted(other),
+    }
+    for name, entry in videos.items():
+        stat = entry.stat(follow_symlinks=False)
+        stem = os.path.splitext(name)[0]
+        if name in referenced:
+            report['referenced_files'] += 1
+            report['referenced_bytes'] += stat.st_size
+            if manifest_entry(manifest, Path(entry.path), stat, verify).get('corrupt'):
+                report['corrupt'].append(name)
+        elif stat.st_mtime > cutoff:
+            report['recent'].append(name)
+        elif is_content_addressed(name):
+            owned = {d.name: d.stat(follow_symlinks=False).st_size for d in derived.get(stem, [])}
+            if stem in hls_dirs:
+                owned[f"{HLS_DIRNAME}/{stem}"] = _dir_size(hls_dirs[stem].path)
+            size = stat.st_size + sum(owned.values())
+            report['orphans'].append({'file': name, 'bytes': size, 'owned': sorted(owned)})
+            report['reclaimable_bytes'] += size
+            manifest.pop(name, None)
+        else:
+            # A source video or hand-placed file: listed, never deleted
+            report['unreferenced'].append(name)
+
+    video_stems = {os.path.splitext(n)[0] for n in videos}
+    for stem, entries in derived.items():
+        if stem not in video_stems:
+            for d in entries:
+                stat = d.stat(follow_symlinks=False)
+                if stat.st_mtime > cutoff:
+                    report['recent'].append(d.name)
+                    continue
+                size = stat.st_size
+                report['derived_orphans'].append({'file': d.name, 'bytes': size})
+                report['reclaimable_bytes'] += size
+    for stem, d in hls_dirs.items():
+        if stem not in video_stems:
+            if d.stat(follow_symlinks=False).st_mtime > cutoff:
+                report['recent'].append(f"{HLS_DIRNAME}/{d.name}")
+                continue
+            size = _dir_size(d.path)
+            report['derived_orphans'].append({'file': f"{HLS_DIRNAME}/{d.name}", 'bytes': size})
+            report['reclaimable_bytes'] += size
+
+    for row in rows:
+        filename = row.get('filename')
+        if filename and filename not in videos:
+            report['missing'].append({'id': row['id'], 'filename': filename})
+
+    # Drop manifest entries for files no longer on disk
+    for name in [n for n in manifest if n not in videos]:
+        manifest.pop(name)
+    return report
+
+
+def delete_orphans(clips_dir: Path, report: Dict[str, Any]) -> int:
+    """Remove everything listed as orphaned in `report`; returns bytes freed"""
+    freed = 0
+    for orphan in report['orphans']:
+        for name in [orphan['file'], *orphan['owned']]:
+            _remove(clips_dir / name)
+        freed += orphan['bytes']
+    for orphan in report['derived_orphans']:
+        _remove(clips_dir / orphan['file'])
+        freed += orphan['bytes']
+    return freed
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def run(delete: bool = False, verify: bool = False, clips_dir: Optional[Path] = None) -> Dict[str, Any]:
+    from analytics_db import fetch_file_refs
+    from cloud_config import CLIPS_DIR
+
+    clips_dir = Path(clips_dir or CLIPS_DIR)
+    manifest = load_manifest()
+    report = scan(clips_dir, fetch_file_refs(), manifest, verify=verify, extra_refs=metadata_refs(clips_dir))
+    report['deleted_bytes'] = delete_orphans(clips_dir, report) if delete else 0
+    save_manifest(manifest)
+    return report
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find (and optionally delete) orphaned clip files")
+    parser.add_argument('--delete', action='store_true', help="remove orphaned clips and derived files")
+    parser.add_argument('--verify', action='store_true', help="re-hash every referenced clip")
+    parser.add_argument('--json', action='store_true', help="print the full report as JSON")
+    args = parser.parse_args()
+
+    result = run(delete=args.delete, verify=args.verify)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"📁 {result['referenced_files']} referenced clips ({format_bytes(result['referenced_bytes'])})")
+        print(f"🗑️  {len(result['orphans'])} orphaned clips, {len(result['derived_orphans'])} orphaned derived files "
+              f"({format_bytes(result['reclaimable_bytes'])} reclaimable)")
+        print(f"❓ {len(result['missing'])} rows with missing files, {len(result['corrupt'])} corrupt files, "
+              f"{len(result['unreferenced'])} unreferenced non-clip videos, "
+              f"{len(result['recent'])} recent files skipped")
+        if args.delete:
+            print(f"✅ Freed {format_bytes(result['deleted_bytes'])}")
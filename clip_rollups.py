@@ -0,0 +1,150 @@
+"""
+Materialised defensive analytics rollups
+clip_rollups holds one row per distinct (game, opponent, situation, coverage,
+ball screen coverage, breakdown) combination with possession, points, stop and
+breakdown counts, so report queries sum a few hundred rollup rows instead of
+scanning every tagged possession. Rows for a game are rebuilt from clips
+whenever one of its clips is written or the game is deleted.
+
+Stop and breakdown rules mirror detectStop/detectBreakdown in
+ui/src/components/dashboardUtils.ts.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from clip_fields import filter_value
+
+SQLITE = "sqlite"
+POSTGRES = "postgresql"
+
+DIMENSIONS = ("game_id", "opponent", "situation", "coverage", "ball_screen", "breakdown")
+MEASURES = ("possessions", "points", "stops", "breakdowns", "fg_attempts", "fg_makes", "turnovers")
+
+STOP_KEYWORDS = ("turnover", "miss", "steal", "charge", "block", "offensive foul")
+MADE_RESULTS = ("make", "made fg")
+MISSED_RESULTS = ("miss", "missed fg")
+
+# Named report views served under /api/analytics/<view>
+VIEWS = {
+    "summary": (),
+    "games": ("game_id", "opponent"),
+    "opponents": ("opponent",),
+    "coverage": ("coverage",),
+    "ball-screen": ("ball_screen",),
+    "breakdown": ("breakdown",),
+    "situation": ("situation",),
+}
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS clip_rollups (
+        game_id INTEGER,
+        opponent TEXT,
+        situation TEXT,
+        coverage TEXT,
+        ball_screen TEXT,
+        breakdown TEXT,
+        possessions INTEGER NOT NULL,
+        points INTEGER NOT NULL,
+        stops INTEGER NOT NULL,
+        breakdowns INTEGER NOT NULL,
+        fg_attempts INTEGER NOT NULL,
+        fg_makes INTEGER NOT NULL,
+        turnovers INTEGER NOT NULL
+    )
+"""
+CREATE_INDEX = "CREATE INDEX IF NOT EXISTS idx_rollups_game ON clip_rollups (game_id)"
+
+
+def _placeholder(dialect: str) -> str:
+    return "?" if dialect == SQLITE else "%s"
+
+
+def _quoted(values: Iterable[str]) -> str:
+    return ", ".join(f"'{v}'" for v in values)
+
+
+def _select_sql(dialect: str) -> str:
+    # psycopg treats a bare % as a placeholder marker
+    pct = "%" if dialect == SQLITE else "%%"
+    result = "LOWER(COALESCE(result, ''))"
+    shot = "LOWER(TRIM(COALESCE(shot_result, '')))"
+    keyword_hit = " OR ".join(f"{result} LIKE '{pct}{kw}{pct}'" for kw in STOP_KEYWORDS)
+    return f"""
+        SELECT {", ".join(DIMENSIONS)},
+               COUNT(*),
+               COALESCE(SUM(points), 0),
+               SUM(CASE WHEN points IS NOT NULL THEN CASE WHEN points <= 0 THEN 1 ELSE 0 END
+                        WHEN {keyword_hit} THEN 1 ELSE 0 END),
+               SUM(CASE WHEN LOWER(TRIM(COALESCE(breakdown, ''))) LIKE 'y{pct}' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {shot} IN ({_quoted(MADE_RESULTS + MISSED_RESULTS)}) THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {shot} IN ({_quoted(MADE_RESULTS)}) THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {result} LIKE '{pct}turnover{pct}' THEN 1 ELSE 0 END)
+        FROM clips
+    """
+
+
+def _insert_sql(dialect: str, where: str = "") -> str:
+    return (
+        f"INSERT INTO clip_rollups ({', '.join(DIMENSIONS + MEASURES)}) "
+        f"{_select_sql(dialect)} {where} GROUP BY {', '.join(DIMENSIONS)}"
+    )
+
+
+def _same_game(dialect: str, game_id: Any) -> tuple:
+    # Plain equality so idx_clips_game / idx_rollups_game apply (IS NOT DISTINCT FROM can't use them)
+    if game_id is None:
+        return "game_id IS NULL", ()
+    return f"game_id = {_placeholder(dialect)}", (game_id,)
+
+
+def rebuild(cur, dialect: str) -> None:
+    """Recompute every rollup row"""
+    cur.execute("DELETE FROM clip_rollups")
+    cur.execute(_insert_sql(dialect))
+
+
+def refresh_games(cur, dialect: str, game_ids: Iterable[Any]) -> None:
+    """Recompute rollup rows for the given games (None is the untagged-game bucket)"""
+    for game_id in dict.fromkeys(game_ids):
+        match, params = _same_game(dialect, game_id)
+        cur.execute(f"DELETE FROM clip_rollups WHERE {match}", params)
+        cur.execute(_insert_sql(dialect, f"WHERE {match}"), params)
+
+
+def _rates(row: Dict[str, Any]) -> Dict[str, Any]:
+    possessions = row["possessions"] or 0
+    attempts = row["fg_attempts"] or 0
+    row["points_per_possession"] = round(row["points"] / possessions, 3) if possessions else 0
+    row["stop_rate"] = round(row["stops"] / possessions, 3) if possessions else 0
+    row["breakdown_rate"] = round(row["breakdowns"] / possessions, 3) if possessions else 0
+    row["turnover_rate"] = round(row["turnovers"] / possessions, 3) if possessions else 0
+    row["fg_pct"] = round(row["fg_makes"] / attempts, 3) if attempts else None
+    return row
+
+
+def query(cur, dialect: str, group_by: Sequence[str] = (),
+          filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Sum rollups grouped by `group_by` (a subset of DIMENSIONS), filtered on dimension values"""
+    unknown = [col for col in group_by if col not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+
+    ph = _placeholder(dialect)
+    clauses, params = [], []
+    for col in DIMENSIONS:
+        value = (filters or {}).get(col)
+        if value is None or value == "":
+            continue
+        if dialect == POSTGRES:
+            value = filter_value(col, value)
+            if value is None:
+                clauses.append("FALSE")
+                continue
+        clauses.append(f"{col} = {ph}")
+        params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    sums = ", ".join(f"COALESCE(SUM({m}), 0) AS {m}" for m in MEASURES)
+    select = ", ".join([*group_by, sums])
+    group = f"GROUP BY {', '.join(group_by)}" if group_by else ""
+    cur.execute(f"SELECT {select} FROM clip_rollups {where} {group} ORDER BY possessions DESC", params)
+    return [_rates(dict(row)) for row in cur.fetchall() if row["possessions"]]
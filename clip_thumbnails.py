@@ -0,0 +1,129 @@
+"""
+Poster frames and scrub sprite sheets for extracted clips
+Each clip gets two small JPEGs written next to it in Clips/:
+  <stem>.thumb.jpg   - representative poster frame (THUMB_WIDTH wide)
+  <stem>.sprite.jpg  - SPRITE_COLUMNS x SPRITE_ROWS grid, one tile every SPRITE_INTERVAL seconds
+Generation runs through ffmpeg in a small background worker pool so extraction
+requests never wait on it.
+"""
+import os
+import subprocess
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+THUMB_WIDTH = 320
+SPRITE_TILE_WIDTH = 160
+SPRITE_TILE_HEIGHT = 90
+SPRITE_COLUMNS = 10
+SPRITE_ROWS = 6
+SPRITE_INTERVAL = 1  # seconds between sprite tiles
+FFMPEG_TIMEOUT = 120
+
+THUMBNAIL_KINDS = ('poster', 'sprite')
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def thumbnail_path(clip_path: Path, kind: str = 'poster') -> Path:
+    suffix = '.thumb.jpg' if kind == 'poster' else '.sprite.jpg'
+    return clip_path.with_name(clip_path.stem + suffix)
+
+
+def sprite_info() -> Dict[str, int]:
+    """Layout the UI needs to pick the right tile for a scrub position"""
+    return {
+        'interval': SPRITE_INTERVAL,
+        'columns': SPRITE_COLUMNS,
+        'rows': SPRITE_ROWS,
+        'tile_width': SPRITE_TILE_WIDTH,
+        'tile_height': SPRITE_TILE_HEIGHT,
+    }
+
+
+def _run_ffmpeg(args) -> None:
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', *args],
+        capture_output=True, text=True, timeout=FFMPEG_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {result.stderr.strip()}")
+
+
+def _write_atomic(target: Path, build) -> None:
+    # Write to a temp name first so a half-written JPEG is never served. The name is
+    # unique per writer: the worker pool and the thumb route can build the same file
+    # at once, and a shared name would let one publish the other's partial output.
+    fd, name = tempfile.mkstemp(dir=target.parent, prefix=target.name + '.', suffix='.part.jpg')
+    os.close(fd)
+    tmp = Path(name)
+    try:
+        build(tmp)
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def generate_thumbnails(clip_path: Path, force: bool = False) -> Dict[str, str]:
+    """Create any missing poster/sprite for `clip_path`; returns kind -> path"""
+    clip_path = Path(clip_path)
+    poster = thumbnail_path(clip_path, 'poster')
+    sprite = thumbnail_path(clip_path, 'sprite')
+
+    if force or not poster.exists():
+        _write_atomic(poster, lambda out: _run_ffmpeg([
+            '-i', str(clip_path),
+            '-vf', f'thumbnail=50,scale={THUMB_WIDTH}:-2',
+            '-frames:v', '1', '-q:v', '4', str(out),
+        ]))
+
+    if force or not sprite.exists():
+        tile = (
+            f'fps=1/{SPRITE_INTERVAL},'
+            f'scale={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:force_original_aspect_ratio=decrease,'
+            f'pad={SPRITE_TILE_WIDTH}:{SPRITE_TILE_HEIGHT}:(ow-iw)/2:(oh-ih)/2,'
+            f'tile={SPRITE_COLUMNS}x{SPRITE_ROWS}'
+        )
+        _write_atomic(sprite, lambda out: _run_ffmpeg([
+            '-i', str(clip_path), '-an',
+            '-vf', tile,
+            '-frames:v', '1', '-q:v', '5', str(out),
+        ]))
+
+    return {'poster': str(poster), 'sprite': str(sprite)}
+
+
+def _log_failure(clip_path: Path, future: Future) -> None:
+    exc = future.exception()
+    if exc:
+        print(f"⚠️  Thumbnail generation failed for {clip_path.name}: {exc}")
+
+
+def submit_thumbnails(clip_path: Path, force: bool = False) -> Future:
+    """Queue thumbnail generation on the shared worker pool"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('THUMBNAIL_WORKERS', '2')),
+            thread_name_prefix='thumbnails',
+        )
+    clip_path = Path(clip_path)
+    future = _executor.submit(generate_thumbnails, clip_path, force)
+    future.add_done_callback(lambda f: _log_failure(clip_path, f))
+    return future
+
+
+if __name__ == '__main__':
+    # Backfill thumbnails for every clip already in Clips/
+    import sys
+    from cloud_config import CLIPS_DIR
+
+    force = '--force' in sys.argv
+    clips = sorted(p for p in CLIPS_DIR.glob('*.mp4') if p.is_file())
+    print(f"🖼️  Generating thumbnails for {len(clips)} clips...")
+    futures = [submit_thumbnails(p, force=force) for p in clips]
+    failed = sum(1 for f in futures if f.exception())
+    print(f"✅ Done ({len(clips) - failed} ok, {failed} failed)")
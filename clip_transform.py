@@ -0,0 +1,271 @@
+"""
+Clip row -> API dict
+The output fields are declared once as specs: an output key, the source keys to
+try in order (`a or b or ...`, as the tagger has used several spellings over
+time) and an optional default. For each distinct row shape (the tuple of keys
+a query returns) the specs are compiled into one Python function. In that
+function, keys the shape doesn't have are dropped from the fallback chains,
+and the rest become plain r['key'] lookups. DB rows then cost one dict literal
+each, while metadata-file clips keep their alias fallbacks.
+
+Video and thumbnail URLs check file existence against a listing of Clips/
+that is refreshed only when the directory changes, instead of stat-ing files
+per row (both are signed, since <video>/<img> cannot send a Bearer header), and
+decoded actions_json lists are memoised by their JSON text (treat the returned
+`actions` as read-only).
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from clip_actions import normalize_actions
+from clip_thumbnails import thumbnail_path
+from cloud_config import CLIPS_DIR, is_cloud
+from media_urls import presign_r2_url, sign_path
+
+
+class Field(NamedTuple):
+    name: str
+    sources: Tuple[str, ...]
+    default: Any = None
+
+
+class Derived(NamedTuple):
+    """Output computed by `template`, whose {0}, {1}... are fallback chains over `args`"""
+    name: str
+    template: str
+    args: Tuple[Tuple[str, ...], ...]
+
+
+def _same(*names: str) -> List[Field]:
+    return [Field(name, (name,)) for name in names]
+
+
+DB_LOCATION_CODE = ('location_code', 'location', 'game_location', 'locationCode', 'Location Code')
+DB_LOCATION_DISPLAY = ('location_display', 'location', 'locationLabel', 'locationDisplay', 'Location')
+
+DB_FIELDS = [
+    *_same('id', 'filename', 'source_video', 'path'),
+    Derived('video_url', "_video_url({0}, {1})", (('filename',), ('path',))),
+    Field('hls_url', ('hls_url',)),
+    Derived('thumbnail_url', "_thumb_url({0}, {1})", (('id',), ('filename',))),
+    *_same('game_id', 'opponent', 'game_score', 'quarter', 'possession', 'situation', 'formation',
+           'play_name', 'scout_coverage'),
+    Field('play_trigger', ('play_trigger', 'action_trigger')),
+    *_same('action_types', 'action_sequence', 'coverage', 'ball_screen', 'off_ball_screen', 'help_rotation',
+           'disruption', 'breakdown', 'result', 'paint_touch', 'shooter', 'shot_location', 'contest', 'rebound',
+           'points', 'has_shot', 'shot_x', 'shot_y', 'shot_result', 'player_designation', 'notes',
+           'start_time', 'end_time'),
+    Field('location', DB_LOCATION_CODE, ''),
+    Field('location_display', DB_LOCATION_DISPLAY, ''),
+    Field('location_code', DB_LOCATION_CODE, ''),
+    Field('game_location', DB_LOCATION_CODE, ''),
+    Field('locationLabel', DB_LOCATION_DISPLAY, ''),
+    Derived('actions', "_actions({0})", (('actions', 'actions_json'),)),
+]
+
+META_LOCATION_CODE = ('location_code', 'locationCode', 'location', 'Location Code', 'game_location', 'gameLocation')
+META_LOCATION_DISPLAY = ('location_display', 'locationDisplay', 'Location', 'location_label', 'locationLabel',
+                         'Game Location')
+
+# clips_metadata.json entries use the tagger's camelCase names
+META_FIELDS = [
+    *_same('id', 'filename'),
+    Derived('video_url', "{0} or _video_url({1}, {2})", (('video_url',), ('filename',), ('path', 'video_path'))),
+    Field('game_num', ('gameId',)),
+    *_same('opponent', 'quarter', 'possession', 'situation'),
+    Field('offensive_formation', ('formation',)),
+    Field('play_name', ('playName',)),
+    Field('scout_coverage', ('scoutCoverage',)),
+    Field('play_trigger', ('playTrigger', 'Play Trigger', 'actionTrigger', 'Action Trigger')),
+    Field('action_types', ('actionTypes',)),
+    Field('action_sequence', ('actionSequence',)),
+    Field('defensive_coverage', ('coverage',)),
+    Field('ball_screen_coverage', ('ballScreen',)),
+    Field('offball_screen_coverage', ('offBallScreen',)),
+    Field('help_rotation', ('helpRotation',)),
+    Field('defensive_disruption', ('disruption',)),
+    Field('defensive_breakdown', ('breakdown',)),
+    Field('play_result', ('result',)),
+    Field('paint_touches', ('paintTouch',)),
+    Field('shooter_designation', ('shooter',)),
+    Field('shot_location', ('shotLocation',)),
+    Field('shot_contest', ('contest',)),
+    Field('rebound_outcome', ('rebound',)),
+    Field('points', ('points',)),
+    Field('has_shot', ('hasShot',)),
+    Field('shot_x', ('shotX',)),
+    Field('shot_y', ('shotY',)),
+    Field('shot_result', ('shotResult',)),
+    Field('notes', ('notes',)),
+    Field('start_time', ('startTime',)),
+    Field('end_time', ('End Time', 'endTime')),
+    Field('location', META_LOCATION_CODE, ''),
+    Field('location_display', META_LOCATION_DISPLAY, ''),
+    Field('location_code', META_LOCATION_CODE, ''),
+    Field('game_location', META_LOCATION_CODE, ''),
+    Field('locationLabel', META_LOCATION_DISPLAY, ''),
+    Derived('actions', "_actions({0})", (('actions', 'actions_json'),)),
+]
+
+
+class ClipFiles:
+    """Names in Clips/, re-listed only when the directory's mtime changes"""
+
+    def __init__(self, clips_dir=CLIPS_DIR):
+        self.clips_dir = clips_dir
+        self._names = frozenset()
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def names(self) -> frozenset:
+        try:
+            mtime = os.stat(self.clips_dir).st_mtime_ns
+        except OSError:
+            return frozenset()
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with os.scandir(self.clips_dir) as it:
+                        self._names = frozenset(entry.name for entry in it)
+                    self._mtime = mtime
+        return self._names
+
+
+clip_files = ClipFiles()
+
+
+def derive_video_url(filename, fallback=None, names: Optional[frozenset] = None):
+    """R2/absolute URL as stored (presigned when enabled), else a signed local URL if the file exists"""
+    names = clip_files.names() if names is None else names
+    for raw in (filename, fallback):
+        if not raw:
+            continue
+        # If already an R2 URL (or any absolute URL), return it unchanged
+        raw_str = str(raw)
+        if raw_str.startswith(('https://', 'http://')):
+            return presign_r2_url(raw_str) if is_cloud() else raw_str
+        # Otherwise check local file system
+        name = os.path.basename(raw_str.rstrip('/'))
+        if name in names:
+            # Signed so <video> can stream it without a Bearer header
+            return sign_path(f"/legacy/Clips/{name}")
+    return None
+
+
+_actions_cache: Dict[str, List[Dict[str, str]]] = {}
+ACTIONS_CACHE_SIZE = 100_000
+
+
+def _actions(raw):
+    if not isinstance(raw, str):
+        return normalize_actions(raw)
+    actions = _actions_cache.get(raw)
+    if actions is None:
+        if len(_actions_cache) >= ACTIONS_CACHE_SIZE:
+            _actions_cache.clear()
+        actions = _actions_cache[raw] = normalize_actions(raw)
+    return actions
+
+
+def derive_thumbnail_url(clip_id, filename, names: Optional[frozenset] = None):
+    """
+    Signed /api/clip/<id>/thumb when the poster frame or the clip itself is in Clips/
+    (the route builds a missing poster on first request), else None
+    """
+    if not clip_id or not filename:
+        return None
+    names = clip_files.names() if names is None else names
+    name = os.path.basename(str(filename).replace('\\', '/'))
+    if name not in names and thumbnail_path(Path(name)).name not in names:
+        return None
+    return sign_path(f"/api/clip/{clip_id}/thumb")
+
+
+def _chain(sources: Tuple[str, ...], present: set, default: Any = None) -> str:
+    """Expression equal to `r.get(s1) or r.get(s2) ... [or default]` for rows with keys `present`"""
+    parts = [f"r[{key!r}]" for key in sources if key in present]
+    if default is not None:
+        parts.append(repr(default))
+    elif sources[-1] not in present:
+        # r.get() of a missing last key is what the chain falls through to
+        parts.append('None')
+    return ' or '.join(parts)
+
+
+def compile_plan(fields: List, keys: Iterable[str]) -> Callable[[Dict[str, Any], Callable], Dict[str, Any]]:
+    """One function transforming rows that have exactly `keys`"""
+    present = set(keys)
+    expressions = []
+    for spec in fields:
+        if isinstance(spec, Derived):
+            expr = spec.template.format(*(_chain(args, present) for args in spec.args))
+        else:
+            expr = _chain(spec.sources, present, spec.default)
+        expressions.append((spec.name, expr))
+
+    # Chains used by several outputs (the location aliases) are evaluated once
+    counts: Dict[str, int] = {}
+    for _, expr in expressions:
+        counts[expr] = counts.get(expr, 0) + 1
+    hoisted = {expr: f"v{i}" for i, expr in enumerate(e for e, n in counts.items() if n > 1 and ' or ' in e)}
+
+    lines = ["def plan(r, _video_url, _thumb_url):"]
+    lines += [f"    {name} = {expr}" for expr, name in hoisted.items()]
+    lines.append("    return {")
+    lines += [f"        {name!r}: {hoisted.get(expr, expr)}," for name, expr in expressions]
+    lines.append("    }")
+    namespace = {'_actions': _actions}
+    exec(compile("\n".join(lines), "<clip_transform plan>", "exec"), namespace)
+    return namespace['plan']
+
+
+_plans: Dict[Tuple[int, Tuple[str, ...]], Callable] = {}
+_MAX_PLANS = 256
+
+
+def _plan_for(fields: List, keys: Tuple[str, ...]) -> Callable:
+    cache_key = (id(fields), keys)
+    plan = _plans.get(cache_key)
+    if plan is None:
+        if len(_plans) >= _MAX_PLANS:
+            _plans.clear()
+        plan = _plans[cache_key] = compile_plan(fields, keys)
+    return plan
+
+
+def _transform_all(fields: List, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    names = clip_files.names()
+
+    def video_url(filename, fallback=None):
+        return derive_video_url(filename, fallback, names)
+
+    def thumb_url(clip_id, filename):
+        return derive_thumbnail_url(clip_id, filename, names)
+
+    out = []
+    last_keys, plan = None, None
+    for row in rows:
+        keys = tuple(row)
+        if keys != last_keys:
+            last_keys, plan = keys, _plan_for(fields, keys)
+        out.append(plan(row, video_url, thumb_url))
+    return out
+
+
+def transform_db_clip(clip: Dict[str, Any]) -> Dict[str, Any]:
+    return _plan_for(DB_FIELDS, tuple(clip))(clip, derive_video_url, derive_thumbnail_url)
+
+
+def transform_db_clips(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _transform_all(DB_FIELDS, rows)
+
+
+def transform_clip(clip: Dict[str, Any]) -> Dict[str, Any]:
+    """Transform clip field names to match HTML expectations"""
+    return _plan_for(META_FIELDS, tuple(clip))(clip, derive_video_url, derive_thumbnail_url)
+
+
+def transform_clips(clips: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _transform_all(META_FIELDS, clips)
@@ -2,115 +2,28 @@
 PostgreSQL Database Adapter for Cloud Environment
 Provides same interface as analytics_db.py but uses PostgreSQL
 """
-import psycopg
-from psycopg.rows import dict_row
+import gzip
+import json
+import re
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 from cloud_config import DATABASE_URL
-
-# SQL to create tables (PostgreSQL syntax)
-CREATE_STATEMENTS = [
-    """
-    CREATE TABLE IF NOT EXISTS clips (
-        id TEXT PRIMARY KEY,
-        filename TEXT NOT NULL,
-        path TEXT NOT NULL,
-        source_video TEXT,
-        game_id INTEGER,
-        canonical_game_id TEXT,
-        canonical_clip_id TEXT,
-        opponent TEXT,
-        opponent_slug TEXT,
-        location TEXT,
-        game_score TEXT,
-        quarter INTEGER,
-        possession INTEGER,
-        situation TEXT,
-        formation TEXT,
-        play_name TEXT,
-        scout_coverage TEXT,
-        play_trigger TEXT,
-        action_types TEXT,
-        action_sequence TEXT,
-        coverage TEXT,
-        ball_screen TEXT,
-        off_ball_screen TEXT,
-        help_rotation TEXT,
-        disruption TEXT,
-        breakdown TEXT,
-        result TEXT,
-        paint_touch TEXT,
-        shooter TEXT,
-        shot_location TEXT,
-        contest TEXT,
-        rebound TEXT,
-        points INTEGER,
-        has_shot TEXT,
-        shot_x TEXT,
-        shot_y TEXT,
-        shot_result TEXT,
-        player_designation TEXT,
-        notes TEXT,
-        start_time TEXT,
-        end_time TEXT,
-        actions_json TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_clips_game ON clips (game_id)",
-    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_game ON clips (canonical_game_id)",
-    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_clip ON clips (canonical_clip_id)",
-    """
-    CREATE TABLE IF NOT EXISTS comm_segments (
-        id SERIAL PRIMARY KEY,
-        clip_id TEXT NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
-        start REAL NOT NULL,
-        \"end\" REAL NOT NULL,
-        duration REAL NOT NULL,
-        peak_dbfs REAL,
-        rms REAL,
-        rms_dbfs REAL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_comm_clip ON comm_segments (clip_id)",
-    "CREATE INDEX IF NOT EXISTS idx_comm_start ON comm_segments (clip_id, start)",
-    """
-    CREATE TABLE IF NOT EXISTS delete_requests (
-        id TEXT PRIMARY KEY,
-        requested_by TEXT NOT NULL,
-        item_type TEXT NOT NULL,
-        item_id TEXT NOT NULL,
-        item_name TEXT,
-        reason TEXT,
-        status TEXT DEFAULT 'pending',
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        reviewed_by TEXT,
-        reviewed_at TIMESTAMP
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_delete_requests_status ON delete_requests (status)",
-    """
-    CREATE TABLE IF NOT EXISTS audit_log (
-        id SERIAL PRIMARY KEY,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        username TEXT NOT NULL,
-        action TEXT NOT NULL,
-        item_type TEXT,
-        item_id TEXT,
-        changes JSONB,
-        ip_address TEXT
-    )
-    """,
-    "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log (timestamp DESC)",
-    "CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_log (username)",
-]
+import clip_actions
+import clip_rollups
+from audit_sink import get_sink
+from clip_events import PG_CHANNEL, clip_event
+from clip_fields import filter_value, parse_float, parse_int, typed_values
+import schema_migrations
 
 
 def get_connection():
     """Get PostgreSQL connection with dict cursor"""
+    # Imported on first connection so cloud_db (and its pure helpers) load without the driver
+    import psycopg
+    from psycopg.rows import dict_row
+
     conn = psycopg.connect(DATABASE_URL, row_factory=dict_row)
     return conn
 
@@ -131,10 +44,17 @@ def db_cursor():
 
 
 def init_db() -> None:
-    """Initialize database schema"""
+    """Initialize database schema (light migrations; heavy ones run via run_heavy_migrations)"""
     with db_cursor() as cur:
-        for stmt in CREATE_STATEMENTS:
-            cur.execute(stmt)
+        if schema_migrations.is_current(cur, schema_migrations.POSTGRES):
+            return
+        schema_migrations.migrate(cur, schema_migrations.POSTGRES)
+
+
+def run_heavy_migrations() -> List[int]:
+    """Apply deferred backfills and index builds"""
+    with db_cursor() as cur:
+        return schema_migrations.migrate(cur, schema_migrations.POSTGRES, include_heavy=True)
 
 
 def upsert_clip(clip: Dict[str, Any]) -> None:
@@ -143,6 +63,7 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
     now = datetime.utcnow().isoformat()
     normalized.setdefault("created_at", now)
     normalized["updated_at"] = now
+    normalized.update(typed_values(normalized))
 
     columns = [
         "id", "filename", "path", "source_video", "game_id",
@@ -154,7 +75,8 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
         "shot_location", "contest", "rebound", "points", "has_shot",
         "shot_x", "shot_y", "shot_result", "notes", "start_time",
         "end_time", "created_at", "updated_at", "location", "game_score",
-        "player_designation", "actions_json",
+        "player_designation", "actions_json", "hls_url",
+        "start_seconds", "end_seconds", "shot_x_num", "shot_y_num",
     ]
 
     # PostgreSQL uses %s placeholders instead of ?
@@ -169,7 +91,52 @@ def upsert_clip(clip: Dict[str, Any]) -> None:
             VALUES ({placeholders})
             ON CONFLICT(id) DO UPDATE SET {assignments}
         """
-        cur.execute(sql, values)
+        cur.execute("SELECT game_id FROM clips WHERE id = %s", (normalized.get("id"),))
+        previous = cur.fetchone()
+        cur.execute(sql + " RETURNING game_id", values)
+        games = [cur.fetchone()["game_id"]] + ([previous["game_id"]] if previous else [])
+        clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, games)
+        clip_actions.sync(cur, clip_actions.POSTGRES, normalized.get("id"), normalized.get("actions_json"))
+        notify_clip_change(cur, "upsert", [normalized.get("id")])
+
+
+SHOT_COLUMNS = ("has_shot", "shot_x", "shot_y", "shot_result", "shooter")
+
+
+def update_shot(clip_id: str, fields: Dict[str, Any]) -> int:
+    """Set the given shot columns (SHOT_COLUMNS) and refresh the clip's game rollups"""
+    values = {col: fields[col] for col in SHOT_COLUMNS if col in fields}
+    for col in ("shot_x", "shot_y"):
+        if col in values:
+            values[f"{col}_num"] = parse_float(values[col])
+    values["updated_at"] = datetime.utcnow().isoformat()
+    assignments = ", ".join(f"{col} = %s" for col in values)
+    with db_cursor() as cur:
+        cur.execute(f"UPDATE clips SET {assignments} WHERE id = %s RETURNING game_id", [*values.values(), clip_id])
+        row = cur.fetchone()
+        if row:
+            clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, [row["game_id"]])
+            notify_clip_change(cur, "upsert", [clip_id])
+    return 1 if row else 0
+
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more (and rolls back the write with it)
+NOTIFY_PAYLOAD_BYTES = 7500
+
+
+def notify_clip_change(cur, kind: str, clip_ids: List[str]) -> None:
+    """Queue NOTIFYs for live listeners, ids split to fit the payload limit; delivered on commit"""
+    overhead = len(json.dumps(clip_event(kind, [])).encode())
+    chunk, size = [], overhead
+    for clip_id in map(str, clip_ids):
+        cost = len(json.dumps(clip_id).encode()) + 2
+        if chunk and size + cost > NOTIFY_PAYLOAD_BYTES:
+            cur.execute("SELECT pg_notify(%s, %s)", (PG_CHANNEL, json.dumps(clip_event(kind, chunk))))
+            chunk, size = [], overhead
+        chunk.append(clip_id)
+        size += cost
+    if chunk:
+        cur.execute("SELECT pg_notify(%s, %s)", (PG_CHANNEL, json.dumps(clip_event(kind, chunk))))
 
 
 def fetch_clips() -> List[Dict[str, Any]]:
@@ -189,16 +156,164 @@ def fetch_clip(clip_id: str) -> Optional[Dict[str, Any]]:
         return dict(row) if row else None
 
 
+def _change_seq(cursor: Optional[str]) -> Optional[int]:
+    """The change number in a delta-sync cursor; None for no cursor or an old timestamp one"""
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        return None
+
+
+def fetch_changes(since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rows inserted/updated and ids deleted after the `since` cursor (a change number
+    from clip_change_counter). Without a usable cursor every clip is returned and
+    "full" is set, so the caller replaces its copy. The returned cursor goes back
+    in on the next call.
+    """
+    seq = _change_seq(since)
+    with db_cursor() as cur:
+        # Read the counter first: whatever commits after this is numbered above it
+        cur.execute("SELECT value FROM clip_change_counter WHERE id = 1")
+        latest = cur.fetchone()["value"]
+        if seq is not None and seq > latest:
+            seq = None  # cursor from another database (e.g. before a restore)
+        if seq is not None:
+            cur.execute("SELECT * FROM clips WHERE change_seq > %s ORDER BY change_seq", (seq,))
+            upserts = [dict(row) for row in cur.fetchall()]
+            cur.execute("SELECT clip_id FROM clip_tombstones WHERE change_seq > %s ORDER BY change_seq", (seq,))
+            deleted = [row["clip_id"] for row in cur.fetchall()]
+        else:
+            cur.execute("SELECT * FROM clips ORDER BY change_seq")
+            upserts = [dict(row) for row in cur.fetchall()]
+            deleted = []
+
+    return {
+        "cursor": str(latest),
+        "full": seq is None,
+        "upserts": upserts,
+        "deleted": deleted,
+    }
+
+
+# Columns that callers may filter exports/listings on (whitelisted so they can be interpolated safely)
+FILTER_COLUMNS = (
+    "game_id", "canonical_game_id", "opponent", "quarter", "situation",
+    "coverage", "ball_screen", "result", "has_shot", "player_designation",
+)
+
+
+def _filter_clause(filters: Optional[Dict[str, Any]]) -> tuple:
+    clauses = []
+    params: List[Any] = []
+    for col in FILTER_COLUMNS:
+        value = (filters or {}).get(col)
+        if value is None or value == "":
+            continue
+        value = filter_value(col, value)
+        if value is None:
+            clauses.append("FALSE")  # e.g. game_id=abc matches no clip
+            continue
+        clauses.append(f"{col} = %s")
+        params.append(value)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+
+def clips_query(filters: Optional[Dict[str, Any]] = None) -> tuple:
+    """The iter_clips SELECT and its params (filter columns are indexed by schema_migrations)"""
+    where, params = _filter_clause(filters)
+    return f"SELECT * FROM clips {where} ORDER BY game_id, quarter, possession, created_at", params
+
+
+def iter_clips(filters: Optional[Dict[str, Any]] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """Stream clips through a server-side (named) cursor so memory stays flat"""
+    conn = get_connection()
+    try:
+        with conn.transaction():
+            with conn.cursor(name="clip_export") as cur:
+                cur.itersize = batch_size
+                cur.execute(*clips_query(filters))
+                for row in cur:
+                    yield dict(row)
+    finally:
+        conn.close()
+
+
+def shots_query(filters: Optional[Dict[str, Any]] = None) -> tuple:
+    """The fetch_shots SELECT and its params; filters on the idx_clips_shots predicate"""
+    where, params = _filter_clause(filters)
+    located = schema_migrations.LOCATED_SHOT
+    where = f"{where} AND {located}" if where else f"WHERE {located}"
+    return f"SELECT shot_x_num, shot_y_num, shot_result, points FROM clips {where}", params
+
+
+def fetch_shots(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Located shots (has_shot = 'Yes' with numeric court coordinates) for clips matching `filters`"""
+    with db_cursor() as cur:
+        cur.execute(*shots_query(filters))
+        return [dict(row) for row in cur.fetchall()]
+
+
+def clips_version() -> tuple:
+    """Cheap fingerprint of the clips table; changes whenever a clip is written or deleted"""
+    with db_cursor() as cur:
+        cur.execute("""
+            SELECT (SELECT COUNT(*) FROM clips) AS n,
+                   (SELECT value FROM clip_change_counter WHERE id = 1) AS seq
+        """)
+        row = cur.fetchone()
+        return (row["n"], row["seq"])
+
+
+def fetch_file_refs() -> List[Dict[str, Any]]:
+    """Every file a clip row points at (one query, for the Clips/ garbage collector)"""
+    with db_cursor() as cur:
+        cur.execute("SELECT id, filename, path, source_video FROM clips")
+        return [dict(row) for row in cur.fetchall()]
+
+
+def remove_clip(clip_id: str) -> int:
+    """Remove a single clip"""
+    with db_cursor() as cur:
+        cur.execute("DELETE FROM clips WHERE id = %s RETURNING id, game_id", (clip_id,))
+        rows = cur.fetchall()
+        clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, [row["game_id"] for row in rows])
+        notify_clip_change(cur, "delete", [row["id"] for row in rows])
+        return len(rows)
+
+
 def remove_game(game_identifier: Optional[str], canonical_game_id: Optional[str] = None) -> int:
     """Remove all clips for a game"""
     with db_cursor() as cur:
         if canonical_game_id:
-            cur.execute("DELETE FROM clips WHERE canonical_game_id = %s", (canonical_game_id,))
-        elif game_identifier:
-            cur.execute("DELETE FROM clips WHERE game_id::text = %s", (str(game_identifier),))
+            cur.execute("DELETE FROM clips WHERE canonical_game_id = %s RETURNING id, game_id", (canonical_game_id,))
+        elif parse_int(game_identifier) is not None:
+            cur.execute("DELETE FROM clips WHERE game_id = %s RETURNING id, game_id", (parse_int(game_identifier),))
         else:
             return 0
-        return cur.rowcount
+        rows = cur.fetchall()
+        clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, [row["game_id"] for row in rows])
+        notify_clip_change(cur, "delete", [row["id"] for row in rows])
+        return len(rows)
+
+
+def fetch_rollups(group_by: Iterable[str] = (), filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Defensive rollups grouped by rollup dimensions"""
+    with db_cursor() as cur:
+        return clip_rollups.query(cur, clip_rollups.POSTGRES, tuple(group_by), filters)
+
+
+def fetch_actions(filters: Optional[Dict[str, Any]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+    """Individual tagged actions with their clip context"""
+    with db_cursor() as cur:
+        return clip_actions.query(cur, clip_actions.POSTGRES, filters, limit)
+
+
+def summarize_actions(group_by: Iterable[str] = ("type", "coverage"),
+                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    with db_cursor() as cur:
+        return clip_actions.summarize(cur, clip_actions.POSTGRES, tuple(group_by), filters)
 
 
 def create_delete_request(username: str, item_type: str, item_id: str, item_name: str, reason: str) -> str:
@@ -246,9 +361,14 @@ def approve_delete_request(request_id: str, admin_username: str) -> bool:
 
         # Perform the deletion
         if request['item_type'] == 'clip':
-            cur.execute("DELETE FROM clips WHERE id = %s", (request['item_id'],))
-        elif request['item_type'] == 'game':
-            cur.execute("DELETE FROM clips WHERE game_id::text = %s", (request['item_id'],))
+            cur.execute("DELETE FROM clips WHERE id = %s RETURNING id, game_id", (request['item_id'],))
+        elif request['item_type'] == 'game' and parse_int(request['item_id']) is not None:
+            cur.execute("DELETE FROM clips WHERE game_id = %s RETURNING id, game_id", (parse_int(request['item_id']),))
+        else:
+            return True
+        rows = cur.fetchall()
+        clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, [row['game_id'] for row in rows])
+        notify_clip_change(cur, "delete", [row['id'] for row in rows])
 
         return True
 
@@ -264,20 +384,42 @@ def reject_delete_request(request_id: str, admin_username: str) -> bool:
         return cur.rowcount > 0
 
 
+def _insert_audit_rows(entries: List[Dict[str, Any]]) -> None:
+    """Write one batch from the audit sink in a single round trip"""
+    with db_cursor() as cur:
+        cur.executemany("""
+            INSERT INTO audit_log (timestamp, username, action, item_type, item_id, changes, ip_address)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (e['timestamp'], e['username'], e['action'], e['item_type'], e['item_id'], e['changes'], e['ip_address'])
+            for e in entries
+        ])
+
+
 def log_audit(username: str, action: str, item_type: str = None, item_id: str = None,
               changes: Dict = None, ip_address: str = None) -> None:
-    """Log an action to the audit log"""
-    import json
+    """Log an action to the audit log (queued; written in batches by the audit sink)"""
+    get_sink(_insert_audit_rows).submit({
+        # Naive UTC: audit_log.timestamp is TIMESTAMP without time zone, so an aware
+        # value would be shifted into the session time zone
+        'timestamp': datetime.utcnow(),
+        'username': username,
+        'action': action,
+        'item_type': item_type,
+        'item_id': item_id,
+        'changes': json.dumps(changes) if changes else None,
+        'ip_address': ip_address,
+    })
 
-    with db_cursor() as cur:
-        cur.execute("""
-            INSERT INTO audit_log (username, action, item_type, item_id, changes, ip_address)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """, (username, action, item_type, item_id, json.dumps(changes) if changes else None, ip_address))
+
+def audit_metrics() -> Dict[str, Any]:
+    return get_sink(_insert_audit_rows).metrics()
 
 
 def get_audit_log(limit: int = 100, username: str = None) -> List[Dict[str, Any]]:
     """Get audit log entries"""
+    # Read-your-writes: entries still queued in this process go in first
+    get_sink(_insert_audit_rows).flush(timeout=2.0)
     with db_cursor() as cur:
         if username:
             cur.execute("""
@@ -295,3 +437,164 @@ def get_audit_log(limit: int = 100, username: str = None) -> List[Dict[str, Any]
 
         results = cur.fetchall()
         return [dict(row) for row in results]
+
+
+# ============================================
+# Snapshot export / import (COPY streaming)
+# ============================================
+
+# Source-of-truth tables in restore order (children after clips); clip_actions and
+# clip_rollups are derived and rebuilt after an import
+SNAPSHOT_TABLES = ("clips", "comm_segments", "clip_tombstones", "delete_requests", "audit_log")
+SERIAL_TABLES = ("comm_segments", "audit_log")
+SNAPSHOT_CHUNK_BYTES = 64 * 1024 * 1024  # uncompressed COPY bytes per chunk file
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "data" / "pg_backups"
+
+
+def _open_chunk(path: Path, mode: str):
+    if path.suffix == ".zst":
+        import zstandard
+        return zstandard.open(path, mode)
+    return gzip.open(path, mode, compresslevel=6)
+
+
+def _chunk_suffix() -> str:
+    try:
+        import zstandard  # noqa: F401
+        return ".zst"
+    except ImportError:
+        return ".gz"
+
+
+def _table_columns(cur, table: str) -> List[str]:
+    cur.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        ORDER BY ordinal_position
+    """, (table,))
+    return [row["column_name"] for row in cur.fetchall()]
+
+
+def _quote_columns(columns: Iterable[str]) -> str:
+    return ", ".join('"' + c.replace('"', '""') + '"' for c in columns)
+
+
+def export_snapshot(dest_dir: Optional[Path] = None, chunk_bytes: int = SNAPSHOT_CHUNK_BYTES) -> Dict[str, Any]:
+    """
+    Stream every SNAPSHOT_TABLES table out with COPY TO STDOUT into compressed chunk
+    files plus a manifest.json. One REPEATABLE READ transaction keeps the tables
+    consistent with each other; memory use is one COPY block at a time.
+    """
+    dest_dir = Path(dest_dir or SNAPSHOT_DIR / datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    suffix = _chunk_suffix()
+    manifest: Dict[str, Any] = {"created": datetime.now().isoformat(timespec="seconds"),
+                                "format": "text", "tables": []}
+
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        for table in SNAPSHOT_TABLES:
+            columns = _table_columns(cur, table)
+            if not columns:
+                continue
+            info = {"table": table, "columns": columns, "rows": 0, "bytes": 0, "chunks": []}
+            out, written = None, 0
+            with cur.copy(f"COPY {table} ({_quote_columns(columns)}) TO STDOUT") as copy:
+                for block in copy:
+                    if out is None or written >= chunk_bytes:
+                        if out is not None:
+                            out.close()
+                        name = f"{table}.{len(info['chunks']):04d}.copy{suffix}"
+                        info["chunks"].append(name)
+                        out, written = _open_chunk(dest_dir / name, "wb"), 0
+                    out.write(block)
+                    written += len(block)
+                    info["bytes"] += len(block)
+                    # Text format escapes embedded newlines, so one newline per row
+                    info["rows"] += bytes(block).count(b"\n")
+            if out is not None:
+                out.close()
+            manifest["tables"].append(info)
+        conn.rollback()
+    finally:
+        conn.close()
+
+    with open(dest_dir / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    manifest["path"] = str(dest_dir)
+    return manifest
+
+
+# Backslash escapes COPY's text format uses inside a field
+_COPY_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+def _copy_field(field: str) -> Optional[str]:
+    if field == "\\N":
+        return None
+    return re.sub(r"\\(.)", lambda m: _COPY_ESCAPES.get(m.group(1), m.group(1)), field)
+
+
+def _snapshot_rows(snapshot_dir: Path, info: Dict[str, Any], columns: List[str]) -> Iterator[tuple]:
+    """Decode the given columns of one snapshot table from its text-format COPY chunks"""
+    positions = [info["columns"].index(col) for col in columns]
+    for name in info["chunks"]:
+        with _open_chunk(snapshot_dir / name, "rt") as chunk:
+            for line in chunk:
+                fields = line.rstrip("\n").split("\t")
+                yield tuple(_copy_field(fields[i]) for i in positions)
+
+
+def import_snapshot(snapshot_dir: Path, block_size: int = 1024 * 1024) -> Dict[str, int]:
+    """
+    Replace the snapshot tables with the contents of `snapshot_dir` using COPY FROM
+    STDIN, all in one transaction; derived tables are rebuilt before commit.
+
+    Delta-sync clients must see the restore as changes: clips missing from the
+    snapshot are deleted first (the trigger tombstones them with fresh change
+    numbers), every restored clip is stamped anew on insert, and the snapshot's
+    own tombstones are merged in unnumbered rather than replacing this DB's.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    with open(snapshot_dir / "manifest.json", "r") as f:
+        manifest = json.load(f)
+    tables = {info["table"]: info for info in manifest["tables"]}
+
+    init_db()
+    counts: Dict[str, int] = {}
+    with db_cursor() as cur:
+        keep = {row[0] for row in _snapshot_rows(snapshot_dir, tables["clips"], ["id"])}
+        cur.execute("SELECT id FROM clips")
+        removed = [row["id"] for row in cur.fetchall() if row["id"] not in keep]
+        cur.executemany("DELETE FROM clips WHERE id = %s", [(clip_id,) for clip_id in removed])
+
+        copied = [info for info in manifest["tables"] if info["table"] != "clip_tombstones"]
+        cur.execute(f"TRUNCATE {', '.join(info['table'] for info in copied)} CASCADE")
+        for info in copied:
+            with cur.copy(f"COPY {info['table']} ({_quote_columns(info['columns'])}) FROM STDIN") as copy:
+                for name in info["chunks"]:
+                    with _open_chunk(snapshot_dir / name, "rb") as chunk:
+                        for block in iter(lambda: chunk.read(block_size), b""):
+                            copy.write(block)
+            counts[info["table"]] = info["rows"]
+        if "clip_tombstones" in tables:
+            info = tables["clip_tombstones"]
+            cur.executemany(
+                "INSERT INTO clip_tombstones (clip_id, deleted_at) VALUES (%s, %s) ON CONFLICT (clip_id) DO NOTHING",
+                [row for row in _snapshot_rows(snapshot_dir, info, ["clip_id", "deleted_at"]) if row[0] not in keep],
+            )
+            counts["clip_tombstones"] = info["rows"]
+        for table in SERIAL_TABLES:
+            if table in tables:
+                cur.execute(f"""
+                    SELECT setval(pg_get_serial_sequence('{table}', 'id'),
+                                  COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)
+                """)
+        clip_actions.backfill(cur, schema_migrations.POSTGRES)
+        clip_rollups.rebuild(cur, schema_migrations.POSTGRES)
+        # Every clip was rewritten, so live listeners refetch rather than patch by id
+        notify_clip_change(cur, "delete", removed)
+        cur.execute("SELECT pg_notify(%s, %s)", (PG_CHANNEL, json.dumps(clip_event("resync", []))))
+    return counts
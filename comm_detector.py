@@ -0,0 +1,226 @@
+"""
+Communication segment detection
+Finds stretches of on-court talk in a clip's audio and stores them in
+comm_segments. Audio is decoded by ffmpeg to 16 kHz mono PCM, cut into short
+overlapping windows, and RMS/peak levels (dBFS) are computed for all windows at
+once with NumPy. A segment opens when the level rises ON_MARGIN_DB above the
+clip's noise floor and closes only once it falls below OFF_MARGIN_DB
+(hysteresis), so a voice dipping between words is not split into fragments.
+
+    python comm_detector.py [--workers N] [--force]       # analyse every clip
+    python comm_detector.py bench [--workers N] [clip...] # real-time factor per core
+"""
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 0.05
+HOP_SECONDS = 0.025
+NOISE_PERCENTILE = 20
+ON_MARGIN_DB = 12.0
+OFF_MARGIN_DB = 6.0
+MIN_ON_DBFS = -50.0
+MIN_SEGMENT_SECONDS = 0.3
+MERGE_GAP_SECONDS = 0.25
+FFMPEG_TIMEOUT = 300
+
+_SILENCE_FLOOR = 1e-10
+
+
+def decode_audio(clip_path: Path, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode the first audio stream to mono float32 samples in [-1, 1]"""
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', str(clip_path),
+         '-vn', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'],
+        capture_output=True, timeout=FFMPEG_TIMEOUT,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {result.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def to_dbfs(level: np.ndarray) -> np.ndarray:
+    return 20.0 * np.log10(np.maximum(level, _SILENCE_FLOOR))
+
+
+def window_levels(samples: np.ndarray, sample_rate: int = SAMPLE_RATE,
+                  window: float = WINDOW_SECONDS, hop: float = HOP_SECONDS) -> Dict[str, np.ndarray]:
+    """Linear RMS and peak per window (strided views, no Python loop over frames)"""
+    win = int(window * sample_rate)
+    step = int(hop * sample_rate)
+    if len(samples) < win:
+        samples = np.pad(samples, (0, win - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, win)[::step]
+    return {
+        'rms': np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)),
+        'peak': np.max(np.abs(frames), axis=1).astype(np.float64),
+    }
+
+
+def hysteresis(levels_db: np.ndarray, on_db: float, off_db: float) -> np.ndarray:
+    """
+    Boolean activity per window: switches on at >= on_db and stays on until < off_db.
+    Each window inherits the most recent on/off trigger via a running maximum of indices.
+    """
+    trigger = np.full(len(levels_db), -1, dtype=np.int8)
+    trigger[levels_db < off_db] = 0
+    trigger[levels_db >= on_db] = 1
+    idx = np.where(trigger >= 0, np.arange(len(trigger)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    state = trigger[idx]
+    # Windows before the first trigger (and untriggered index 0) are inactive
+    return state == 1
+
+
+def _runs(active: np.ndarray) -> np.ndarray:
+    """(start, end) window indices of each run of True, end exclusive"""
+    edges = np.diff(np.concatenate(([0], active.view(np.int8), [0])))
+    return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_segments(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> List[Dict[str, float]]:
+    """Voice-activity segments with start/end/duration and rms/peak levels"""
+    if not len(samples):
+        return []
+    levels = window_levels(samples, sample_rate)
+    rms_db = to_dbfs(levels['rms'])
+    noise_floor = float(np.percentile(rms_db, NOISE_PERCENTILE))
+    on_db = max(noise_floor + ON_MARGIN_DB, MIN_ON_DBFS)
+    off_db = max(noise_floor + OFF_MARGIN_DB, MIN_ON_DBFS - (ON_MARGIN_DB - OFF_MARGIN_DB))
+
+    runs = _runs(hysteresis(rms_db, on_db, off_db))
+    if not len(runs):
+        return []
+
+    # Bridge short pauses between runs, then drop blips
+    merge_windows = int(MERGE_GAP_SECONDS / HOP_SECONDS)
+    keep_start = np.concatenate(([True], runs[1:, 0] - runs[:-1, 1] > merge_windows))
+    starts = runs[keep_start, 0]
+    ends = runs[np.concatenate((keep_start[1:], [True])), 1]
+
+    window_count = len(rms_db)
+    start_s = starts * HOP_SECONDS
+    end_s = np.minimum((ends - 1) * HOP_SECONDS + WINDOW_SECONDS, len(samples) / sample_rate)
+    long_enough = end_s - start_s >= MIN_SEGMENT_SECONDS
+
+    # Segment energy from cumulative sums so every segment costs O(1)
+    power = np.concatenate(([0.0], np.cumsum(levels['rms'] ** 2)))
+    segments = []
+    for a, b, s, e in zip(starts[long_enough], np.minimum(ends[long_enough], window_count),
+                          start_s[long_enough], end_s[long_enough]):
+        rms = float(np.sqrt((power[b] - power[a]) / (b - a)))
+        segments.append({
+            'start': round(float(s), 3),
+            'end': round(float(e), 3),
+            'duration': round(float(e - s), 3),
+            'peak_dbfs': round(float(to_dbfs(levels['peak'][a:b].max())), 2),
+            'rms': round(rms, 6),
+            'rms_dbfs': round(float(to_dbfs(np.array(rms))), 2),
+        })
+    return segments
+
+
+def analyze_clip(clip_path: str) -> Dict[str, Any]:
+    """Worker entry point: decode + detect, with timings for the benchmark"""
+    t0 = time.perf_counter()
+    samples = decode_audio(Path(clip_path))
+    t1 = time.perf_counter()
+    segments = detect_segments(samples)
+    t2 = time.perf_counter()
+    return {
+        'path': clip_path,
+        'audio_seconds': len(samples) / SAMPLE_RATE,
+        'decode_seconds': t1 - t0,
+        'detect_seconds': t2 - t1,
+        'segments': segments,
+    }
+
+
+def resolve_clip_path(clip: Dict[str, Any]) -> Optional[Path]:
+    from cloud_config import CLIPS_DIR
+
+    for candidate in (clip.get('path'), CLIPS_DIR / (clip.get('filename') or '')):
+        if candidate and Path(candidate).is_file():
+            return Path(candidate)
+    return None
+
+
+def default_workers() -> int:
+    return int(os.getenv('COMM_WORKERS', '0')) or max(1, (os.cpu_count() or 2) - 1)
+
+
+def process_all(workers: Optional[int] = None, force: bool = False) -> Dict[str, int]:
+    """Analyse every clip in a process pool; segments are written from this process"""
+    from analytics_db import fetch_clips, fetch_comm_segments, upsert_comm_segments
+
+    jobs = {}
+    for clip in fetch_clips():
+        path = resolve_clip_path(clip)
+        if path and (force or not fetch_comm_segments(clip['id'])):
+            jobs[str(path)] = clip['id']
+
+    stats = {'clips': len(jobs), 'segments': 0, 'failed': 0}
+    with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+        futures = {path: pool.submit(analyze_clip, path) for path in jobs}
+        for path, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                print(f"⚠️  Comm detection failed for {Path(path).name}: {e}")
+                continue
+            upsert_comm_segments(jobs[path], result['segments'])
+            stats['segments'] += len(result['segments'])
+    return stats
+
+
+def benchmark(paths: List[str], workers: int) -> Dict[str, float]:
+    """Real-time factor = seconds of audio processed per wall-clock second, overall and per core"""
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(analyze_clip, paths))
+    wall = time.perf_counter() - start
+    audio = sum(r['audio_seconds'] for r in results)
+    decode = sum(r['decode_seconds'] for r in results)
+    detect = sum(r['detect_seconds'] for r in results)
+    return {
+        'clips': len(results),
+        'workers': workers,
+        'audio_seconds': round(audio, 1),
+        'wall_seconds': round(wall, 3),
+        'rtf': round(audio / wall, 1) if wall else 0.0,
+        'rtf_per_core': round(audio / wall / workers, 1) if wall else 0.0,
+        'decode_share': round(decode / (decode + detect), 3) if decode + detect else 0.0,
+        'detect_rtf': round(audio / detect, 1) if detect else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Detect communication segments in clip audio")
+    parser.add_argument('command', nargs='?', default='run', choices=('run', 'bench'))
+    parser.add_argument('clips', nargs='*', help="clip files to benchmark (default: all clips)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="re-analyse clips that already have segments")
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        from cloud_config import CLIPS_DIR
+
+        paths = args.clips or [str(p) for p in sorted(CLIPS_DIR.glob('*.mp4'))]
+        if not paths:
+            raise SystemExit("No clips to benchmark")
+        for count in sorted({1, args.workers or default_workers()}):
+            print(json.dumps(benchmark(paths, count)))
+    else:
+        print("🎙️  Detecting communication segments...")
+        totals = process_all(args.workers, args.force)
+        print(f"✅ {totals['clips']} clips, {totals['segments']} segments, {totals['failed']} failed")
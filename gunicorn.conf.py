@@ -0,0 +1,16 @@
+"""
+gunicorn settings (read automatically from the working directory)
+/api/clips/events keeps a Server-Sent Events stream open per dashboard tab,
+which would pin a sync worker for the whole connection. Threaded workers let
+streams and ordinary requests share a process; clip_events also closes each
+stream after SSE_MAX_SECONDS so threads are recycled.
+
+    gunicorn media_server:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+timeout = 120
@@ -0,0 +1,132 @@
+"""
+Adaptive-bitrate HLS renditions for cloud streaming
+Transcodes a clip into an HLS ladder (360p/720p/1080p by default, capped at the
+source height) with a master playlist, and uploads the segments to R2 next to
+the MP4 so players on weak connections can step down instead of stalling.
+
+Enabled for deploys with HLS_TRANSCODE=1.
+"""
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional
+
+HLS_ENABLED = os.getenv('HLS_TRANSCODE', '').lower() in ('1', 'true', 'yes')
+
+# (height, video bitrate, audio bitrate)
+HLS_LADDER = [
+    (360, '800k', '96k'),
+    (720, '2800k', '128k'),
+    (1080, '5000k', '160k'),
+]
+SEGMENT_SECONDS = 4
+MASTER_PLAYLIST = 'master.m3u8'
+FFMPEG_TIMEOUT = 1800
+
+CONTENT_TYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+}
+
+
+def probe_streams(clip_path: Path) -> Dict[str, Optional[int]]:
+    """Return source video height and whether the clip carries audio"""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'stream=codec_type,height',
+         '-of', 'json', str(clip_path)],
+        capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe error: {result.stderr.strip()}")
+    streams = json.loads(result.stdout or '{}').get('streams', [])
+    heights = [s.get('height') for s in streams if s.get('codec_type') == 'video' and s.get('height')]
+    return {
+        'height': max(heights) if heights else None,
+        'has_audio': any(s.get('codec_type') == 'audio' for s in streams),
+    }
+
+
+def ladder_for(source_height: Optional[int]) -> List[tuple]:
+    """Drop rungs above the source resolution (never upscale); always keep the lowest"""
+    if not source_height:
+        return list(HLS_LADDER)
+    rungs = [rung for rung in HLS_LADDER if rung[0] <= source_height]
+    return rungs or [HLS_LADDER[0]]
+
+
+def hls_output_dir(clip_path: Path, root: Path) -> Path:
+    return root / 'hls' / clip_path.stem
+
+
+def transcode_hls(clip_path: Path, out_dir: Path, force: bool = False) -> Path:
+    """Transcode `clip_path` into `out_dir`; returns the master playlist path"""
+    clip_path = Path(clip_path)
+    master = out_dir / MASTER_PLAYLIST
+    if not force and master.exists() and master.stat().st_mtime >= clip_path.stat().st_mtime:
+        return master
+
+    info = probe_streams(clip_path)
+    rungs = ladder_for(info['height'])
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    split = f"[0:v]split={len(rungs)}" + ''.join(f"[v{i}]" for i in range(len(rungs)))
+    scales = [f"[v{i}]scale=-2:{height}[v{i}out]" for i, (height, _, _) in enumerate(rungs)]
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-i', str(clip_path),
+           '-filter_complex', ';'.join([split, *scales])]
+
+    stream_map = []
+    for i, (height, v_rate, a_rate) in enumerate(rungs):
+        cmd += ['-map', f'[v{i}out]', f'-c:v:{i}', 'libx264', f'-b:v:{i}', v_rate,
+                f'-maxrate:v:{i}', v_rate, f'-bufsize:v:{i}', v_rate]
+        if info['has_audio']:
+            cmd += ['-map', '0:a:0', f'-c:a:{i}', 'aac', f'-b:a:{i}', a_rate]
+            stream_map.append(f'v:{i},a:{i},name:{height}p')
+        else:
+            stream_map.append(f'v:{i},name:{height}p')
+
+    cmd += [
+        '-preset', 'veryfast',
+        # Keyframe every segment boundary so each rung switches cleanly
+        '-force_key_frames', f'expr:gte(t,n_forced*{SEGMENT_SECONDS})',
+        '-f', 'hls',
+        '-hls_time', str(SEGMENT_SECONDS),
+        '-hls_playlist_type', 'vod',
+        '-hls_segment_filename', str(out_dir / '%v' / 'seg_%03d.ts'),
+        '-master_pl_name', MASTER_PLAYLIST,
+        '-var_stream_map', ' '.join(stream_map),
+        str(out_dir / '%v' / 'index.m3u8'),
+    ]
+
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"FFmpeg error: {result.stderr.strip()}")
+    return master
+
+
+def upload_hls(s3, bucket: str, out_dir: Path, key_prefix: str) -> str:
+    """Upload every playlist/segment under `out_dir`; returns the master playlist key"""
+    for path in sorted(out_dir.rglob('*')):
+        if not path.is_file() or path.suffix not in CONTENT_TYPES:
+            continue
+        key = f"{key_prefix}/{path.relative_to(out_dir).as_posix()}"
+        # Segments never change once written; playlists are small and may be regenerated
+        cache = 'public, max-age=31536000, immutable' if path.suffix == '.ts' else 'public, max-age=300'
+        with open(path, 'rb') as f:
+            s3.upload_fileobj(f, bucket, key, ExtraArgs={
+                'ContentType': CONTENT_TYPES[path.suffix],
+                'CacheControl': cache,
+            })
+    return f"{key_prefix}/{MASTER_PLAYLIST}"
+
+
+if __name__ == '__main__':
+    import sys
+    from cloud_config import CLIPS_DIR
+
+    if len(sys.argv) < 2:
+        print("Usage: python hls_transcode.py <clip.mp4> [--force]")
+        sys.exit(1)
+    source = Path(sys.argv[1])
+    master_path = transcode_hls(source, hls_output_dir(source, CLIPS_DIR), force='--force' in sys.argv)
+    print(f"✅ HLS ladder written: {master_path}")
@@ -0,0 +1,119 @@
+"""
+Video file responses with byte-range, validator and caching support
+Handles 206 partial content and 304 revalidation explicitly so scrubbing a clip
+only transfers the bytes the player asks for. Under gunicorn the body is
+handed to wsgi.file_wrapper so the kernel's sendfile() does the copy; behind
+nginx, set MEDIA_ACCEL_PREFIX to let it serve the bytes via X-Accel-Redirect.
+"""
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Iterator, Optional
+
+from flask import Response, current_app, request
+from werkzeug.http import http_date, quote_etag
+
+# Set to e.g. "/protected-clips/" when an nginx `internal` location maps onto Clips/
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+READ_CHUNK = 256 * 1024
+
+# Extracted clips are named ..._YYYYmmdd_HHMMSS.mp4 and never rewritten in place,
+# so the name identifies the content and the browser can cache it forever.
+CONTENT_ADDRESSED_RE = re.compile(r'_\d{8}_\d{6}\.(mp4|mov|m4v|webm)$', re.IGNORECASE)
+
+
+def is_content_addressed(filename: str) -> bool:
+    return bool(CONTENT_ADDRESSED_RE.search(filename))
+
+
+def file_etag(stat: os.stat_result) -> str:
+    """Strong validator derived from size + mtime (no hashing of the file body)"""
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _iter_range(path: Path, start: int, length: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _file_body(path: Path, start: int, length: int):
+    """
+    gunicorn's file_wrapper sends `Content-Length` bytes from the current file
+    offset with sendfile(); other servers read to EOF, so bound those ourselves.
+    """
+    wrapper = request.environ.get('wsgi.file_wrapper')
+    if wrapper and request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        f = open(path, 'rb')
+        f.seek(start)
+        return wrapper(f, READ_CHUNK)
+    return _iter_range(path, start, length)
+
+
+def send_media(path: Path, accel_name: Optional[str] = None, immutable: bool = False,
+               mimetype: Optional[str] = None, public: bool = False,
+               max_age: Optional[int] = None) -> Response:
+    """
+    Serve `path` honouring Range / If-Range / If-None-Match. `public` lets shared
+    caches (a CDN in front of signed URLs) store it; `max_age` caps the lifetime.
+    """
+    stat = path.stat()
+    size = stat.st_size
+    etag = file_etag(stat)
+    mimetype = mimetype or mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    scope = 'public' if public else 'private'
+    lifetime = IMMUTABLE_MAX_AGE if max_age is None else min(max_age, IMMUTABLE_MAX_AGE)
+    headers = {
+        'ETag': quote_etag(etag),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (f'{scope}, max-age={lifetime}, immutable'
+                          if immutable else f'{scope}, no-cache'),
+    }
+
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers=headers)
+
+    if MEDIA_ACCEL_PREFIX:
+        headers['X-Accel-Redirect'] = f"{MEDIA_ACCEL_PREFIX.rstrip('/')}/{accel_name or path.name}"
+        return Response(status=200, headers=headers, mimetype=mimetype)
+    if current_app.config.get('USE_X_SENDFILE'):
+        headers['X-Sendfile'] = str(path)
+        return Response(status=200, headers=headers, mimetype=mimetype)
+
+    start, length, status = 0, size, 200
+    byte_range = request.range
+    if_range = request.if_range
+    if if_range.etag is not None:
+        range_valid = if_range.etag == etag
+    elif if_range.date is not None:
+        range_valid = int(stat.st_mtime) <= if_range.date.timestamp()
+    else:
+        range_valid = True
+    # Multi-range requests would need a multipart/byteranges body; RFC 9110 lets a
+    # server ignore Range instead, so they get the whole file (players ask for one)
+    if byte_range is not None and range_valid and len(byte_range.ranges) == 1:
+        bounds = byte_range.range_for_length(size)
+        if bounds is None:
+            headers['Content-Range'] = f'bytes */{size}'
+            return Response(status=416, headers=headers)
+        start, stop = bounds
+        length = stop - start
+        status = 206
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+
+    headers['Content-Length'] = str(length)
+    body = _file_body(path, start, length) if request.method != 'HEAD' else b''
+    response = Response(body, status=status, headers=headers, mimetype=mimetype, direct_passthrough=True)
+    response.content_length = length
+    return response
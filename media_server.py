@@ -1,9 +1,19 @@
-from flask import Flask, send_from_directory, jsonify, request
-import requests
+from flask import Flask, send_from_directory, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.security import safe_join
 from pathlib import Path
 import json
 import os
+import threading
+from importlib.util import find_spec
+
+from bridge_client import BridgeClient
+from clip_transform import transform_clip, transform_clips, transform_db_clip, transform_db_clips
+from media_files import is_content_addressed, send_media
+from media_urls import seconds_left, verify_signature
+from static_assets import StaticIndex, is_hashed_asset, send_asset
+from json_provider import install_json_provider
+from response_compression import init_compression
 
 # Import cloud config to detect environment
 try:
@@ -28,28 +38,99 @@ except ImportError:
 # Use cloud_db in cloud, analytics_db locally
 if CLOUD_AVAILABLE and is_cloud():
     print("🌩️  Running in CLOUD mode - using PostgreSQL")
-    from cloud_db import fetch_clips, fetch_clip, upsert_clip, get_connection, remove_game, init_db
-    # Initialize cloud database tables on startup
-    try:
-        init_db()
-        print("✅ Cloud database initialized")
-    except Exception as e:
-        print(f"⚠️  Database initialization error: {e}")
+    from cloud_db import fetch_clips, fetch_clip, fetch_changes, fetch_shots, clips_version, fetch_rollups, fetch_actions, summarize_actions, iter_clips, upsert_clip, update_shot, get_connection, remove_clip, remove_game, init_db, run_heavy_migrations, log_audit, get_audit_log, audit_metrics
 else:
     print("💻 Running in LOCAL mode - using SQLite")
-    from analytics_db import fetch_clips, fetch_clip, upsert_clip, get_connection, remove_game
+    from analytics_db import fetch_clips, fetch_clip, fetch_changes, fetch_shots, clips_version, fetch_rollups, fetch_actions, summarize_actions, iter_clips, upsert_clip, update_shot, get_connection, remove_clip, remove_game, init_db, run_heavy_migrations
 
-# Try to import semantic search - graceful fallback if not available
-try:
-    from semantic_search import semantic_search, rebuild_embeddings, OPENAI_AVAILABLE
-    SEMANTIC_SEARCH_AVAILABLE = True
-except ImportError:
-    SEMANTIC_SEARCH_AVAILABLE = False
-    OPENAI_AVAILABLE = False
+
+def _run_heavy_migrations():
+    # Backfills and index builds are deferred off the start-up path
+    try:
+        applied = run_heavy_migrations()
+        if applied:
+            print(f"✅ Applied deferred schema migrations: {applied}")
+    except Exception as e:
+        print(f"⚠️  Deferred migration error: {e}")
+
+
+# Optional scheduled SQLite backups (local mode; Postgres has its own backups)
+BACKUP_INTERVAL_HOURS = float(os.getenv('BACKUP_INTERVAL_HOURS', '0') or 0)
+
+# Semantic search pulls in numpy and openai, so it is imported by the routes on first use
+SEMANTIC_SEARCH_AVAILABLE = find_spec('numpy') is not None
+OPENAI_AVAILABLE = find_spec('openai') is not None
+if not SEMANTIC_SEARCH_AVAILABLE:
     print("⚠️  Semantic search not available. Install: pip install openai numpy")
 
+_startup_lock = threading.Lock()
+# Set once start-up has finished; until then requests wait on _startup_lock
+_started = threading.Event()
+
+
+def startup():
+    """
+    Once per process: schema check, Postgres change listener, deferred migrations,
+    backup scheduler and static index. Kept out of import so a cold start only
+    pays for loading code; `python media_server.py` calls it before serving and
+    WSGI servers get it from the first request. If the schema check fails the
+    process isn't marked started, so the next request tries again.
+    """
+    with _startup_lock:
+        if _started.is_set():
+            return
+        cloud = CLOUD_AVAILABLE and is_cloud()
+        try:
+            init_db()
+            print("✅ Cloud database initialized" if cloud else "✅ Database schema ready")
+        except Exception as e:
+            print(f"⚠️  Database initialization error (retrying on the next request): {e}")
+            return
+        if cloud:
+            # Relay pg_notify clip changes from any worker to this process's SSE streams
+            from clip_events import start_pg_listener
+            from cloud_config import DATABASE_URL
+            start_pg_listener(DATABASE_URL)
+        threading.Thread(target=_run_heavy_migrations, name='schema-migrations', daemon=True).start()
+        if BACKUP_INTERVAL_HOURS > 0 and not cloud:
+            from backup_database import start_scheduler
+            start_scheduler(BACKUP_INTERVAL_HOURS)
+            print(f"🗄️  Scheduled database backups every {BACKUP_INTERVAL_HOURS:g}h")
+        # Index (and gzip) ui/dist off the request path
+        threading.Thread(target=ui_assets.lookup, args=('index.html',), name='static-index', daemon=True).start()
+        _started.set()
+
+
 app = Flask(__name__)
 CORS(app)
+install_json_provider(app)
+init_compression(app)
+# Let a fronting server stream clip bytes (X-Sendfile) when configured
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+
+@app.before_request
+def ensure_started():
+    if not _started.is_set():
+        startup()
+
+
+AUDITED_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+@app.after_request
+def audit_write_request(response):
+    """Record successful authenticated writes; log_audit only queues, the DB write is batched"""
+    user = getattr(request, 'user', None)
+    if CLOUD_AVAILABLE and is_cloud() and user and request.method in AUDITED_METHODS and response.status_code < 400:
+        try:
+            log_audit(user.get('username', 'unknown'), f"{request.method} {request.path}",
+                      item_type=request.endpoint, item_id=(request.view_args or {}).get('clip_id'),
+                      ip_address=request.headers.get('X-Forwarded-For', request.remote_addr))
+        except Exception as e:
+            print(f"⚠️  Audit log error: {e}")
+    return response
+
 
 # Paths
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -60,68 +141,34 @@ BRIDGE_CTRL_BASE = "http://127.0.0.1:5000"
 BRIDGE_APP_BASE = "http://127.0.0.1:5001"
 
 
-def parse_actions(raw):
-    if isinstance(raw, str):
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            return []
-    if isinstance(raw, list):
-        normalized = []
-        for entry in raw:
-            if not isinstance(entry, dict):
-                continue
-            normalized.append({
-                'phase': entry.get('phase', ''),
-                'type': entry.get('type', ''),
-                'coverage': entry.get('coverage', ''),
-                'help': entry.get('help', ''),
-                'breakdown': entry.get('breakdown', ''),
-                'communication': entry.get('communication', ''),
-                'outcome': entry.get('outcome', ''),
-            })
-        return normalized
-    return []
-
-def derive_video_url(filename, fallback=None):
-    print(f"🎬 derive_video_url called: filename={filename}, fallback={fallback}", flush=True)
-    for raw in (filename, fallback):
-        if not raw:
-            continue
-        # If already an R2 URL (or any absolute URL), return it unchanged
-        raw_str = str(raw)
-        if raw_str.startswith('https://') or raw_str.startswith('http://'):
-            print(f"✅ Returning R2 URL: {raw_str}", flush=True)
-            return raw_str
-        # Otherwise check local file system
-        name = Path(raw).name
-        clip_path = CLIPS_DIR / name
-        if clip_path.exists():
-            local_url = f"/legacy/Clips/{name}"
-            print(f"✅ Returning local URL: {local_url}", flush=True)
-            return local_url
-    print(f"❌ No video URL found, returning None", flush=True)
-    return None
+UI_DIST = PROJECT_ROOT / 'ui' / 'dist'
+ui_assets = StaticIndex(UI_DIST)
+
 
 @app.route('/')
 def index():
     """Serve React app"""
-    ui_dist = PROJECT_ROOT / 'ui' / 'dist'
-    if ui_dist.exists() and (ui_dist / 'index.html').exists():
-        return send_from_directory(ui_dist, 'index.html')
-    else:
+    asset = ui_assets.lookup('index.html')
+    response = send_asset(asset) if asset is not None else None
+    if response is None:
         return jsonify({'error': 'React app not built yet. Run: cd ui && npm run build'}), 404
+    return response
 
 @app.route('/<path:path>')
 def serve_react_app(path):
-    """Serve React app static files"""
-    ui_dist = PROJECT_ROOT / 'ui' / 'dist'
-    file_path = ui_dist / path
-    if file_path.exists() and file_path.is_file():
-        return send_from_directory(ui_dist, path)
+    """Serve React app static files (precompressed, hashed assets cached as immutable)"""
+    asset = ui_assets.lookup(path)
+    response = send_asset(asset) if asset is not None else None
+    if response is not None:
+        return response
+    # A bundle from an older build: 404 rather than HTML served as JS/CSS
+    if is_hashed_asset(path):
+        return jsonify({'error': 'File not found'}), 404
     # For client-side routing, return index.html
-    elif (ui_dist / 'index.html').exists():
-        return send_from_directory(ui_dist, 'index.html')
+    asset = ui_assets.lookup('index.html')
+    response = send_asset(asset) if asset is not None else None
+    if response is not None:
+        return response
     return jsonify({'error': 'File not found'}), 404
 
 @app.route('/clip_detail.html')
@@ -129,20 +176,77 @@ def clip_detail():
     """Serve the clip detail page"""
     return send_from_directory(BASE_DIR, 'clip_detail.html')
 
+def _send_clip(filename, signed_for=None):
+    safe_path = safe_join(str(CLIPS_DIR), filename)
+    full_path = Path(safe_path) if safe_path else None
+    if full_path is None or not full_path.is_file():
+        return jsonify({'error': f'Clip not found: {filename}'}), 404
+
+    return send_media(full_path, accel_name=filename, immutable=is_content_addressed(full_path.name),
+                      public=signed_for is not None,
+                      max_age=seconds_left(signed_for) if signed_for is not None else None)
+
+
+_send_clip_authenticated = require_auth(_send_clip)
+
+
 @app.route('/clips/<path:filename>')
 @app.route('/legacy/Clips/<path:filename>')
-@require_auth
 def serve_clip(filename):
-    """Serve video clip files with proper headers for streaming"""
-    full_path = CLIPS_DIR / filename
-    if not full_path.exists():
-        return jsonify({'error': f'Clip not found: {filename}'}), 404
+    """
+    Serve video clip files with byte-range, ETag and caching support for scrubbing.
+    A valid ?exp=&sig= signature authorises the request on its own (no JWT, no DB);
+    anything else goes through require_auth.
+    """
+    expires = request.args.get('exp')
+    if verify_signature(request.path, expires, request.args.get('sig')):
+        return _send_clip(filename, signed_for=expires)
+    return _send_clip_authenticated(filename)
 
-    response = send_from_directory(CLIPS_DIR, filename, as_attachment=False)
-    response.headers['Accept-Ranges'] = 'bytes'
-    response.headers['Cache-Control'] = 'no-cache'
+
+def _send_thumb(clip_id):
+    from clip_thumbnails import THUMBNAIL_KINDS, generate_thumbnails, sprite_info, thumbnail_path
+
+    kind = request.args.get('kind', 'poster')
+    if kind not in THUMBNAIL_KINDS:
+        return jsonify({'error': f'Unknown thumbnail kind: {kind}'}), 400
+
+    clip = fetch_clip(clip_id)
+    if not clip or not clip.get('filename'):
+        return jsonify({'error': 'Clip not found'}), 404
+
+    clip_path = CLIPS_DIR / Path(clip['filename']).name
+    thumb_path = thumbnail_path(clip_path, kind)
+    if not thumb_path.exists():
+        if not clip_path.exists():
+            return jsonify({'error': 'Clip video not available locally'}), 404
+        # Not generated yet (older clip or the worker is still busy) - build it inline once
+        try:
+            generate_thumbnails(clip_path)
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    response = send_media(thumb_path, immutable=is_content_addressed(clip_path.name), mimetype='image/jpeg')
+    if kind == 'sprite':
+        for key, value in sprite_info().items():
+            response.headers[f"X-Sprite-{key.replace('_', '-').title()}"] = str(value)
     return response
 
+
+_send_thumb_authenticated = require_auth(_send_thumb)
+
+
+@app.route('/api/clip/<clip_id>/thumb')
+def api_clip_thumb(clip_id):
+    """
+    Serve a clip's poster frame (?kind=poster, default) or scrub sprite sheet (?kind=sprite).
+    Like serve_clip, the signed thumbnail_url from the clip list authorises an <img> on its own.
+    """
+    if verify_signature(request.path, request.args.get('exp'), request.args.get('sig')):
+        return _send_thumb(clip_id)
+    return _send_thumb_authenticated(clip_id)
+
+
 @app.route('/api/clips', methods=['GET', 'POST'])
 @require_auth
 def api_clips():
@@ -199,7 +303,7 @@ def api_clips():
         # ---- GET: Return all clips ----
         db_clips = fetch_clips()
         if db_clips:
-            transformed = [transform_db_clip(clip) for clip in db_clips]
+            transformed = transform_db_clips(db_clips)
             return jsonify(transformed)
 
         # Fallback to metadata file (local mode only)
@@ -207,7 +311,7 @@ def api_clips():
             with open(METADATA_FILE, 'r') as f:
                 data = json.load(f)
             clips = data.get('clips', [])
-            transformed = [transform_clip(clip) for clip in clips]
+            transformed = transform_clips(clips)
             return jsonify(transformed)
 
         return jsonify([])
@@ -216,6 +320,42 @@ def api_clips():
         print("❌ Error in /api/clips:", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/clips/changes')
+@require_auth
+def api_clip_changes():
+    """
+    Delta sync: clips inserted/updated and ids deleted since ?since=<cursor>.
+    Returns {"cursor": ..., "full": bool, "clips": [...], "deleted": [...]}; pass the cursor
+    back next time. "full" means every clip was returned and replaces the client's copy.
+    """
+    try:
+        changes = fetch_changes(request.args.get('since') or None)
+        return jsonify({
+            "cursor": changes['cursor'],
+            "full": changes['full'],
+            "clips": transform_db_clips(changes['upserts']),
+            "deleted": changes['deleted'],
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/clips/events')
+@require_auth
+def api_clip_events():
+    """
+    Server-Sent Events stream of clip changes ("upsert" / "delete" events carrying clip ids).
+    Clients apply them by calling /api/clips/changes; a "resync" event means events were dropped.
+    """
+    from clip_events import notifier, sse_stream
+
+    q = notifier.subscribe()
+    response = Response(stream_with_context(sse_stream(q)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def update_metadata_clip(clip_id: str, updates: dict):
     # Only update metadata file in local mode
     if not is_local():
@@ -380,11 +520,7 @@ def api_clip_detail(clip_id):
             db_record = fetch_clip(clip_id)
             print(f"[DEBUG] DB record found: {db_record is not None}")
             if db_record:
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM clips WHERE id = ?', (clip_id,))
-                conn.commit()
-                conn.close()
+                remove_clip(clip_id)
                 print(f"[DEBUG] Deleted from database")
 
             # Delete from metadata file if exists (local mode only)
@@ -484,115 +620,6 @@ def api_clip_detail(clip_id):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-def transform_clip(clip):
-    """Transform clip field names to match HTML expectations"""
-    location_code = (clip.get('location_code') or clip.get('locationCode') or clip.get('location') or
-                     clip.get('Location Code') or clip.get('game_location') or clip.get('gameLocation') or '')
-    location_display = (clip.get('location_display') or clip.get('locationDisplay') or clip.get('Location') or
-                        clip.get('location_label') or clip.get('locationLabel') or clip.get('Game Location') or '')
-    return {
-        'id': clip.get('id'),
-        'filename': clip.get('filename'),
-        'video_url': clip.get('video_url') or derive_video_url(clip.get('filename'), clip.get('path') or clip.get('video_path')),
-        'game_num': clip.get('gameId'),
-        'opponent': clip.get('opponent'),
-        'quarter': clip.get('quarter'),
-        'possession': clip.get('possession'),
-        'situation': clip.get('situation'),
-        'offensive_formation': clip.get('formation'),
-        'play_name': clip.get('playName'),
-        'scout_coverage': clip.get('scoutCoverage'),
-        'play_trigger': clip.get('playTrigger')
-        or clip.get('Play Trigger')
-        or clip.get('actionTrigger')
-        or clip.get('Action Trigger'),
-        'action_types': clip.get('actionTypes'),
-        'action_sequence': clip.get('actionSequence'),
-        'defensive_coverage': clip.get('coverage'),
-        'ball_screen_coverage': clip.get('ballScreen'),
-        'offball_screen_coverage': clip.get('offBallScreen'),
-        'help_rotation': clip.get('helpRotation'),
-        'defensive_disruption': clip.get('disruption'),
-        'defensive_breakdown': clip.get('breakdown'),
-        'play_result': clip.get('result'),
-        'paint_touches': clip.get('paintTouch'),
-        'shooter_designation': clip.get('shooter'),
-        'shot_location': clip.get('shotLocation'),
-        'shot_contest': clip.get('contest'),
-        'rebound_outcome': clip.get('rebound'),
-        'points': clip.get('points'),
-        'has_shot': clip.get('hasShot'),
-        'shot_x': clip.get('shotX'),
-        'shot_y': clip.get('shotY'),
-        'shot_result': clip.get('shotResult'),
-        'notes': clip.get('notes'),
-        'start_time': clip.get('startTime'),
-        'end_time': clip.get('End Time') if clip.get('End Time') else clip.get('endTime'),
-        'location': location_code,
-        'location_display': location_display,
-        'location_code': location_code,
-        'game_location': location_code,
-        'locationLabel': location_display,
-        'actions': parse_actions(clip.get('actions') or clip.get('actions_json')),
-    }
-
-
-def transform_db_clip(clip):
-    location_code = (
-        clip.get('location_code') or clip.get('location') or clip.get('game_location') or
-        clip.get('locationCode') or clip.get('Location Code') or ''
-    )
-    location_display = (
-        clip.get('location_display') or clip.get('location') or clip.get('locationLabel') or
-        clip.get('locationDisplay') or clip.get('Location') or ''
-    )
-    return {
-        'id': clip.get('id'),
-        'filename': clip.get('filename'),
-        'source_video': clip.get('source_video'),
-        'path': clip.get('path'),
-        'video_url': derive_video_url(clip.get('filename'), clip.get('path')),
-        'game_id': clip.get('game_id'),
-        'opponent': clip.get('opponent'),
-        'game_score': clip.get('game_score'),
-        'quarter': clip.get('quarter'),
-        'possession': clip.get('possession'),
-        'situation': clip.get('situation'),
-        'formation': clip.get('formation'),
-        'play_name': clip.get('play_name'),
-        'scout_coverage': clip.get('scout_coverage'),
-        'play_trigger': clip.get('play_trigger') or clip.get('action_trigger'),
-        'action_types': clip.get('action_types'),
-        'action_sequence': clip.get('action_sequence'),
-        'coverage': clip.get('coverage'),
-        'ball_screen': clip.get('ball_screen'),
-        'off_ball_screen': clip.get('off_ball_screen'),
-        'help_rotation': clip.get('help_rotation'),
-        'disruption': clip.get('disruption'),
-        'breakdown': clip.get('breakdown'),
-        'result': clip.get('result'),
-        'paint_touch': clip.get('paint_touch'),
-        'shooter': clip.get('shooter'),
-        'shot_location': clip.get('shot_location'),
-        'contest': clip.get('contest'),
-        'rebound': clip.get('rebound'),
-        'points': clip.get('points'),
-        'has_shot': clip.get('has_shot'),
-        'shot_x': clip.get('shot_x'),
-        'shot_y': clip.get('shot_y'),
-        'shot_result': clip.get('shot_result'),
-        'player_designation': clip.get('player_designation'),
-        'notes': clip.get('notes'),
-        'start_time': clip.get('start_time'),
-        'end_time': clip.get('end_time'),
-        'location': location_code,
-        'location_display': location_display,
-        'location_code': location_code,
-        'game_location': location_code,
-        'locationLabel': location_display,
-        'actions': parse_actions(clip.get('actions') or clip.get('actions_json')),
-    }
-
 @app.route('/api/clip/<clip_id>/shot', methods=['PUT', 'DELETE', 'OPTIONS'])
 @require_auth
 def update_clip_shot(clip_id):
@@ -606,8 +633,6 @@ def update_clip_shot(clip_id):
         return jsonify({'error': 'Write access not allowed for guest users'}), 403
 
     try:
-        from analytics_db import get_connection
-
         if request.method == 'PUT':
             # Update shot data
             data = request.get_json()
@@ -617,15 +642,14 @@ def update_clip_shot(clip_id):
             shot_result = data.get('shot_result', '')
             shooter_designation = data.get('shooter_designation', '')
 
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE clips
-                SET has_shot = ?, shot_x = ?, shot_y = ?, shot_result = ?, shooter = ?
-                WHERE id = ?
-            """, (has_shot, shot_x, shot_y, shot_result, shooter_designation, clip_id))
-            conn.commit()
-            conn.close()
+            # Rollups and the clip-change event are updated with the row
+            update_shot(clip_id, {
+                'has_shot': has_shot,
+                'shot_x': shot_x,
+                'shot_y': shot_y,
+                'shot_result': shot_result,
+                'shooter': shooter_designation,
+            })
 
             update_metadata_clip(clip_id, {
                 'has_shot': has_shot,
@@ -656,15 +680,7 @@ def update_clip_shot(clip_id):
 
         elif request.method == 'DELETE':
             # Delete shot data
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE clips
-                SET has_shot = 'No', shot_x = NULL, shot_y = NULL, shot_result = NULL
-                WHERE id = ?
-            """, (clip_id,))
-            conn.commit()
-            conn.close()
+            update_shot(clip_id, {'has_shot': 'No', 'shot_x': None, 'shot_y': None, 'shot_result': None})
 
             update_metadata_clip(clip_id, {
                 'has_shot': 'No',
@@ -706,6 +722,167 @@ def api_delete_game(game_id: str):
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
+@app.route('/api/export')
+@require_auth
+def api_export():
+    """
+    Stream clips as CSV or XLSX straight from a DB cursor.
+    Query: ?format=csv|xlsx plus optional filters (game_id, opponent, quarter, coverage, result, has_shot, ...)
+    """
+    from clip_export import EXPORT_FORMATS, XLSX_AVAILABLE, stream_csv, stream_xlsx
+
+    export_format = (request.args.get('format') or 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format: {export_format}"}), 400
+    if export_format == 'xlsx' and not XLSX_AVAILABLE:
+        return jsonify({"error": "XLSX export needs openpyxl on the server (pip install openpyxl)"}), 501
+
+    filters = {key: value for key, value in request.args.items() if key != 'format'}
+    clips = iter_clips(filters)
+    if export_format == 'xlsx':
+        body = stream_xlsx(clips)
+    else:
+        body = stream_csv(clips)
+
+    filename = f"clips_export.{export_format}"
+    response = Response(stream_with_context(body), mimetype=EXPORT_FORMATS[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/api/shots/heatmap')
+@require_auth
+def api_shot_heatmap():
+    """
+    Shot chart aggregated into zones server-side.
+    Query: ?binning=hex|grid&size=<percent of court> plus optional filters
+    (game_id, opponent, coverage, player_designation).
+    """
+    try:
+        from shot_heatmap import aggregate_shots, cache, filter_key
+
+        binning = (request.args.get('binning') or 'hex').lower()
+        size = request.args.get('size', type=float)
+        filters = {
+            key: request.args.get(key)
+            for key in ('game_id', 'opponent', 'coverage', 'player_designation')
+            if request.args.get(key)
+        }
+        result, cached = cache.get_or_compute(
+            (filter_key(filters), binning, size),
+            clips_version(),
+            lambda: aggregate_shots(fetch_shots(filters), binning, size),
+        )
+        return jsonify({**result, "filters": filters, "cached": cached})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error building shot heatmap: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/analytics/<view>')
+@require_auth
+def api_analytics(view):
+    """
+    Defensive rollups: possessions, points per possession, stop/breakdown/turnover rates, FG%.
+    Views: summary, games, opponents, coverage, ball-screen, breakdown, situation.
+    Query: optional ?group_by=coverage,ball_screen (summary only) plus dimension filters
+    (game_id, opponent, situation, coverage, ball_screen, breakdown).
+    """
+    try:
+        from clip_rollups import DIMENSIONS, VIEWS
+
+        if view not in VIEWS:
+            return jsonify({"error": f"Unknown analytics view: {view}"}), 404
+        group_by = VIEWS[view]
+        if view == 'summary' and request.args.get('group_by'):
+            group_by = tuple(col.strip() for col in request.args['group_by'].split(',') if col.strip())
+        filters = {key: request.args.get(key) for key in DIMENSIONS if request.args.get(key)}
+        rows = fetch_rollups(group_by, filters)
+        return jsonify({"view": view, "group_by": list(group_by), "filters": filters, "rows": rows})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error loading analytics: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/actions')
+@require_auth
+def api_actions():
+    """
+    Individual tagged actions with clip context.
+    Query: action filters (phase, type, coverage, help, breakdown, communication, outcome),
+    clip filters (game_id, opponent, quarter) and ?limit=
+    """
+    try:
+        from clip_actions import FILTER_FIELDS
+
+        filters = {key: request.args.get(key) for key in FILTER_FIELDS if request.args.get(key)}
+        limit = request.args.get('limit', default=500, type=int)
+        actions = fetch_actions(filters, limit)
+        return jsonify({"filters": filters, "count": len(actions), "actions": actions})
+    except Exception as e:
+        print(f"❌ Error loading actions: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/actions/summary')
+@require_auth
+def api_actions_summary():
+    """Action counts grouped by ?group_by=type,coverage (any action fields), same filters as /api/actions"""
+    try:
+        from clip_actions import FILTER_FIELDS
+
+        group_by = tuple(
+            col.strip() for col in (request.args.get('group_by') or 'type,coverage').split(',') if col.strip()
+        )
+        filters = {key: request.args.get(key) for key in FILTER_FIELDS if request.args.get(key)}
+        return jsonify({"group_by": list(group_by), "filters": filters, "rows": summarize_actions(group_by, filters)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"❌ Error summarizing actions: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/audit')
+@require_admin
+def api_admin_audit():
+    """Recent audit entries plus audit sink queue/batch metrics (cloud only)"""
+    if not (CLOUD_AVAILABLE and is_cloud()):
+        return jsonify({"error": "Audit log is only kept in cloud mode"}), 400
+    try:
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        entries = get_audit_log(limit=limit, username=request.args.get('username') or None)
+        return jsonify({"ok": True, "entries": entries, "sink": audit_metrics()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/api/admin/storage', methods=['GET', 'POST'])
+@require_admin
+def api_storage():
+    """
+    Clips/ integrity report: orphaned files, rows with missing files, manifest hash mismatches.
+    GET reports (?verify=1 re-hashes every clip); POST {"delete": true} removes orphans.
+    """
+    if is_cloud():
+        return jsonify({"error": "Storage scan is only available locally"}), 400
+    try:
+        from clip_gc import run
+
+        body = request.get_json(silent=True) or {}
+        verify = request.args.get('verify') in ('1', 'true') or bool(body.get('verify'))
+        delete = request.method == 'POST' and bool(body.get('delete'))
+        return jsonify(run(delete=delete, verify=verify, clips_dir=CLIPS_DIR))
+    except Exception as e:
+        print(f"❌ Error scanning clip storage: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
@@ -716,22 +893,17 @@ def health():
     })
 
 
+# Both share bridge_client's pooled session, created on the first bridge call
+BRIDGE_CTRL = BridgeClient('controller', BRIDGE_CTRL_BASE, timeout=2)
+BRIDGE_APP = BridgeClient('workbook', BRIDGE_APP_BASE, timeout=3)
+
+
 def bridge_ctrl_request(method: str, endpoint: str, **kwargs):
-    try:
-        response = requests.request(method, f"{BRIDGE_CTRL_BASE}{endpoint}", timeout=2, **kwargs)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as exc:
-        raise RuntimeError(str(exc))
+    return BRIDGE_CTRL.request(method, endpoint, **kwargs)
 
 
 def bridge_excel_request(method: str, endpoint: str, **kwargs):
-    try:
-        response = requests.request(method, f"{BRIDGE_APP_BASE}{endpoint}", timeout=3, **kwargs)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as exc:
-        raise RuntimeError(str(exc))
+    return BRIDGE_APP.request(method, endpoint, **kwargs)
 
 
 @app.route('/excel/status')
@@ -752,11 +924,20 @@ def excel_status():
     return jsonify({'ok': True, 'controller': controller, 'workbook': workbook})
 
 
+@app.route('/excel/metrics')
+@require_auth
+def excel_metrics():
+    """Per-upstream latency, error and circuit-breaker state for the bridge proxies"""
+    return jsonify({'ok': True, 'controller': BRIDGE_CTRL.status(), 'workbook': BRIDGE_APP.status()})
+
+
 @app.route('/excel/start', methods=['POST'])
 @require_write
 def excel_start():
     try:
         data = bridge_ctrl_request('POST', '/start')
+        # The workbook app was just (re)started - don't keep short-circuiting it
+        BRIDGE_APP.breaker.record_success()
         return jsonify({'ok': True, 'status': data})
     except RuntimeError as exc:
         return jsonify({'ok': False, 'error': str(exc)}), 502
@@ -821,10 +1002,11 @@ def api_semantic_search():
         if not query:
             return jsonify({"error": "Query parameter required"}), 400
 
+        from semantic_search import semantic_search
         results = semantic_search(query, top_k=top_k)
 
         # Transform results to match frontend expectations
-        transformed = [transform_db_clip(clip) for clip in results]
+        transformed = transform_db_clips(results)
 
         return jsonify({
             "ok": True,
@@ -855,6 +1037,7 @@ def api_rebuild_embeddings():
         }), 501
 
     try:
+        from semantic_search import rebuild_embeddings
         result = rebuild_embeddings()
         if result['success']:
             return jsonify({"ok": True, **result})
@@ -947,10 +1130,12 @@ def api_deploy():
         sys.stdout.flush()
 
         video_url_map = {}  # Maps filename to R2 URL
+        hls_url_map = {}  # Maps filename to R2 HLS master playlist URL
 
         try:
             import boto3
             from pathlib import Path
+            from hls_transcode import HLS_ENABLED, hls_output_dir, transcode_hls, upload_hls
 
             # Load R2 credentials
             r2_config = {}
@@ -987,7 +1172,14 @@ def api_deploy():
                 print(f"  📊 Found {len(db_filenames)} videos referenced in database", flush=True)
 
                 if clips_dir.exists() and db_filenames:
+                    from clip_gc import (load_manifest, mark_hls_uploaded, mark_uploaded, needs_hls_upload,
+                                         needs_upload, save_manifest)
+                    from hls_transcode import MASTER_PLAYLIST
+
+                    manifest = load_manifest()
                     uploaded = 0
+                    unchanged = 0
+                    hls_uploaded = 0
                     for i, filename in enumerate(db_filenames, 1):
                         video_path = clips_dir / filename
 
@@ -995,26 +1187,53 @@ def api_deploy():
                             print(f"  ⚠️  Video not found: {filename}", flush=True)
                             continue
 
-                        # Upload to R2
-                        print(f"  📤 Uploading {filename}...", flush=True)
-                        with open(video_path, 'rb') as f:
-                            s3.upload_fileobj(
-                                f,
-                                bucket_name,
-                                filename,
-                                ExtraArgs={'ContentType': 'video/mp4'}
-                            )
-
-                        # Build public URL
-                        r2_url = f"{r2_config['R2_PUBLIC_URL']}/{filename}"
-                        video_url_map[filename] = r2_url
-                        uploaded += 1
-
-                        if uploaded % 10 == 0:
-                            print(f"    Progress: {uploaded}/{len(db_filenames)} videos...", flush=True)
-
-                    print(f"  ✅ Uploaded {uploaded} videos to R2", flush=True)
-                    steps[-1] = {'step': 'r2_upload', 'status': 'success', 'message': f'Uploaded {uploaded} videos'}
+                        # Skip files the bucket already has (same SHA-256 as the last upload)
+                        if not needs_upload(manifest, video_path):
+                            video_url_map[filename] = f"{r2_config['R2_PUBLIC_URL']}/{filename}"
+                            unchanged += 1
+                        else:
+                            # Upload to R2
+                            print(f"  📤 Uploading {filename}...", flush=True)
+                            with open(video_path, 'rb') as f:
+                                s3.upload_fileobj(
+                                    f,
+                                    bucket_name,
+                                    filename,
+                                    ExtraArgs={'ContentType': 'video/mp4'}
+                                )
+
+                            # Build public URL
+                            r2_url = f"{r2_config['R2_PUBLIC_URL']}/{filename}"
+                            video_url_map[filename] = r2_url
+                            mark_uploaded(manifest, video_path)
+                            uploaded += 1
+
+                            if uploaded % 10 == 0:
+                                print(f"    Progress: {uploaded}/{len(db_filenames)} videos...", flush=True)
+
+                        # Optional adaptive-bitrate ladder uploaded alongside the MP4. Tracked in the
+                        # manifest on its own so MP4s already in R2 still get one
+                        if HLS_ENABLED:
+                            manifest_key = f"hls/{video_path.stem}/{MASTER_PLAYLIST}"
+                            if needs_hls_upload(manifest, video_path):
+                                try:
+                                    hls_dir = hls_output_dir(video_path, clips_dir)
+                                    # No-op when the local ladder is newer than the MP4
+                                    transcode_hls(video_path, hls_dir)
+                                    manifest_key = upload_hls(s3, bucket_name, hls_dir, f"hls/{video_path.stem}")
+                                    mark_hls_uploaded(manifest, video_path)
+                                    hls_uploaded += 1
+                                except Exception as e:
+                                    print(f"  ⚠️  HLS transcode failed for {filename}: {e}", flush=True)
+                                    manifest_key = None
+                            if manifest_key:
+                                hls_url_map[filename] = f"{r2_config['R2_PUBLIC_URL']}/{manifest_key}"
+
+                    save_manifest(manifest)
+                    hls_note = f", {hls_uploaded} HLS ladders" if HLS_ENABLED else ""
+                    print(f"  ✅ Uploaded {uploaded} videos to R2 ({unchanged} unchanged{hls_note})", flush=True)
+                    steps[-1] = {'step': 'r2_upload', 'status': 'success',
+                                 'message': f'Uploaded {uploaded} videos ({unchanged} unchanged{hls_note})'}
                 else:
                     print("  ⚠️  No videos to upload", flush=True)
                     steps[-1] = {'step': 'r2_upload', 'status': 'skipped', 'message': 'No videos to upload'}
@@ -1066,6 +1285,7 @@ def api_deploy():
             for clip in local_clips:
                 if clip.get('filename') and clip['filename'] in video_url_map:
                     clip['path'] = video_url_map[clip['filename']]
+                clip['hls_url'] = hls_url_map.get(clip.get('filename')) or clip.get('hls_url')
 
             # Step 3: Bulk insert into cloud (raw copy)
             if local_clips:
@@ -1082,6 +1302,7 @@ def api_deploy():
                             breakdown, result, paint_touch, shooter, shot_location, contest,
                             rebound, points, has_shot, shot_x, shot_y, shot_result,
                             player_designation, notes, start_time, end_time, actions_json,
+                            hls_url, start_seconds, end_seconds, shot_x_num, shot_y_num,
                             created_at, updated_at
                         ) VALUES (
                             %(id)s, %(filename)s, %(path)s, %(source_video)s, %(game_id)s,
@@ -1095,13 +1316,21 @@ def api_deploy():
                             %(shot_location)s, %(contest)s, %(rebound)s, %(points)s,
                             %(has_shot)s, %(shot_x)s, %(shot_y)s, %(shot_result)s,
                             %(player_designation)s, %(notes)s, %(start_time)s, %(end_time)s,
-                            %(actions_json)s, %(created_at)s, %(updated_at)s
+                            %(actions_json)s, %(hls_url)s, %(start_seconds)s, %(end_seconds)s,
+                            %(shot_x_num)s, %(shot_y_num)s, %(created_at)s, %(updated_at)s
                         )
                     """, clip)
 
                     if i % 10 == 0:
                         print(f"    Progress: {i}/{len(local_clips)} clips...", flush=True)
 
+                # Bulk insert bypasses upsert_clip, so rebuild rollups and action rows in one pass
+                import clip_actions
+                import clip_rollups
+                from psycopg.rows import dict_row
+                with cloud_conn.cursor(row_factory=dict_row) as derived_cur:
+                    clip_rollups.rebuild(derived_cur, clip_rollups.POSTGRES)
+                    clip_actions.backfill(derived_cur, clip_actions.POSTGRES)
                 cloud_conn.commit()
                 print(f"  ✅ Uploaded {len(local_clips)} clips successfully", flush=True)
 
@@ -1270,6 +1499,7 @@ if __name__ == '__main__':
     print(f"📁 Serving clips from: {CLIPS_DIR}")
     print(f"🌐 Server running at: http://127.0.0.1:8000")
     print(f"✋ Press Ctrl+C to stop\n")
+    startup()
 
     # R2-enabled deployment
     app.run(host='127.0.0.1', port=8000, debug=False)
@@ -0,0 +1,131 @@
+"""
+Signed, expiring media URLs
+Clip URLs handed to the UI carry ?exp=<unix time>&sig=<HMAC-SHA256 of path and
+exp>, so a <video> element (which cannot send a Bearer header) can stream
+/clips/<file> and serve_clip only has to check the signature in constant time:
+no JWT decode, no DB. Expiry times are rounded up to EXPIRY_BUCKET so the same
+clip keeps the same URL for a while and browser/CDN caches keep hitting.
+
+In the cloud, R2_PRESIGN_URLS=1 swaps public R2 links for presigned GET URLs,
+cached per object until they are half-way to expiry.
+"""
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlsplit
+
+from cloud_config import JWT_SECRET_KEY
+
+MEDIA_URL_TTL = int(os.getenv('MEDIA_URL_TTL', str(6 * 3600)))
+EXPIRY_BUCKET = 3600
+SIGNATURE_BYTES = 16
+# Separate key from the JWT secret so a leaked media URL says nothing about tokens
+_MEDIA_KEY = hmac.new(
+    (os.getenv('MEDIA_URL_SECRET') or JWT_SECRET_KEY).encode(), b'media-url-v1', hashlib.sha256
+).digest()
+
+R2_PRESIGN_URLS = os.getenv('R2_PRESIGN_URLS', '').lower() in ('1', 'true', 'yes')
+# Public base the stored clip URLs start with (deploy writes R2_PUBLIC_URL/<file>)
+R2_PUBLIC_URL = os.getenv('R2_PUBLIC_URL', '').rstrip('/')
+R2_PRESIGN_TTL = int(os.getenv('R2_PRESIGN_TTL', str(12 * 3600)))
+PRESIGN_CACHE_SIZE = 4096
+
+
+def _signature(path: str, expires: int) -> str:
+    digest = hmac.new(_MEDIA_KEY, f"{path}\n{expires}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:SIGNATURE_BYTES]).rstrip(b'=').decode()
+
+
+@lru_cache(maxsize=8192)
+def _signed(path: str, expires: int) -> str:
+    return f"{path}?exp={expires}&sig={_signature(path, expires)}"
+
+
+def sign_path(path: str, ttl: int = MEDIA_URL_TTL, now: Optional[float] = None) -> str:
+    """`path` with exp/sig query parameters, valid for at least `ttl` seconds"""
+    now = time.time() if now is None else now
+    expires = int(-(-(now + ttl) // EXPIRY_BUCKET) * EXPIRY_BUCKET)
+    return _signed(path, expires)
+
+
+def verify_signature(path: str, expires: Optional[str], signature: Optional[str],
+                     now: Optional[float] = None) -> bool:
+    if not expires or not signature or not expires.isdigit():
+        return False
+    if int(expires) < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(_signature(path, int(expires)), signature)
+
+
+def seconds_left(expires: str, now: Optional[float] = None) -> int:
+    return max(0, int(expires) - int(time.time() if now is None else now))
+
+
+class PresignedUrlCache:
+    """Presigned R2 GET URLs per object key, reused until half their lifetime is gone"""
+
+    def __init__(self, maxsize: int = PRESIGN_CACHE_SIZE, ttl: int = R2_PRESIGN_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._client = None
+
+    def _s3(self):
+        if self._client is None:
+            import boto3
+            from cloud_config import R2_ACCESS_KEY, R2_ENDPOINT, R2_SECRET_KEY
+
+            self._client = boto3.client(
+                's3', endpoint_url=R2_ENDPOINT, aws_access_key_id=R2_ACCESS_KEY,
+                aws_secret_access_key=R2_SECRET_KEY, region_name='auto',
+            )
+        return self._client
+
+    def get(self, key: str) -> str:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] - now > self.ttl / 2:
+                self._entries.move_to_end(key)
+                return entry[0]
+        from cloud_config import R2_BUCKET
+
+        url = self._s3().generate_presigned_url(
+            'get_object', Params={'Bucket': R2_BUCKET, 'Key': key}, ExpiresIn=self.ttl,
+        )
+        with self._lock:
+            self._entries[key] = (url, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return url
+
+
+presigned_urls = PresignedUrlCache()
+
+
+def presign_r2_url(url: str) -> str:
+    """Presigned equivalent of a public R2 object URL (unchanged unless R2_PRESIGN_URLS is on)"""
+    if not R2_PRESIGN_URLS:
+        return url
+    if R2_PUBLIC_URL:
+        is_r2 = url.startswith(R2_PUBLIC_URL + '/')
+        key = urlsplit(url[len(R2_PUBLIC_URL):]).path.lstrip('/')
+    else:
+        parts = urlsplit(url)
+        is_r2 = parts.netloc.endswith('.r2.dev')
+        key = parts.path.lstrip('/')
+    if not is_r2 or not key:
+        return url
+    try:
+        return presigned_urls.get(key)
+    except Exception as e:
+        print(f"⚠️  Could not presign {key}: {e}")
+        return url
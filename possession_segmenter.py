@@ -0,0 +1,221 @@
+"""
+Possession-boundary suggestions for a full-game video
+Two ffmpeg decodes are streamed into NumPy side by side:
+  video - tiny grayscale frames (FRAME_FPS per second) -> scene-change score per step
+          from frame differences and luma-histogram distance (camera cuts, replays)
+  audio - 16 kHz mono PCM -> loudness (crowd) and a whistle score per step, a tonal
+          peak in the 2.5-4.5 kHz band
+Every signal lands on the same STEP_SECONDS grid. The signals are robust-z-scored
+and blended into one boundary score, and peaks at least MIN_POSSESSION_SECONDS
+apart become boundaries. Consecutive boundaries form suggested possessions in
+the tagger's Start/End Time format, ready to be reviewed and accepted in bulk.
+
+    python possession_segmenter.py <game.mp4> [--json out.json]
+"""
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+FRAME_FPS = 4
+STEP_SECONDS = 1.0 / FRAME_FPS
+FRAME_WIDTH, FRAME_HEIGHT = 64, 36
+HIST_BINS = 16
+AUDIO_RATE = 16000
+WHISTLE_BAND = (2500.0, 4500.0)
+WHISTLE_TONALITY = 25.0  # band peak / band mean power that counts as a pure tone
+
+# Blend weights for the combined boundary score
+WEIGHTS = {'whistle': 0.5, 'scene': 0.35, 'crowd': 0.15}
+# z-score at which each cue saturates to 1.0
+SATURATION = {'whistle': 8.0, 'scene': 10.0, 'crowd': 6.0}
+# Smallest spread used when z-scoring each cue (score units, band fraction, dB)
+MIN_SCALE = {'scene': 0.02, 'whistle': 0.01, 'crowd': 1.0}
+CUE_Z = 3.0
+BOUNDARY_THRESHOLD = 0.3
+MIN_POSSESSION_SECONDS = 5.0
+REVIEW_POSSESSION_SECONDS = 35.0
+MAX_POSSESSION_SECONDS = 90.0  # longer gaps are timeouts, breaks or halftime
+
+CHUNK_FRAMES = 512
+CHUNK_STEPS = 240
+
+
+def _ffmpeg(args: List[str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-threads', '0', *args, 'pipe:1'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+
+def _read_chunks(proc: subprocess.Popen, chunk_bytes: int):
+    try:
+        while True:
+            data = proc.stdout.read(chunk_bytes)
+            if not data:
+                break
+            yield data
+    finally:
+        proc.stdout.close()
+        if proc.wait() != 0:
+            raise RuntimeError(f"FFmpeg error: {proc.stderr.read().decode(errors='replace').strip()}")
+
+
+def scene_scores(video_path: Path) -> np.ndarray:
+    """Per-step scene change score in [0, 1]: mean |pixel diff| blended with histogram L1 distance"""
+    proc = _ffmpeg(['-i', str(video_path), '-an', '-sn',
+                    '-vf', f'fps={FRAME_FPS},scale={FRAME_WIDTH}:{FRAME_HEIGHT}:flags=fast_bilinear,format=gray',
+                    '-f', 'rawvideo'])
+    frame_size = FRAME_WIDTH * FRAME_HEIGHT
+    scores, previous = [], None
+    for data in _read_chunks(proc, frame_size * CHUNK_FRAMES):
+        usable = len(data) - len(data) % frame_size
+        frames = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, frame_size)
+        if previous is not None:
+            frames = np.vstack((previous, frames))
+        if len(frames) > 1:
+            diff = np.abs(np.diff(frames.astype(np.int16), axis=0)).mean(axis=1) / 255.0
+            binned = frames // (256 // HIST_BINS) + (np.arange(len(frames)) * HIST_BINS)[:, None]
+            hist = np.bincount(binned.ravel(), minlength=len(frames) * HIST_BINS)
+            hist = hist.reshape(len(frames), HIST_BINS) / frame_size
+            hist_dist = np.abs(np.diff(hist, axis=0)).sum(axis=1) / 2.0
+            scores.append(0.5 * diff + 0.5 * hist_dist)
+        previous = frames[-1:]
+    # The first frame has nothing to differ from
+    return np.concatenate([np.zeros(1)] + scores) if scores else np.zeros(0)
+
+
+def audio_features(video_path: Path) -> Dict[str, np.ndarray]:
+    """Per-step loudness (dBFS) and whistle score"""
+    proc = _ffmpeg(['-i', str(video_path), '-vn', '-sn', '-ac', '1', '-ar', str(AUDIO_RATE), '-f', 's16le'])
+    step = int(AUDIO_RATE * STEP_SECONDS)
+    freqs = np.fft.rfftfreq(step, 1.0 / AUDIO_RATE)
+    band = (freqs >= WHISTLE_BAND[0]) & (freqs <= WHISTLE_BAND[1])
+    window = np.hanning(step).astype(np.float32)
+    loudness, whistle = [], []
+    for data in _read_chunks(proc, step * 2 * CHUNK_STEPS):
+        samples = np.frombuffer(data[:len(data) - len(data) % 2], dtype='<i2').astype(np.float32) / 32768.0
+        if len(samples) % step:
+            samples = np.pad(samples, (0, step - len(samples) % step))
+        frames = samples.reshape(-1, step)
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        power = np.abs(np.fft.rfft(frames * window, axis=1)) ** 2
+        band_power = power[:, band]
+        total = power.sum(axis=1) + 1e-12
+        tonality = band_power.max(axis=1) / (band_power.mean(axis=1) + 1e-12)
+        fraction = band_power.sum(axis=1) / total
+        loudness.append(20.0 * np.log10(np.maximum(rms, 1e-10)))
+        whistle.append(np.where(tonality >= WHISTLE_TONALITY, fraction, 0.0))
+    if not loudness:
+        return {'loudness': np.zeros(0), 'whistle': np.zeros(0)}
+    return {'loudness': np.concatenate(loudness), 'whistle': np.concatenate(whistle)}
+
+
+def robust_z(values: np.ndarray, min_scale: float) -> np.ndarray:
+    """(x - median) / MAD, with the scale floored so a near-constant signal doesn't turn noise into peaks"""
+    median = np.median(values)
+    mad = np.median(np.abs(values - median)) * 1.4826
+    return (values - median) / max(mad, min_scale)
+
+
+def pick_boundaries(score: np.ndarray, threshold: float = BOUNDARY_THRESHOLD,
+                    min_gap_steps: int = int(MIN_POSSESSION_SECONDS / STEP_SECONDS)) -> np.ndarray:
+    """Local maxima above `threshold`, strongest first, suppressing anything within min_gap_steps"""
+    if len(score) < 3:
+        return np.zeros(0, dtype=int)
+    peaks = np.flatnonzero((score[1:-1] >= score[:-2]) & (score[1:-1] > score[2:]) & (score[1:-1] >= threshold)) + 1
+    taken = np.zeros(len(score), dtype=bool)
+    chosen = []
+    for idx in peaks[np.argsort(-score[peaks], kind='stable')]:
+        lo, hi = max(0, idx - min_gap_steps), idx + min_gap_steps + 1
+        if not taken[lo:hi].any():
+            chosen.append(idx)
+            taken[idx] = True
+    return np.sort(np.array(chosen, dtype=int))
+
+
+def format_time(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def suggest_possessions(video_path: Path) -> Dict[str, Any]:
+    """Analyse `video_path`; returns boundaries, suggested possessions and timing"""
+    video_path = Path(video_path)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        scene_future = pool.submit(scene_scores, video_path)
+        audio_future = pool.submit(audio_features, video_path)
+        scene = scene_future.result()
+        try:
+            audio = audio_future.result()
+        except RuntimeError as e:
+            # Silent/no-audio sources still get scene-cut boundaries
+            print(f"⚠️  Audio analysis skipped: {e}")
+            audio = {'loudness': np.zeros(0), 'whistle': np.zeros(0)}
+
+    steps = min(len(scene), len(audio['loudness'])) if len(audio['loudness']) else len(scene)
+    duration = max(len(scene), len(audio['loudness'])) * STEP_SECONDS
+    cues = {
+        'scene': robust_z(scene[:steps], MIN_SCALE['scene']) if steps else np.zeros(0),
+        'whistle': robust_z(audio['whistle'][:steps], MIN_SCALE['whistle']) if len(audio['whistle']) else np.zeros(steps),
+        'crowd': robust_z(audio['loudness'][:steps], MIN_SCALE['crowd']) if len(audio['loudness']) else np.zeros(steps),
+    }
+    score = sum(WEIGHTS[name] * np.clip(z / SATURATION[name], 0.0, 1.0) for name, z in cues.items())
+    if np.isscalar(score):
+        score = np.zeros(steps)
+
+    boundaries = [
+        {
+            'seconds': round(float(idx * STEP_SECONDS), 2),
+            'time': format_time(idx * STEP_SECONDS),
+            'score': round(float(score[idx]), 3),
+            'cues': [name for name, z in cues.items() if z[idx] >= CUE_Z],
+        }
+        for idx in pick_boundaries(score)
+    ]
+
+    possessions = []
+    for start, end in zip(boundaries, boundaries[1:]):
+        length = end['seconds'] - start['seconds']
+        if length > MAX_POSSESSION_SECONDS:
+            continue
+        possessions.append({
+            'Possession #': len(possessions) + 1,
+            'Start Time': format_time(start['seconds']),
+            'End Time': format_time(np.ceil(end['seconds'])),
+            'start_seconds': start['seconds'],
+            'end_seconds': end['seconds'],
+            'confidence': round(min(start['score'], end['score']), 3),
+            'review': length > REVIEW_POSSESSION_SECONDS,
+        })
+
+    elapsed = time.perf_counter() - started
+    return {
+        'video': str(video_path),
+        'duration_seconds': round(duration, 2),
+        'elapsed_seconds': round(elapsed, 2),
+        'realtime_factor': round(duration / elapsed, 1) if elapsed else None,
+        'boundaries': boundaries,
+        'possessions': possessions,
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Suggest possession boundaries for a game video")
+    parser.add_argument('video')
+    parser.add_argument('--json', help="write the full result to this file")
+    args = parser.parse_args()
+
+    result = suggest_possessions(Path(args.video))
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+    print(f"✅ {len(result['possessions'])} possessions from {len(result['boundaries'])} boundaries; "
+          f"{result['duration_seconds']:.0f}s of video in {result['elapsed_seconds']:.1f}s "
+          f"({result['realtime_factor']}x real time)")
@@ -0,0 +1,498 @@
+"""
+Versioned schema migrations shared by analytics_db (SQLite) and cloud_db (PostgreSQL)
+Each migration has per-dialect steps (SQL strings or callables taking (cur, dialect)).
+Applied versions are recorded in schema_version, so a start-up against an
+up-to-date database costs a single query. Migrations marked heavy (backfills,
+index builds) are skipped on the start-up path and applied later by
+run_heavy_migrations(), e.g. from a background thread or the CLI:
+
+    python schema_migrations.py            # apply everything to the local SQLite DB
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+import clip_actions
+import clip_rollups
+from clip_fields import typed_values
+
+SQLITE = "sqlite"
+POSTGRES = "postgresql"
+
+Step = Union[str, Callable[[Any, str], None]]
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    steps: Dict[str, List[Step]]
+    heavy: bool = False
+
+
+def _placeholder(dialect: str) -> str:
+    return "?" if dialect == SQLITE else "%s"
+
+
+def _columns(cur, dialect: str, table: str) -> set:
+    if dialect == SQLITE:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {row["name"] for row in cur.fetchall()}
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {row["column_name"] for row in cur.fetchall()}
+
+
+def add_column(table: str, column: str, sqltype: str) -> Step:
+    """Idempotent ADD COLUMN (SQLite has no IF NOT EXISTS for columns)"""
+    def step(cur, dialect):
+        if column not in _columns(cur, dialect, table):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sqltype}")
+    return step
+
+
+def _rename_action_trigger(cur, dialect: str) -> None:
+    columns = _columns(cur, dialect, "clips")
+    if "play_trigger" in columns:
+        return
+    if "action_trigger" in columns:
+        cur.execute("ALTER TABLE clips RENAME COLUMN action_trigger TO play_trigger")
+    else:
+        cur.execute("ALTER TABLE clips ADD COLUMN play_trigger TEXT")
+
+
+def _backfill_typed_columns(cur, dialect: str) -> None:
+    ph = _placeholder(dialect)
+    cur.execute("SELECT id, start_time, end_time, shot_x, shot_y FROM clips")
+    rows = [(*typed_values(row).values(), row["id"]) for row in cur.fetchall()]
+    cur.executemany(
+        f"UPDATE clips SET start_seconds = {ph}, end_seconds = {ph}, shot_x_num = {ph}, shot_y_num = {ph} "
+        f"WHERE id = {ph}",
+        rows,
+    )
+
+
+def _clips_table(timestamp_type: str) -> str:
+    return f"""
+    CREATE TABLE IF NOT EXISTS clips (
+        id TEXT PRIMARY KEY,
+        filename TEXT NOT NULL,
+        path TEXT NOT NULL,
+        source_video TEXT,
+        game_id INTEGER,
+        canonical_game_id TEXT,
+        canonical_clip_id TEXT,
+        opponent TEXT,
+        opponent_slug TEXT,
+        location TEXT,
+        game_score TEXT,
+        quarter INTEGER,
+        possession INTEGER,
+        situation TEXT,
+        formation TEXT,
+        play_name TEXT,
+        scout_coverage TEXT,
+        play_trigger TEXT,
+        action_types TEXT,
+        action_sequence TEXT,
+        coverage TEXT,
+        ball_screen TEXT,
+        off_ball_screen TEXT,
+        help_rotation TEXT,
+        disruption TEXT,
+        breakdown TEXT,
+        result TEXT,
+        paint_touch TEXT,
+        shooter TEXT,
+        shot_location TEXT,
+        contest TEXT,
+        rebound TEXT,
+        points INTEGER,
+        has_shot TEXT,
+        shot_x TEXT,
+        shot_y TEXT,
+        shot_result TEXT,
+        player_designation TEXT,
+        notes TEXT,
+        start_time TEXT,
+        end_time TEXT,
+        actions_json TEXT,
+        created_at {timestamp_type} DEFAULT CURRENT_TIMESTAMP,
+        updated_at {timestamp_type} DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+
+def _comm_segments_table(id_type: str, timestamp_type: str) -> str:
+    return f"""
+    CREATE TABLE IF NOT EXISTS comm_segments (
+        id {id_type},
+        clip_id TEXT NOT NULL REFERENCES clips(id) ON DELETE CASCADE,
+        start REAL NOT NULL,
+        "end" REAL NOT NULL,
+        duration REAL NOT NULL,
+        peak_dbfs REAL,
+        rms REAL,
+        rms_dbfs REAL,
+        created_at {timestamp_type} DEFAULT CURRENT_TIMESTAMP
+    )
+    """
+
+
+_BASE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_clips_game ON clips (game_id)",
+    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_game ON clips (canonical_game_id)",
+    "CREATE INDEX IF NOT EXISTS idx_clips_canonical_clip ON clips (canonical_clip_id)",
+    "CREATE INDEX IF NOT EXISTS idx_comm_clip ON comm_segments (clip_id)",
+    "CREATE INDEX IF NOT EXISTS idx_comm_start ON comm_segments (clip_id, start)",
+]
+
+# Columns added after the first schema shipped; no-ops on databases that already have them
+_LEGACY_COLUMNS = [
+    add_column("clips", "player_designation", "TEXT"),
+    _rename_action_trigger,
+    add_column("clips", "actions_json", "TEXT"),
+    add_column("clips", "location", "TEXT"),
+    add_column("clips", "game_score", "TEXT"),
+    add_column("clips", "source_video", "TEXT"),
+]
+
+_FILTER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_clips_opponent_quarter ON clips (opponent, quarter)",
+    "CREATE INDEX IF NOT EXISTS idx_clips_coverage_result ON clips (coverage, result)",
+    "CREATE INDEX IF NOT EXISTS idx_clips_result ON clips (result)",
+]
+# The clip list's "has shot" filter; idx_clips_shots only covers located shots
+_HAS_SHOT_INDEX = "CREATE INDEX IF NOT EXISTS idx_clips_has_shot ON clips (has_shot, game_id)"
+
+# fetch_shots filters on exactly this predicate, so the partial index below applies to it.
+# It covers the selected columns, the shot chart's filters and has_shot (SQLite only
+# treats indexed columns as covered), so no filter path has to visit the table.
+LOCATED_SHOT = "has_shot = 'Yes' AND shot_x_num IS NOT NULL AND shot_y_num IS NOT NULL"
+
+_SHOTS_INDEX = [
+    "DROP INDEX IF EXISTS idx_clips_shots",
+    "CREATE INDEX idx_clips_shots ON clips "
+    "(game_id, quarter, shot_x_num, shot_y_num, shot_result, points, opponent, coverage, player_designation, has_shot) "
+    f"WHERE {LOCATED_SHOT}",
+]
+
+
+# One counter row numbers every clip write and delete. Bumping it takes the row's
+# lock until commit, so numbers are handed out in commit order and a reader that
+# has seen N can never later find a change numbered below N committing (a SEQUENCE
+# or a clock would allow that). SQLite already serializes writers.
+_CHANGE_COUNTER = [
+    """
+    CREATE TABLE IF NOT EXISTS clip_change_counter (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        value BIGINT NOT NULL
+    )
+    """,
+    "INSERT INTO clip_change_counter (id, value) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+]
+_CHANGE_SEQ_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_clips_change_seq ON clips (change_seq)",
+    "CREATE INDEX IF NOT EXISTS idx_tombstones_change_seq ON clip_tombstones (change_seq)",
+]
+_SQLITE_BUMP = "UPDATE clip_change_counter SET value = value + 1 WHERE id = 1;"
+_SQLITE_CURRENT = "SELECT value FROM clip_change_counter WHERE id = 1"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline schema", {
+        SQLITE: [
+            _clips_table("TEXT"),
+            _comm_segments_table("INTEGER PRIMARY KEY AUTOINCREMENT", "TEXT"),
+            *_LEGACY_COLUMNS,
+            *_BASE_INDEXES,
+        ],
+        POSTGRES: [
+            _clips_table("TIMESTAMP"),
+            _comm_segments_table("SERIAL PRIMARY KEY", "TIMESTAMP"),
+            *_LEGACY_COLUMNS,
+            *_BASE_INDEXES,
+            """
+            CREATE TABLE IF NOT EXISTS delete_requests (
+                id TEXT PRIMARY KEY,
+                requested_by TEXT NOT NULL,
+                item_type TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                item_name TEXT,
+                reason TEXT,
+                status TEXT DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                reviewed_by TEXT,
+                reviewed_at TIMESTAMP
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_delete_requests_status ON delete_requests (status)",
+            """
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id SERIAL PRIMARY KEY,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                username TEXT NOT NULL,
+                action TEXT NOT NULL,
+                item_type TEXT,
+                item_id TEXT,
+                changes JSONB,
+                ip_address TEXT
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log (timestamp DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_audit_user ON audit_log (username)",
+        ],
+    }),
+    Migration(2, "hls_url column", {
+        SQLITE: [add_column("clips", "hls_url", "TEXT")],
+        POSTGRES: [add_column("clips", "hls_url", "TEXT")],
+    }),
+    Migration(3, "delta sync tombstones", {
+        # Changed rows are found via updated_at, deleted ones via tombstones kept by triggers
+        SQLITE: [
+            "CREATE INDEX IF NOT EXISTS idx_clips_updated ON clips (updated_at)",
+            """
+            CREATE TABLE IF NOT EXISTS clip_tombstones (
+                clip_id TEXT PRIMARY KEY,
+                deleted_at TEXT NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tombstones_deleted ON clip_tombstones (deleted_at)",
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_clips_tombstone AFTER DELETE ON clips
+            BEGIN
+                INSERT OR REPLACE INTO clip_tombstones (clip_id, deleted_at)
+                VALUES (OLD.id, strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_clips_untombstone AFTER INSERT ON clips
+            BEGIN
+                DELETE FROM clip_tombstones WHERE clip_id = NEW.id;
+            END
+            """,
+        ],
+        POSTGRES: [
+            "CREATE INDEX IF NOT EXISTS idx_clips_updated ON clips (updated_at)",
+            """
+            CREATE TABLE IF NOT EXISTS clip_tombstones (
+                clip_id TEXT PRIMARY KEY,
+                deleted_at TIMESTAMP NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_tombstones_deleted ON clip_tombstones (deleted_at)",
+            """
+            CREATE OR REPLACE FUNCTION record_clip_tombstone() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO clip_tombstones (clip_id, deleted_at)
+                    VALUES (OLD.id, NOW() AT TIME ZONE 'utc')
+                    ON CONFLICT (clip_id) DO UPDATE SET deleted_at = EXCLUDED.deleted_at;
+                    RETURN OLD;
+                END IF;
+                DELETE FROM clip_tombstones WHERE clip_id = NEW.id;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_clips_tombstone ON clips",
+            """
+            CREATE TRIGGER trg_clips_tombstone AFTER INSERT OR DELETE ON clips
+            FOR EACH ROW EXECUTE FUNCTION record_clip_tombstone()
+            """,
+        ],
+    }),
+    Migration(4, "typed shadow columns", {
+        SQLITE: [
+            add_column("clips", "start_seconds", "REAL"),
+            add_column("clips", "end_seconds", "REAL"),
+            add_column("clips", "shot_x_num", "REAL"),
+            add_column("clips", "shot_y_num", "REAL"),
+        ],
+        POSTGRES: [
+            add_column("clips", "start_seconds", "DOUBLE PRECISION"),
+            add_column("clips", "end_seconds", "DOUBLE PRECISION"),
+            add_column("clips", "shot_x_num", "DOUBLE PRECISION"),
+            add_column("clips", "shot_y_num", "DOUBLE PRECISION"),
+        ],
+    }),
+    Migration(5, "backfill typed shadow columns", {
+        SQLITE: [_backfill_typed_columns],
+        POSTGRES: [_backfill_typed_columns],
+    }, heavy=True),
+    Migration(6, "filter indexes", {
+        SQLITE: list(_FILTER_INDEXES),
+        POSTGRES: list(_FILTER_INDEXES),
+    }, heavy=True),
+    Migration(7, "analytics rollup table", {
+        SQLITE: [clip_rollups.CREATE_TABLE, clip_rollups.CREATE_INDEX],
+        POSTGRES: [clip_rollups.CREATE_TABLE, clip_rollups.CREATE_INDEX],
+    }),
+    Migration(8, "populate analytics rollups", {
+        SQLITE: [clip_rollups.rebuild],
+        POSTGRES: [clip_rollups.rebuild],
+    }, heavy=True),
+    Migration(9, "clip_actions table", {
+        SQLITE: [clip_actions.CREATE_TABLE, *clip_actions.CREATE_INDEXES],
+        POSTGRES: [clip_actions.CREATE_TABLE, *clip_actions.CREATE_INDEXES],
+    }),
+    Migration(10, "backfill clip_actions from actions_json", {
+        SQLITE: [clip_actions.backfill],
+        POSTGRES: [clip_actions.backfill],
+    }, heavy=True),
+    Migration(11, "partial covering shots index", {
+        SQLITE: list(_SHOTS_INDEX),
+        POSTGRES: list(_SHOTS_INDEX),
+    }, heavy=True),
+    Migration(12, "clip change sequence", {
+        # Delta sync cursors are numbers from one counter shared by clip writes and
+        # tombstones (see _CHANGE_COUNTER); rows written before this carry NULL, which
+        # no sequence cursor is older than
+        SQLITE: [
+            *_CHANGE_COUNTER,
+            add_column("clips", "change_seq", "INTEGER"),
+            add_column("clip_tombstones", "change_seq", "INTEGER"),
+            *_CHANGE_SEQ_INDEXES,
+            "DROP TRIGGER IF EXISTS trg_clips_tombstone",
+            f"""
+            CREATE TRIGGER trg_clips_tombstone AFTER DELETE ON clips
+            BEGIN
+                {_SQLITE_BUMP}
+                INSERT OR REPLACE INTO clip_tombstones (clip_id, deleted_at, change_seq)
+                VALUES (OLD.id, strftime('%Y-%m-%dT%H:%M:%f', 'now'), ({_SQLITE_CURRENT}));
+            END
+            """,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_clips_change_insert AFTER INSERT ON clips
+            BEGIN
+                {_SQLITE_BUMP}
+                UPDATE clips SET change_seq = ({_SQLITE_CURRENT}) WHERE id = NEW.id;
+            END
+            """,
+            # The WHEN keeps the trigger's own change_seq update from firing it again
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_clips_change_update AFTER UPDATE ON clips
+            WHEN NEW.change_seq IS OLD.change_seq
+            BEGIN
+                {_SQLITE_BUMP}
+                UPDATE clips SET change_seq = ({_SQLITE_CURRENT}) WHERE id = NEW.id;
+            END
+            """,
+        ],
+        POSTGRES: [
+            *_CHANGE_COUNTER,
+            add_column("clips", "change_seq", "BIGINT"),
+            add_column("clip_tombstones", "change_seq", "BIGINT"),
+            *_CHANGE_SEQ_INDEXES,
+            """
+            CREATE OR REPLACE FUNCTION next_clip_change() RETURNS BIGINT AS $$
+                UPDATE clip_change_counter SET value = value + 1 WHERE id = 1 RETURNING value
+            $$ LANGUAGE sql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION stamp_clip_change() RETURNS trigger AS $$
+            BEGIN
+                NEW.change_seq := next_clip_change();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_clips_change_seq ON clips",
+            """
+            CREATE TRIGGER trg_clips_change_seq BEFORE INSERT OR UPDATE ON clips
+            FOR EACH ROW EXECUTE FUNCTION stamp_clip_change()
+            """,
+            """
+            CREATE OR REPLACE FUNCTION record_clip_tombstone() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO clip_tombstones (clip_id, deleted_at, change_seq)
+                    VALUES (OLD.id, NOW() AT TIME ZONE 'utc', next_clip_change())
+                    ON CONFLICT (clip_id) DO UPDATE
+                        SET deleted_at = EXCLUDED.deleted_at, change_seq = EXCLUDED.change_seq;
+                    RETURN OLD;
+                END IF;
+                DELETE FROM clip_tombstones WHERE clip_id = NEW.id;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+        ],
+    }),
+    Migration(13, "has_shot filter index", {
+        SQLITE: [_HAS_SHOT_INDEX],
+        POSTGRES: [_HAS_SHOT_INDEX],
+    }, heavy=True),
+]
+
+LATEST_VERSION = max(m.version for m in MIGRATIONS)
+
+# Arbitrary constant so concurrent workers don't migrate the same Postgres DB at once
+_PG_LOCK_KEY = 0x0DEF_E45E
+
+
+def _ensure_version_table(cur, dialect: str) -> None:
+    timestamp_type = "TEXT" if dialect == SQLITE else "TIMESTAMP"
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at {timestamp_type} DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cur, dialect: str) -> set:
+    _ensure_version_table(cur, dialect)
+    cur.execute("SELECT version FROM schema_version")
+    return {row["version"] for row in cur.fetchall()}
+
+
+def is_current(cur, dialect: str) -> bool:
+    """The start-up check: no DDL, and a single query once schema_version exists"""
+    if dialect == SQLITE:
+        cur.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    else:
+        cur.execute("SELECT to_regclass('schema_version') AS name")
+    found = cur.fetchone()
+    if not found or not found["name"]:
+        return False
+    cur.execute("SELECT COUNT(*) AS applied, MAX(version) AS latest FROM schema_version")
+    row = cur.fetchone()
+    return row["applied"] == len(MIGRATIONS) and row["latest"] == LATEST_VERSION
+
+
+def migrate(cur, dialect: str, include_heavy: bool = False) -> List[int]:
+    """Apply pending migrations in order; returns the versions applied"""
+    if dialect == POSTGRES:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_PG_LOCK_KEY,))
+    done = applied_versions(cur, dialect)
+    ph = _placeholder(dialect)
+    applied: List[int] = []
+    for migration in MIGRATIONS:
+        if migration.version in done or (migration.heavy and not include_heavy):
+            continue
+        for step in migration.steps[dialect]:
+            if callable(step):
+                step(cur, dialect)
+            else:
+                cur.execute(step)
+        conflict = "OR IGNORE " if dialect == SQLITE else ""
+        suffix = "" if dialect == SQLITE else " ON CONFLICT (version) DO NOTHING"
+        cur.execute(
+            f"INSERT {conflict}INTO schema_version (version, name) VALUES ({ph}, {ph}){suffix}",
+            (migration.version, migration.name),
+        )
+        applied.append(migration.version)
+    return applied
+
+
+def pending(cur, dialect: str, heavy: Optional[bool] = None) -> List[Migration]:
+    done = applied_versions(cur, dialect)
+    return [m for m in MIGRATIONS if m.version not in done and (heavy is None or m.heavy == heavy)]
+
+
+if __name__ == "__main__":
+    from analytics_db import run_heavy_migrations
+
+    applied_now = run_heavy_migrations()
+    print(f"✅ Schema at version {LATEST_VERSION} (applied now: {applied_now or 'none'})")
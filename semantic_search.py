@@ -22,6 +22,27 @@ except ImportError:
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDINGS_FILE = Path(__file__).resolve().parent / "data" / "clip_embeddings.json"
 
+
+def openai_embeddings(texts: List[str]) -> List[List[float]]:
+    """One embedding per text from the OpenAI API"""
+    if not OPENAI_AVAILABLE:
+        raise ImportError("OpenAI library not available")
+
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+
+    client = OpenAI(api_key=api_key)
+    response = client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=texts
+    )
+    return [embedding_obj.embedding for embedding_obj in response.data]
+
+
+# Embedding provider: texts -> vectors. Benchmarks swap in a local fake.
+embed_texts = openai_embeddings
+
 def get_clip_text_representation(clip: Dict[str, Any]) -> str:
     """
     Convert clip metadata into a rich text representation for embedding.
@@ -102,14 +123,6 @@ def generate_embeddings_for_all_clips() -> Dict[str, List[float]]:
     Generate embeddings for all clips in the database.
     Returns dict mapping clip_id -> embedding vector.
     """
-    if not OPENAI_AVAILABLE:
-        raise ImportError("OpenAI library not available")
-
-    api_key = os.environ.get('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
-
-    client = OpenAI(api_key=api_key)
     clips = fetch_clips()
 
     embeddings = {}
@@ -127,14 +140,8 @@ def generate_embeddings_for_all_clips() -> Dict[str, List[float]]:
 
     # Generate embeddings in batch (more efficient)
     if texts_to_embed:
-        response = client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=texts_to_embed
-        )
-
-        for i, embedding_obj in enumerate(response.data):
-            clip_id = clip_ids[i]
-            embeddings[clip_id] = embedding_obj.embedding
+        for clip_id, embedding in zip(clip_ids, embed_texts(texts_to_embed)):
+            embeddings[clip_id] = embedding
 
     print(f"✅ Generated {len(embeddings)} embeddings")
     return embeddings
@@ -174,13 +181,6 @@ def semantic_search(query: str, top_k: int = 20) -> List[Dict[str, Any]]:
     Returns:
         List of clip dicts with similarity scores
     """
-    if not OPENAI_AVAILABLE:
-        raise ImportError("OpenAI library not available")
-
-    api_key = os.environ.get('OPENAI_API_KEY')
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable not set")
-
     # Load embeddings
     embeddings = load_embeddings()
     if not embeddings:
@@ -189,12 +189,7 @@ def semantic_search(query: str, top_k: int = 20) -> List[Dict[str, Any]]:
         save_embeddings(embeddings)
 
     # Generate query embedding
-    client = OpenAI(api_key=api_key)
-    response = client.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=[query]
-    )
-    query_embedding = response.data[0].embedding
+    query_embedding = embed_texts([query])[0]
 
     # Calculate similarities
     similarities = []
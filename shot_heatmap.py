@@ -0,0 +1,158 @@
+"""
+Server-side shot chart aggregation
+Shot coordinates are stored as percentages (0-100) of the half-court image the
+tagger clicked on. Rather than shipping every shot to the browser, shots are
+binned here with vectorised NumPy into a square grid or a hexagonal lattice,
+and each bin carries attempts, makes, points and points per shot.
+
+Results are cached per (filters, binning, size) and reused until the clips
+table fingerprint changes.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+COURT_EXTENT = 100.0
+BINNINGS = ('grid', 'hex')
+DEFAULT_BIN_SIZE = {'grid': 5.0, 'hex': 4.0}
+MIN_BIN_SIZE = 1.0
+MAX_BIN_SIZE = 50.0
+
+MADE_RESULTS = ('make', 'made fg')
+MISSED_RESULTS = ('miss', 'missed fg')
+CACHE_SIZE = 64
+
+_SQRT3 = np.sqrt(3.0)
+
+
+def _shot_arrays(shots: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Field-goal attempts only; free throws have no meaningful court location"""
+    fg = [
+        s for s in shots
+        if (s.get('shot_result') or '').strip().lower() in MADE_RESULTS + MISSED_RESULTS
+    ]
+    x = np.fromiter((s['shot_x_num'] for s in fg), dtype=float, count=len(fg))
+    y = np.fromiter((s['shot_y_num'] for s in fg), dtype=float, count=len(fg))
+    made = np.fromiter(
+        ((s['shot_result'] or '').strip().lower() in MADE_RESULTS for s in fg), dtype=bool, count=len(fg)
+    )
+    points = np.fromiter((s.get('points') or 0 for s in fg), dtype=float, count=len(fg))
+    np.clip(x, 0.0, COURT_EXTENT, out=x)
+    np.clip(y, 0.0, COURT_EXTENT, out=y)
+    return x, y, made, points
+
+
+def grid_bins(x: np.ndarray, y: np.ndarray, size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Square cells of `size` percent; returns (cell key, cell centres)"""
+    cells = int(np.ceil(COURT_EXTENT / size))
+    ix = np.minimum((x // size).astype(np.int64), cells - 1)
+    iy = np.minimum((y // size).astype(np.int64), cells - 1)
+    keys = ix * cells + iy
+    centres = np.column_stack(((ix + 0.5) * size, (iy + 0.5) * size))
+    return keys, centres
+
+
+def hex_bins(x: np.ndarray, y: np.ndarray, size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hexagons `size` percent apart horizontally. Two offset rectangular lattices
+    are overlaid and each shot goes to the nearer centre (the same scheme as
+    matplotlib's hexbin), giving regular hexagons without any Python loops.
+    """
+    sx, sy = size, size * _SQRT3
+    px, py = x / sx, y / sy
+
+    ix1, iy1 = np.round(px), np.round(py)
+    ix2, iy2 = np.floor(px), np.floor(py)
+    d1 = (px - ix1) ** 2 + 3.0 * (py - iy1) ** 2
+    d2 = (px - ix2 - 0.5) ** 2 + 3.0 * (py - iy2 - 0.5) ** 2
+    second = d2 < d1
+
+    cx = np.where(second, ix2 + 0.5, ix1) * sx
+    cy = np.where(second, iy2 + 0.5, iy1) * sy
+    # Doubled lattice coordinates are integers for both lattices and unique per hexagon
+    keys = np.where(second, ix2 * 2 + 1, ix1 * 2).astype(np.int64) * 100_003 \
+        + np.where(second, iy2 * 2 + 1, iy1 * 2).astype(np.int64)
+    return keys, np.column_stack((cx, cy))
+
+
+def aggregate_shots(shots: List[Dict[str, Any]], binning: str = 'hex', size: Optional[float] = None) -> Dict[str, Any]:
+    """Bin shots and total attempts/makes/points per bin"""
+    if binning not in BINNINGS:
+        raise ValueError(f"binning must be one of {', '.join(BINNINGS)}")
+    size = float(size or DEFAULT_BIN_SIZE[binning])
+    if not MIN_BIN_SIZE <= size <= MAX_BIN_SIZE:
+        raise ValueError(f"size must be between {MIN_BIN_SIZE:g} and {MAX_BIN_SIZE:g}")
+
+    x, y, made, points = _shot_arrays(shots)
+    keys, centres = (hex_bins if binning == 'hex' else grid_bins)(x, y, size)
+
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    attempts = np.bincount(inverse, minlength=len(unique))
+    makes = np.bincount(inverse, weights=made, minlength=len(unique)).astype(np.int64)
+    pts = np.bincount(inverse, weights=points, minlength=len(unique))
+    bin_centres = centres[first]
+
+    bins = [
+        {
+            'x': round(float(cx), 2),
+            'y': round(float(cy), 2),
+            'attempts': int(a),
+            'makes': int(m),
+            'points': int(p),
+            'fg_pct': round(m / a, 3),
+            'points_per_shot': round(p / a, 3),
+        }
+        for cx, cy, a, m, p in zip(bin_centres[:, 0], bin_centres[:, 1], attempts, makes, pts)
+    ]
+    total_attempts = int(attempts.sum())
+    total_makes = int(makes.sum())
+    total_points = int(pts.sum())
+    return {
+        'binning': binning,
+        'size': size,
+        'extent': COURT_EXTENT,
+        'totals': {
+            'attempts': total_attempts,
+            'makes': total_makes,
+            'points': total_points,
+            'fg_pct': round(total_makes / total_attempts, 3) if total_attempts else None,
+            'points_per_shot': round(total_points / total_attempts, 3) if total_attempts else None,
+        },
+        'bins': bins,
+    }
+
+
+class HeatmapCache:
+    """LRU of aggregates keyed by request; an entry is reused only while the data version matches"""
+
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Tuple[Hashable, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Dict[str, Any]]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], True
+        result = compute()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result, False
+
+
+cache = HeatmapCache()
+
+
+def filter_key(filters: Dict[str, Any]) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in filters.items() if v not in (None, '')))
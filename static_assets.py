@@ -0,0 +1,234 @@
+"""
+Static file layer for the built React app (ui/dist)
+The tree is indexed once at start-up instead of stat-ing the path on every
+request. For each file we pick up pre-built .br/.gz siblings (vite plugins
+or `python static_assets.py` create them); compressible files without a .gz
+get one built in memory. Responses then send the best encoding the browser
+accepts:
+  assets/<name>-<hash>.<ext>  Cache-Control: public, max-age=1y, immutable
+  everything else             no-cache + ETag, so revalidation is a 304
+Lookups don't touch the disk. At most every RECHECK_SECONDS one lookup
+re-stats index.html: a new one (a new build) re-scans the whole tree;
+otherwise unhashed files whose size/mtime changed are re-indexed and
+vanished ones dropped. reload() re-indexes immediately. Missing hashed
+assets are 404s; other unknown paths get the SPA's index.html for client
+routing.
+
+    python static_assets.py [dist_dir]   # write .gz (and .br with brotli) next to each file
+"""
+import gzip
+import mimetypes
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Union
+
+from flask import Response, request
+from werkzeug.http import quote_etag
+from werkzeug.wsgi import wrap_file
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Vite's output names: assets/index-Betroght.js, assets/index-Ic-AEHy3.css
+HASHED_ASSET_RE = re.compile(r'(^|/)assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$')
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.mjs', '.css', '.json', '.svg', '.txt', '.map', '.xml', '.webmanifest'}
+MIN_COMPRESS_BYTES = 1024
+RECHECK_SECONDS = float(os.getenv('STATIC_RECHECK_SECONDS', '5'))
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+
+class Variant(NamedTuple):
+    body: Union[Path, bytes]
+    size: int
+    etag: str
+
+
+class Asset(NamedTuple):
+    mimetype: str
+    immutable: bool
+    variants: Dict[str, Variant]  # '' = identity, 'br', 'gzip'
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+def is_hashed_asset(rel: str) -> bool:
+    return bool(HASHED_ASSET_RE.search(rel))
+
+
+def _compressible(path: Path, size: int) -> bool:
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES and size >= MIN_COMPRESS_BYTES
+
+
+def _index_file(path: Path, rel: str) -> Asset:
+    stat = path.stat()
+    etag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    variants = {'': Variant(path, stat.st_size, etag)}
+    for encoding, suffix in ENCODINGS:
+        compressed = path.with_name(path.name + suffix)
+        # A sibling older than its source is left over from a previous build
+        if compressed.is_file() and compressed.stat().st_mtime_ns >= stat.st_mtime_ns:
+            variants[encoding] = Variant(compressed, compressed.stat().st_size, f"{etag}-{encoding}")
+    if 'gzip' not in variants and _compressible(path, stat.st_size):
+        data = gzip.compress(path.read_bytes(), compresslevel=9, mtime=0)
+        variants['gzip'] = Variant(data, len(data), f"{etag}-gzip")
+    mimetype = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    return Asset(mimetype, is_hashed_asset(rel), variants, path, stat.st_size, stat.st_mtime_ns)
+
+
+def _unchanged(asset: Asset) -> bool:
+    try:
+        stat = asset.path.stat()
+    except OSError:
+        return False
+    return stat.st_size == asset.size and stat.st_mtime_ns == asset.mtime_ns
+
+
+class StaticIndex:
+    def __init__(self, root: Path, recheck_seconds: float = RECHECK_SECONDS):
+        self.root = Path(root)
+        self.recheck_seconds = recheck_seconds
+        self._assets: Optional[Dict[str, Asset]] = None
+        self._index_mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _index_html_mtime(self):
+        try:
+            return (self.root / 'index.html').stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def build(self) -> None:
+        assets = {}
+        if self.root.is_dir():
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    if name.endswith(('.br', '.gz')):
+                        continue
+                    path = Path(dirpath) / name
+                    rel = path.relative_to(self.root).as_posix()
+                    assets[rel] = _index_file(path, rel)
+        self._assets = assets
+        self._index_mtime = self._index_html_mtime()
+        self._next_check = time.monotonic() + self.recheck_seconds
+
+    def reload(self) -> None:
+        """Re-index now instead of waiting for the next periodic check"""
+        with self._lock:
+            self.build()
+
+    def _recheck(self) -> None:
+        # One thread checks; the others keep serving from the current index
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_check:
+                return
+            self._next_check = time.monotonic() + self.recheck_seconds
+            if self._index_html_mtime() != self._index_mtime:
+                # ui/dist was rebuilt since we indexed it
+                self.build()
+                return
+            # Unhashed files can be edited in place or deleted without a new index.html;
+            # hashed assets never change under the same name
+            for rel, asset in list(self._assets.items()):
+                if asset.immutable or _unchanged(asset):
+                    continue
+                if asset.path.is_file():
+                    self._assets[rel] = _index_file(asset.path, rel)
+                else:
+                    self._assets.pop(rel, None)
+        finally:
+            self._lock.release()
+
+    def lookup(self, rel: str) -> Optional[Asset]:
+        if self._assets is None:
+            with self._lock:
+                if self._assets is None:
+                    self.build()
+        elif time.monotonic() >= self._next_check:
+            self._recheck()
+        return self._assets.get(rel)
+
+    @property
+    def file_count(self) -> int:
+        return len(self._assets or {})
+
+
+def _choose_encoding(asset: Asset) -> str:
+    accepted = request.accept_encodings
+    for encoding, _ in ENCODINGS:
+        if encoding in asset.variants and accepted[encoding] > 0:
+            return encoding
+    return ''
+
+
+def send_asset(asset: Asset) -> Optional[Response]:
+    """Response for `asset`, or None if its file disappeared since the lookup"""
+    encoding = _choose_encoding(asset)
+    variant = asset.variants[encoding]
+    headers = {
+        'ETag': quote_etag(variant.etag),
+        'Cache-Control': f'public, max-age={IMMUTABLE_MAX_AGE}, immutable' if asset.immutable else 'no-cache',
+    }
+    if len(asset.variants) > 1:
+        headers['Vary'] = 'Accept-Encoding'
+    if request.if_none_match.contains(variant.etag):
+        return Response(status=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    if request.method == 'HEAD':
+        body = b''
+    elif isinstance(variant.body, bytes):
+        body = variant.body
+    else:
+        try:
+            body = wrap_file(request.environ, open(variant.body, 'rb'))
+        except FileNotFoundError:
+            return None
+    response = Response(body, headers=headers, mimetype=asset.mimetype, direct_passthrough=True)
+    response.content_length = variant.size
+    return response
+
+
+def precompress(root: Path) -> int:
+    """Write .gz (and .br when brotli is installed) beside every compressible file; returns files written"""
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = Path(dirpath) / name
+            if name.endswith(('.br', '.gz')) or not _compressible(path, path.stat().st_size):
+                continue
+            data = path.read_bytes()
+            outputs = {'.gz': lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+            if BROTLI_AVAILABLE:
+                outputs['.br'] = lambda: brotli.compress(data, quality=11)
+            for suffix, compress in outputs.items():
+                target = path.with_name(name + suffix)
+                if target.exists() and target.stat().st_mtime >= path.stat().st_mtime:
+                    continue
+                target.write_bytes(compress())
+                written += 1
+    return written
+
+
+if __name__ == '__main__':
+    import sys
+
+    dist = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).resolve().parent / 'ui' / 'dist'
+    count = precompress(dist)
+    note = "" if BROTLI_AVAILABLE else " (gzip only; pip install brotli for .br)"
+    print(f"✅ Wrote {count} compressed file(s) in {dist}{note}")
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """analytics_db on an empty, fully migrated SQLite file"""
+    import analytics_db
+
+    monkeypatch.setattr(analytics_db, "DB_PATH", tmp_path / "analytics.sqlite")
+    analytics_db.run_heavy_migrations()
+    return analytics_db
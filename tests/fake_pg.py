@@ -0,0 +1,103 @@
+"""
+SQLite standing in for Postgres, for exercising cloud_db without a server.
+FakeConnection speaks just enough of psycopg: %s placeholders,
+information_schema.columns, TRUNCATE, setval, pg_notify and COPY in text format.
+"""
+import json
+import re
+import sqlite3
+
+import analytics_db
+
+COPY_RE = re.compile(r"COPY (\w+) \((.*)\) (TO STDOUT|FROM STDIN)")
+ESCAPES = {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+UNESCAPES = {v: k for k, v in ESCAPES.items()}
+
+
+def encode_row(row):
+    fields = ["\\N" if v is None else re.sub(r"[\\\t\n\r]", lambda m: ESCAPES[m.group()], str(v)) for v in row]
+    return ("\t".join(fields) + "\n").encode()
+
+
+def decode_line(line):
+    return [None if f == "\\N" else re.sub(r"\\[\\tnr]", lambda m: UNESCAPES[m.group()], f)
+            for f in line.split("\t")]
+
+
+class FakeCopy:
+    def __init__(self, conn, sql):
+        table, columns, direction = COPY_RE.match(sql).groups()
+        self.conn, self.table, self.columns = conn, table, columns
+        self.out = direction == "TO STDOUT"
+        self.buffer = bytearray()
+
+    def __enter__(self):
+        return self
+
+    def __iter__(self):
+        rows = self.conn.execute(f"SELECT {self.columns} FROM {self.table}").fetchall()
+        for start in range(0, len(rows), 50):
+            yield b"".join(encode_row(row.values()) for row in rows[start:start + 50])
+
+    def write(self, block):
+        self.buffer += block
+
+    def __exit__(self, *exc):
+        if not self.out and not exc[0]:
+            rows = [decode_line(line) for line in self.buffer.decode().split("\n") if line]
+            marks = ", ".join("?" for _ in self.columns.split(","))
+            self.conn.executemany(f"INSERT INTO {self.table} ({self.columns}) VALUES ({marks})", rows)
+
+
+class FakeCursor:
+    def __init__(self, conn, notifies):
+        self.conn = conn
+        self.cur = conn.cursor()
+        self.notifies = notifies
+
+    def execute(self, sql, params=()):
+        if sql.startswith("SET TRANSACTION") or "setval(" in sql:
+            return
+        if "pg_notify(" in sql:
+            self.notifies.append(json.loads(params[1]))
+            return
+        if "information_schema.columns" in sql:
+            self.cur.execute(f"SELECT name AS column_name FROM pragma_table_info('{params[0]}') ORDER BY cid")
+            return
+        if sql.startswith("TRUNCATE"):
+            for table in sql[len("TRUNCATE"):].replace("CASCADE", "").split(","):
+                self.cur.execute(f"DELETE FROM {table.strip()}")
+            return
+        self.cur.execute(sql.replace("%s", "?").replace("%%", "%"), params)
+
+    def executemany(self, sql, rows):
+        self.cur.executemany(sql.replace("%s", "?"), rows)
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+    def fetchone(self):
+        return self.cur.fetchone()
+
+    def copy(self, sql):
+        return FakeCopy(self.conn, sql)
+
+
+class FakeConnection:
+    def __init__(self, path, notifies=None):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = analytics_db._dict_factory
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.notifies = [] if notifies is None else notifies
+
+    def cursor(self):
+        return FakeCursor(self.db, self.notifies)
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
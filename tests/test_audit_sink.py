@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+import audit_sink
+import cloud_db
+from audit_sink import AuditSink
+
+
+class FakeWriter:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.calls = 0
+        self.fail_times = fail_times
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.calls <= self.fail_times:
+            raise ConnectionError("database went away")
+        self.batches.append([entry["n"] for entry in batch])
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(audit_sink.time, "sleep", lambda seconds: None)
+
+
+def test_batches_are_cut_at_batch_size():
+    writer = FakeWriter()
+    writer.release.clear()
+    sink = AuditSink(writer, batch_size=5, flush_ms=200)
+    sink.submit({"n": 0})
+    assert writer.started.wait(2)  # a one-entry batch (the flush window passed) is being written
+    for n in range(1, 13):
+        sink.submit({"n": n})
+    writer.release.set()
+    assert sink.flush(timeout=2)
+    assert [len(batch) for batch in writer.batches[1:]] == [5, 5, 2]
+    assert [n for batch in writer.batches for n in batch] == list(range(13))
+    assert sink.metrics()["written"] == 13
+
+
+def test_batch_is_written_after_the_flush_window_without_filling_up():
+    writer = FakeWriter()
+    sink = AuditSink(writer, batch_size=100, flush_ms=50)
+    sink.submit({"n": 1})
+    started = time.monotonic()
+    assert sink.flush(timeout=2)
+    assert time.monotonic() - started < 1
+    sink.submit({"n": 2})
+    assert sink.flush(timeout=2)
+    assert writer.batches == [[1], [2]]
+    assert sink.metrics()["batches"] == 2
+
+
+def test_full_queue_blocks_then_drops():
+    writer = FakeWriter()
+    writer.release.clear()
+    sink = AuditSink(writer, queue_size=2, batch_size=1, flush_ms=0)
+    sink.submit({"n": 0})
+    assert writer.started.wait(2)  # the writer holds entry 0; the queue is empty again
+    assert sink.submit({"n": 1}) and sink.submit({"n": 2})
+    assert sink.submit({"n": 3}) is False
+    metrics = sink.metrics()
+    assert (metrics["blocked"], metrics["dropped"], metrics["depth"]) == (1, 1, 2)
+    writer.release.set()
+    assert sink.flush(timeout=2)
+    assert [n for batch in writer.batches for n in batch] == [0, 1, 2]
+
+
+def test_write_errors_are_retried_then_dropped():
+    flaky = FakeWriter(fail_times=1)
+    sink = AuditSink(flaky, batch_size=10, flush_ms=10)
+    sink.submit({"n": 1})
+    assert sink.flush(timeout=2)
+    assert flaky.batches == [[1]] and sink.metrics()["write_errors"] == 0
+
+    down = FakeWriter(fail_times=audit_sink.WRITE_RETRIES)
+    sink = AuditSink(down, batch_size=10, flush_ms=10)
+    sink.submit({"n": 1})
+    sink.submit({"n": 2})
+    assert sink.flush(timeout=2)
+    metrics = sink.metrics()
+    assert down.calls == audit_sink.WRITE_RETRIES and down.batches == []
+    assert (metrics["write_errors"], metrics["dropped"], metrics["written"]) == (1, 2, 0)
+
+
+def test_flush_times_out_while_a_write_is_stuck():
+    writer = FakeWriter()
+    writer.release.clear()
+    sink = AuditSink(writer, batch_size=1, flush_ms=0)
+    sink.submit({"n": 1})
+    assert sink.flush(timeout=0.1) is False
+    writer.release.set()
+    assert sink.flush(timeout=2) is True
+
+
+def test_log_audit_queues_naive_utc_timestamps(monkeypatch):
+    entries = []
+    monkeypatch.setattr(cloud_db, "get_sink", lambda writer: type("Sink", (), {"submit": staticmethod(entries.append)}))
+    cloud_db.log_audit("coach", "update", "clip", "c1", {"notes": "x"})
+    assert entries[0]["timestamp"].tzinfo is None
+    assert entries[0]["changes"] == '{"notes": "x"}'
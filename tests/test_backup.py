@@ -0,0 +1,68 @@
+import os
+import sqlite3
+
+import pytest
+
+import backup_database
+
+
+@pytest.fixture
+def backups(tmp_path, monkeypatch):
+    db_path = tmp_path / "analytics.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE clips (id TEXT PRIMARY KEY, notes TEXT)")
+    conn.commit()
+    conn.close()
+    root = tmp_path / "backups"
+    root.mkdir()
+    monkeypatch.setattr(backup_database, "DB_PATH", db_path)
+    monkeypatch.setattr(backup_database, "BACKUP_DIR", root)
+    monkeypatch.setattr(backup_database, "OBJECTS_DIR", root / "objects")
+    monkeypatch.setattr(backup_database, "INDEX_PATH", root / "index.json")
+    return db_path
+
+
+def write_clip(db_path, clip_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO clips VALUES (?, 'x')", (clip_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_backups_in_the_same_second_get_distinct_names(backups):
+    names = [backup_database.backup_database("bench")["name"] for _ in range(3)]
+    assert len(set(names)) == 3
+
+
+def test_sha_prefix_must_pick_one_snapshot(backups, monkeypatch):
+    first = backup_database.backup_database()
+    write_clip(backups, "a")
+    second = backup_database.backup_database()
+    again = backup_database.backup_database()
+    assert first["sha256"] != second["sha256"] == again["sha256"]
+
+    # Same content twice is still one snapshot, so its prefix is unambiguous
+    assert backup_database._find_backup(second["sha256"][:8])[1] == second["sha256"]
+    assert backup_database.verify_backup(first["sha256"][:8])
+
+    # Force two different snapshots to share a prefix
+    entries = backup_database.load_index()
+    entries[0]["sha256"] = "abc123" + entries[0]["sha256"][6:]
+    entries[1]["sha256"] = "abc456" + entries[1]["sha256"][6:]
+    backup_database._save_index(entries)
+    with pytest.raises(ValueError, match="2 different snapshots"):
+        backup_database._find_backup("abc")
+    assert not backup_database.verify_backup("abc")
+    assert not backup_database.restore_backup("abc")
+    assert backup_database._find_backup(entries[0]["name"])[1].startswith("abc123")
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+def test_verify_does_not_leak_file_descriptors(backups):
+    entry = backup_database.backup_database()
+    assert backup_database.verify_backup(entry["name"])
+    before = len(os.listdir("/proc/self/fd"))
+    for _ in range(20):
+        assert backup_database.verify_backup(entry["name"])
+    assert len(os.listdir("/proc/self/fd")) <= before
+    assert not list(backup_database.BACKUP_DIR.glob("*.sqlite"))
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+import requests
+
+from bridge_client import FAILURE_THRESHOLD, BridgeClient, CircuitOpenError
+
+
+class FakeResponse:
+    def __init__(self, body, status=200):
+        self.body = body
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.HTTPError(f"{self.status} Server Error")
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def request(self, method, url, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, requests.ConnectionError):
+            raise outcome
+        if isinstance(outcome, FakeResponse):
+            return outcome
+        return FakeResponse(outcome)
+
+
+def test_invalid_json_does_not_trip_the_breaker():
+    bad_json = requests.JSONDecodeError("Expecting value", "<html>", 0)
+    client = BridgeClient('workbook', 'http://bridge', timeout=1,
+                          session=FakeSession(*[bad_json] * (FAILURE_THRESHOLD + 1), {'ok': True}))
+    for _ in range(FAILURE_THRESHOLD + 1):
+        with pytest.raises(RuntimeError, match="invalid JSON"):
+            client.request('GET', '/status')
+    assert client.breaker.state == 'closed'
+    assert client.request('GET', '/status') == {'ok': True}
+    assert client.status()['errors'] == FAILURE_THRESHOLD + 1
+
+
+def test_connection_errors_open_the_breaker():
+    down = requests.ConnectionError("refused")
+    client = BridgeClient('controller', 'http://bridge', timeout=1, session=FakeSession(*[down] * FAILURE_THRESHOLD))
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(RuntimeError):
+            client.request('GET', '/status')
+    assert client.breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        client.request('GET', '/status')
+
+
+def test_http_error_on_half_open_trial_closes_the_breaker():
+    down = requests.ConnectionError("refused")
+    client = BridgeClient('controller', 'http://bridge', timeout=1,
+                          session=FakeSession(*[down] * FAILURE_THRESHOLD, FakeResponse(None, status=404), {'ok': True}))
+    client.breaker.reset_timeout = 0.01
+    for _ in range(FAILURE_THRESHOLD):
+        with pytest.raises(RuntimeError):
+            client.request('GET', '/status')
+    time.sleep(0.02)
+    assert client.breaker.state == 'half-open'
+
+    with pytest.raises(RuntimeError, match="404"):
+        client.request('GET', '/missing')
+    # The bridge answered, so the next call goes straight through
+    client.breaker.reset_timeout = 60
+    assert client.breaker.state == 'closed'
+    assert client.request('GET', '/status') == {'ok': True}
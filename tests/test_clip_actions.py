@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import clip_actions
+import cloud_db
+from benchmarks.synthetic import make_clips
+from fake_pg import FakeConnection
+
+ACTIONS = [
+    {"phase": "Early", "type": "DHO", "coverage": "Switch", "outcome": "Stop"},
+    {"phase": "Half court", "type": "PNR", "coverage": "Drop", "help": "Low man"},
+]
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def adapter(request, db, monkeypatch):
+    """The local adapter, or cloud_db writing through SQLite standing in for Postgres"""
+    if request.param == "sqlite":
+        return db
+    monkeypatch.setattr(cloud_db, "get_connection", lambda: FakeConnection(db.DB_PATH))
+    return cloud_db
+
+
+def stored_actions(db, clip_id):
+    with db.db_cursor() as cur:
+        cur.execute("SELECT position, type, coverage, help FROM clip_actions WHERE clip_id = ? ORDER BY position",
+                    (clip_id,))
+        return [tuple(row.values()) for row in cur.fetchall()]
+
+
+def test_upsert_clip_keeps_clip_actions_in_sync(adapter, db):
+    clip = {**make_clips(1)[0], "actions_json": json.dumps(ACTIONS)}
+    adapter.upsert_clip(clip)
+    assert stored_actions(db, clip["id"]) == [(0, "DHO", "Switch", None), (1, "PNR", "Drop", "Low man")]
+
+    adapter.upsert_clip({**clip, "actions_json": json.dumps(ACTIONS[1:])})
+    assert stored_actions(db, clip["id"]) == [(0, "PNR", "Drop", "Low man")]
+
+    adapter.upsert_clip({**clip, "actions_json": None})
+    assert stored_actions(db, clip["id"]) == []
+
+    adapter.upsert_clip(clip)
+    adapter.remove_clip(clip["id"])
+    assert stored_actions(db, clip["id"]) == []
+
+
+def test_backfill_rebuilds_rows_from_actions_json(db):
+    good, broken, untagged = make_clips(3)
+    for clip, raw in ((good, json.dumps(ACTIONS)), (broken, "{not json"), (untagged, None)):
+        db.upsert_clip({**clip, "actions_json": raw})
+    with db.db_cursor() as cur:
+        cur.execute("DELETE FROM clip_actions")
+        clip_actions.backfill(cur, clip_actions.SQLITE)
+    assert [row[1] for row in stored_actions(db, good["id"])] == ["DHO", "PNR"]
+    assert stored_actions(db, broken["id"]) == stored_actions(db, untagged["id"]) == []
+
+
+def test_action_queries_filter_on_action_and_clip_fields(adapter, db):
+    first, second = make_clips(2)
+    adapter.upsert_clip({**first, "game_id": 1, "actions_json": json.dumps(ACTIONS)})
+    adapter.upsert_clip({**second, "game_id": 2, "actions_json": json.dumps(ACTIONS[:1])})
+
+    dhos = adapter.fetch_actions({"type": "DHO"})
+    assert sorted(row["clip_id"] for row in dhos) == sorted([first["id"], second["id"]])
+    assert [row["clip_id"] for row in adapter.fetch_actions({"type": "DHO", "game_id": "2"})] == [second["id"]]
+    assert adapter.fetch_actions({"coverage": "Drop", "help": "Low man"})[0]["position"] == 1
+    assert len(adapter.fetch_actions({}, limit=1)) == 1
+
+    summary = {(row["type"], row["coverage"]): (row["actions"], row["possessions"])
+               for row in adapter.summarize_actions(("type", "coverage"))}
+    assert summary == {("DHO", "Switch"): (2, 2), ("PNR", "Drop"): (1, 1)}
+    with pytest.raises(ValueError):
+        adapter.summarize_actions(("shooter",))
@@ -0,0 +1,43 @@
+from benchmarks.synthetic import make_clips
+
+
+def test_changes_after_cursor_include_writes_and_deletes(db):
+    first, second, third = make_clips(3)
+    db.upsert_clip(first)
+    db.upsert_clip(second)
+    snapshot = db.fetch_changes()
+    assert snapshot["full"] and {row["id"] for row in snapshot["upserts"]} == {first["id"], second["id"]}
+
+    db.upsert_clip(third)
+    db.update_shot(first["id"], {"has_shot": "No", "shot_x": None, "shot_y": None, "shot_result": None})
+    db.remove_clip(second["id"])
+    changes = db.fetch_changes(snapshot["cursor"])
+    assert not changes["full"]
+    assert [row["id"] for row in changes["upserts"]] == [third["id"], first["id"]]
+    assert changes["deleted"] == [second["id"]]
+
+    assert db.fetch_changes(changes["cursor"]) == {"cursor": changes["cursor"], "full": False,
+                                                   "upserts": [], "deleted": []}
+
+
+def test_deletes_and_writes_share_one_sequence(db):
+    first, second = make_clips(2)
+    db.upsert_clip(first)
+    db.upsert_clip(second)
+    cursor = db.fetch_changes()["cursor"]
+    # A delete and a write in the same millisecond used to compare as text timestamps
+    db.remove_clip(first["id"])
+    db.upsert_clip({**second, "notes": "edited"})
+    with db.db_cursor() as cur:
+        cur.execute("SELECT change_seq FROM clip_tombstones WHERE clip_id = ?", (first["id"],))
+        deleted_seq = cur.fetchone()["change_seq"]
+    assert int(cursor) < deleted_seq < int(db.fetch_clip(second["id"])["change_seq"])
+    changes = db.fetch_changes(cursor)
+    assert (changes["deleted"], [row["id"] for row in changes["upserts"]]) == ([first["id"]], [second["id"]])
+
+
+def test_unusable_cursor_returns_full_snapshot(db):
+    db.upsert_clip(make_clips(1)[0])
+    for cursor in ("2025-11-01T00:00:00.000000", "999999"):
+        changes = db.fetch_changes(cursor)
+        assert changes["full"] and len(changes["upserts"]) == 1
@@ -0,0 +1,23 @@
+import queue
+import time
+
+from clip_events import notifier, sse_stream
+
+
+def test_stream_ends_after_max_seconds_and_unsubscribes():
+    q = notifier.subscribe()
+    started = time.monotonic()
+    chunks = list(sse_stream(q, keepalive=0.05, max_seconds=0.2))
+    assert time.monotonic() - started < 1
+    assert chunks[0].startswith('retry:')
+    assert ': keepalive\n\n' in chunks
+    assert q not in notifier._subscribers
+
+
+def test_stream_delivers_events():
+    q = queue.Queue()
+    q.put({'type': 'upsert', 'ids': ['a']})
+    stream = sse_stream(q, keepalive=0.05, max_seconds=1)
+    next(stream)
+    assert next(stream).startswith('event: upsert\n')
+    stream.close()
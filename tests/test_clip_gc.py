@@ -0,0 +1,69 @@
+import json
+import os
+import time
+
+import clip_gc
+
+OLD = time.time() - 2 * 86400
+
+
+def touch(path, mtime=OLD, data=b"clip"):
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_metadata_refs_and_recent_files_are_not_orphans(tmp_path):
+    clips = tmp_path / "Clips"
+    clips.mkdir()
+    touch(clips / "G1_Q1_P1_belmont_20251101_000000.mp4")  # in the DB
+    touch(clips / "G1_Q1_P2_belmont_20251101_000100.mp4")  # only in clips_metadata.json
+    touch(clips / "G1_Q1_P3_belmont_20251101_000200.mp4")  # orphan
+    touch(clips / "G1_Q1_P3_belmont_20251101_000200.thumb.jpg")
+    touch(clips / "G1_Q1_P3_belmont_20251101_000200.sprite.jpg.k2v9_x1q.part.jpg")  # interrupted write
+    touch(clips / "G1_Q1_P4_belmont_20251101_000300.mp4", mtime=time.time())  # still being written
+    touch(clips / "G1_Q1_P9_belmont_20251101_000900.thumb.jpg.part.jpg", mtime=time.time())
+    (clips / clip_gc.METADATA_NAME).write_text(json.dumps({"clips": [
+        {"id": "b", "filename": "G1_Q1_P2_belmont_20251101_000100.mp4",
+         "path": str(clips / "G1_Q1_P2_belmont_20251101_000100.mp4")},
+    ]}))
+    rows = [{"id": "a", "filename": "G1_Q1_P1_belmont_20251101_000000.mp4", "path": None, "source_video": None}]
+
+    report = clip_gc.scan(clips, rows, {}, extra_refs=clip_gc.metadata_refs(clips), min_age=3600)
+
+    assert [o["file"] for o in report["orphans"]] == ["G1_Q1_P3_belmont_20251101_000200.mp4"]
+    assert sorted(report["orphans"][0]["owned"]) == ["G1_Q1_P3_belmont_20251101_000200.sprite.jpg.k2v9_x1q.part.jpg",
+                                                     "G1_Q1_P3_belmont_20251101_000200.thumb.jpg"]
+    assert sorted(report["recent"]) == ["G1_Q1_P4_belmont_20251101_000300.mp4",
+                                        "G1_Q1_P9_belmont_20251101_000900.thumb.jpg.part.jpg"]
+    assert report["derived_orphans"] == []
+    assert report["referenced_files"] == 2
+
+    clip_gc.delete_orphans(clips, report)
+    assert sorted(p.name for p in clips.iterdir()) == [
+        "G1_Q1_P1_belmont_20251101_000000.mp4",
+        "G1_Q1_P2_belmont_20251101_000100.mp4",
+        "G1_Q1_P4_belmont_20251101_000300.mp4",
+        "G1_Q1_P9_belmont_20251101_000900.thumb.jpg.part.jpg",
+        clip_gc.METADATA_NAME,
+    ]
+
+
+def test_unreadable_metadata_means_no_extra_refs(tmp_path):
+    assert clip_gc.metadata_refs(tmp_path) == []
+    (tmp_path / clip_gc.METADATA_NAME).write_text("{not json")
+    assert clip_gc.metadata_refs(tmp_path) == []
+
+
+def test_hls_upload_is_tracked_separately_from_the_mp4(tmp_path):
+    clip = touch(tmp_path / "G1_Q1_P1_belmont_20251101_000000.mp4")
+    manifest = {}
+    clip_gc.mark_uploaded(manifest, clip)  # MP4 already in R2 from an earlier deploy
+    assert not clip_gc.needs_upload(manifest, clip)
+    assert clip_gc.needs_hls_upload(manifest, clip)
+
+    clip_gc.mark_hls_uploaded(manifest, clip)
+    assert not clip_gc.needs_hls_upload(manifest, clip)
+
+    touch(clip, mtime=OLD + 60, data=b"re-extracted clip")
+    assert clip_gc.needs_upload(manifest, clip) and clip_gc.needs_hls_upload(manifest, clip)
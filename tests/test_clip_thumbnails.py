@@ -0,0 +1,43 @@
+import threading
+
+import clip_thumbnails
+
+
+def test_concurrent_writers_never_publish_a_partial_file(tmp_path):
+    target = tmp_path / "G1_Q1_P1_belmont_20251101_000000.thumb.jpg"
+    barrier = threading.Barrier(2)
+    temp_paths = []
+
+    def build(payload):
+        def write(out):
+            temp_paths.append(out)
+            out.write_bytes(payload[:10])
+            barrier.wait()  # both writers are now half way through
+            out.write_bytes(payload)
+        return write
+
+    payloads = [b"A" * 4096, b"B" * 4096]
+    threads = [threading.Thread(target=clip_thumbnails._write_atomic, args=(target, build(p))) for p in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(temp_paths)) == 2
+    assert all(p.parent == tmp_path and p.name.endswith(".part.jpg") for p in temp_paths)
+    assert target.read_bytes() in payloads
+    assert sorted(p.name for p in tmp_path.iterdir()) == [target.name]
+
+
+def test_failed_build_leaves_no_temp_file(tmp_path):
+    target = tmp_path / "clip.sprite.jpg"
+
+    def fail(out):
+        out.write_bytes(b"partial")
+        raise RuntimeError("FFmpeg error")
+
+    try:
+        clip_thumbnails._write_atomic(target, fail)
+    except RuntimeError:
+        pass
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,25 @@
+from urllib.parse import parse_qs, urlsplit
+
+import clip_transform
+from benchmarks.synthetic import make_clips
+from media_urls import verify_signature
+
+
+def test_thumbnail_url_is_signed_and_set_when_the_poster_can_be_served(tmp_path, monkeypatch):
+    monkeypatch.setattr(clip_transform, "clip_files", clip_transform.ClipFiles(tmp_path))
+    with_thumb, without_thumb, no_file, missing = make_clips(4)
+    for row in (with_thumb, without_thumb):
+        (tmp_path / row["filename"]).touch()
+    (tmp_path / with_thumb["filename"].replace(".mp4", ".thumb.jpg")).touch()
+
+    out = clip_transform.transform_db_clips([with_thumb, without_thumb, {**no_file, "filename": None}, missing])
+
+    url = urlsplit(out[0]["thumbnail_url"])
+    query = parse_qs(url.query)
+    assert url.path == f"/api/clip/{with_thumb['id']}/thumb"
+    assert verify_signature(url.path, query["exp"][0], query["sig"][0])
+    # Clip extracted before posters existed: the thumb route generates it on request
+    assert urlsplit(out[1]["thumbnail_url"]).path == f"/api/clip/{without_thumb['id']}/thumb"
+    assert out[2]["thumbnail_url"] is None
+    assert out[3]["thumbnail_url"] is None
+    assert clip_transform.transform_db_clip(with_thumb)["thumbnail_url"] == out[0]["thumbnail_url"]
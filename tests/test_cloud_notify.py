@@ -0,0 +1,32 @@
+import json
+
+import cloud_db
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.payloads = []
+
+    def execute(self, sql, params=()):
+        assert "pg_notify" in sql
+        self.payloads.append(params[1])
+
+
+def test_large_id_lists_are_split_under_the_notify_limit():
+    ids = [f"G12_oklahoma-state_Q{i % 4 + 1}P{i}_{i:06d}" for i in range(1000)]
+    cur = RecordingCursor()
+    cloud_db.notify_clip_change(cur, "delete", ids)
+
+    assert len(cur.payloads) > 1
+    assert all(len(p.encode()) < 8000 for p in cur.payloads)
+    events = [json.loads(p) for p in cur.payloads]
+    assert {e["type"] for e in events} == {"delete"}
+    assert [i for e in events for i in e["ids"]] == ids
+
+
+def test_small_changes_send_one_notify():
+    cur = RecordingCursor()
+    cloud_db.notify_clip_change(cur, "upsert", ["a", "b"])
+    assert [json.loads(p)["ids"] for p in cur.payloads] == [["a", "b"]]
+    cloud_db.notify_clip_change(cur, "upsert", [])
+    assert len(cur.payloads) == 1
@@ -0,0 +1,85 @@
+"""
+export_snapshot / import_snapshot round trip against SQLite standing in for Postgres
+"""
+import sqlite3
+
+import pytest
+
+import analytics_db
+import cloud_db
+from benchmarks.synthetic import make_clips
+from fake_pg import FakeConnection
+
+
+def table_rows(path, table, skip=("change_seq", "id")):
+    conn = sqlite3.connect(path)
+    conn.row_factory = analytics_db._dict_factory
+    try:
+        rows = conn.execute(f"SELECT * FROM {table}").fetchall()
+    finally:
+        conn.close()
+    return sorted(tuple((k, str(v)) for k, v in row.items() if k not in skip) for row in rows)
+
+
+@pytest.fixture
+def source(db):
+    clips = make_clips(120)
+    for clip in clips:
+        db.upsert_clip({**clip, "notes": "tab\there\nand a \\ backslash" if clip is clips[0] else clip["notes"]})
+    db.upsert_comm_segments(clips[0]["id"], [{"start": 1.0, "end": 2.5, "peak_dbfs": -3.0}])
+    db.remove_clip(clips[-1]["id"])
+    return db.DB_PATH
+
+
+@pytest.fixture
+def empty_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(analytics_db, "DB_PATH", tmp_path / "target.sqlite")
+    analytics_db.run_heavy_migrations()
+    return analytics_db.DB_PATH
+
+
+def test_snapshot_round_trip_restores_every_table(source, empty_target, tmp_path, monkeypatch):
+    snapshot_dir = tmp_path / "snapshot"
+    monkeypatch.setattr(cloud_db, "get_connection", lambda: FakeConnection(source))
+    manifest = cloud_db.export_snapshot(snapshot_dir, chunk_bytes=16 * 1024)
+
+    tables = {info["table"]: info for info in manifest["tables"]}
+    assert set(tables) == {"clips", "comm_segments", "clip_tombstones"}
+    assert tables["clips"]["rows"] == 119 and len(tables["clips"]["chunks"]) > 1
+
+    monkeypatch.setattr(cloud_db, "get_connection", lambda: FakeConnection(empty_target))
+    monkeypatch.setattr(cloud_db, "init_db", lambda: None)
+    counts = cloud_db.import_snapshot(snapshot_dir)
+
+    assert counts == {"clips": 119, "comm_segments": 1, "clip_tombstones": 1}
+    for table in ("clips", "comm_segments", "clip_tombstones", "clip_actions", "clip_rollups"):
+        assert table_rows(empty_target, table) == table_rows(source, table), table
+    assert table_rows(empty_target, "clip_actions")
+
+
+def test_restore_over_newer_db_reaches_delta_sync_clients(source, tmp_path, monkeypatch):
+    snapshot_dir = tmp_path / "snapshot"
+    notifies = []
+    monkeypatch.setattr(cloud_db, "get_connection", lambda: FakeConnection(source, notifies))
+    monkeypatch.setattr(cloud_db, "init_db", lambda: None)
+    cloud_db.export_snapshot(snapshot_dir)
+    restored = table_rows(source, "clips")
+
+    # The live DB moves on: a new clip, an edit and a delete after the snapshot
+    added = {**make_clips(1)[0], "id": "added-after-snapshot"}
+    first, second = [clip["id"] for clip in analytics_db.fetch_clips()[:2]]
+    analytics_db.upsert_clip(added)
+    analytics_db.update_shot(first, {"has_shot": "No"})
+    analytics_db.remove_clip(second)
+    cursor = analytics_db.fetch_changes()["cursor"]
+
+    cloud_db.import_snapshot(snapshot_dir)
+
+    changes = analytics_db.fetch_changes(cursor)
+    assert not changes["full"]
+    assert changes["deleted"] == ["added-after-snapshot"]
+    assert {row["id"] for row in changes["upserts"]} == {row["id"] for row in analytics_db.fetch_clips()}
+    assert {first, second} <= {row["id"] for row in changes["upserts"]}
+    assert table_rows(source, "clips") == restored
+    assert {e["type"] for e in notifies} == {"delete", "resync"}
+    assert [e["ids"] for e in notifies if e["type"] == "delete"] == [["added-after-snapshot"]]
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+import clip_export
+from benchmarks.synthetic import make_clips
+
+
+@pytest.fixture
+def client(db):
+    import media_server
+
+    for clip in make_clips(30):
+        db.upsert_clip(clip)
+    return media_server.app.test_client()
+
+
+def test_xlsx_export_is_a_readable_workbook(client):
+    from openpyxl import load_workbook
+
+    response = client.get('/api/export?format=xlsx&game_id=1')
+    assert response.status_code == 200
+    ws = load_workbook(io.BytesIO(response.get_data())).active
+    assert [c.value for c in ws[1]] == [header for _, header in clip_export.EXPORT_COLUMNS]
+    assert ws.max_row == 31
+
+
+def test_xlsx_export_without_openpyxl_fails_before_streaming(client, monkeypatch):
+    monkeypatch.setattr(clip_export, "XLSX_AVAILABLE", False)
+    response = client.get('/api/export?format=xlsx')
+    assert response.status_code == 501
+    assert "openpyxl" in response.get_json()["error"]
+    assert client.get('/api/export?format=csv').status_code == 200
+
+
+def test_cloud_filters_bind_typed_values_without_casting_columns():
+    import cloud_db
+
+    where, params = cloud_db._filter_clause({"game_id": "2", "quarter": 3, "opponent": "Belmont"})
+    assert "::" not in where
+    assert where == "WHERE game_id = %s AND opponent = %s AND quarter = %s"
+    assert params == [2, "Belmont", 3]
+    assert cloud_db._filter_clause({"game_id": "two"}) == ("WHERE FALSE", [])
@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from benchmarks import bench_import
+
+
+def test_media_server_import_loads_no_lazy_modules():
+    result = bench_import.run(repeat=1, top=10)
+    assert result['lazy_modules_loaded'] == [], result['slowest_cumulative_ms']
+
+
+# Wall-clock budgets depend on the machine; opt in where timings are stable
+@pytest.mark.skipif(not os.getenv('CHECK_IMPORT_BUDGET'), reason='set CHECK_IMPORT_BUDGET=1 to enforce the import budget')
+def test_media_server_imports_within_budget():
+    result = bench_import.run(repeat=3, top=10)
+    assert result['total_ms'] <= bench_import.DEFAULT_BUDGET_MS, result['slowest_cumulative_ms']
@@ -0,0 +1,65 @@
+import pytest
+from flask import Flask
+
+from media_files import IMMUTABLE_MAX_AGE, send_media
+
+BODY = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    clip = tmp_path / "G1_Q1_P1_belmont_20251101_000000.mp4"
+    clip.write_bytes(BODY)
+
+    @app.route("/clip")
+    def clip_route():
+        return send_media(clip, immutable=True)
+
+    @app.route("/live")
+    def live_route():
+        return send_media(clip, public=True)
+
+    return app.test_client()
+
+
+def test_single_range_is_partial_content(client):
+    response = client.get("/clip", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"] == f"bytes 100-199/{len(BODY)}"
+    assert response.headers["Content-Length"] == "100"
+    assert response.get_data() == BODY[100:200]
+
+
+def test_matching_etag_is_not_modified(client):
+    etag = client.get("/clip").headers["ETag"]
+    response = client.get("/clip", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def test_stale_if_range_sends_the_whole_file(client):
+    response = client.get("/clip", headers={"Range": "bytes=0-9", "If-Range": '"stale-etag"'})
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+    etag = response.headers["ETag"]
+    assert client.get("/clip", headers={"Range": "bytes=0-9", "If-Range": etag}).status_code == 206
+
+
+def test_unsatisfiable_range_is_416(client):
+    response = client.get("/clip", headers={"Range": f"bytes={len(BODY) + 10}-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(BODY)}"
+
+
+def test_multi_range_is_ignored(client):
+    response = client.get("/clip", headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert "Content-Range" not in response.headers
+    assert response.get_data() == BODY
+
+
+def test_cache_headers(client):
+    immutable = client.get("/clip").headers["Cache-Control"]
+    assert immutable == f"private, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    assert client.get("/live").headers["Cache-Control"] == "public, no-cache"
@@ -0,0 +1,72 @@
+import clip_rollups
+from benchmarks.synthetic import make_clips
+from clip_events import notifier
+
+
+def fg_totals(db, game_id):
+    rows = db.fetch_rollups(("game_id",), {"game_id": game_id})
+    return rows[0]["fg_attempts"], rows[0]["fg_makes"]
+
+
+def test_shot_edit_refreshes_rollups(db):
+    clip = {**make_clips(1)[0], "shot_result": "", "result": "Turnover"}
+    db.upsert_clip(clip)
+    assert fg_totals(db, clip["game_id"]) == (0, 0)
+
+    db.update_shot(clip["id"], {"has_shot": "Yes", "shot_x": "40.5", "shot_y": "12", "shot_result": "Made FG",
+                                "shooter": "Blue (Perimeter)"})
+    assert fg_totals(db, clip["game_id"]) == (1, 1)
+    row = db.fetch_clip(clip["id"])
+    assert (row["shot_x_num"], row["shooter"]) == (40.5, "Blue (Perimeter)")
+
+    db.update_shot(clip["id"], {"has_shot": "No", "shot_x": None, "shot_y": None, "shot_result": None})
+    assert fg_totals(db, clip["game_id"]) == (0, 0)
+    row = db.fetch_clip(clip["id"])
+    assert (row["shot_x_num"], row["shooter"]) == (None, "Blue (Perimeter)")
+
+
+def test_shot_edit_publishes_clip_change(db):
+    clip = make_clips(1)[0]
+    db.upsert_clip(clip)
+    q = notifier.subscribe()
+    try:
+        db.update_shot(clip["id"], {"has_shot": "No", "shot_x": None, "shot_y": None, "shot_result": None})
+        event = q.get(timeout=1)
+        assert (event["type"], event["ids"]) == ("upsert", [clip["id"]])
+        db.update_shot("missing-clip", {"has_shot": "No"})
+        assert q.empty()
+    finally:
+        notifier.unsubscribe(q)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params=()):
+        self.calls.append((" ".join(sql.split()), params))
+
+
+def test_rollup_refresh_matches_games_with_plain_equality():
+    cur = RecordingCursor()
+    clip_rollups.refresh_games(cur, clip_rollups.POSTGRES, [7, None, 7])
+    assert len(cur.calls) == 4
+    assert all("DISTINCT FROM" not in sql for sql, _ in cur.calls)
+    assert all("WHERE game_id = %s" in sql and params == (7,) for sql, params in cur.calls[:2])
+    assert all("game_id IS NULL" in sql and params == () for sql, params in cur.calls[2:])
+
+
+def test_rollup_refresh_uses_game_indexes(db):
+    db.upsert_clip(make_clips(1)[0])
+    with db.db_cursor() as cur:
+        for sql in ("SELECT * FROM clips WHERE game_id = ?", "DELETE FROM clip_rollups WHERE game_id = ?"):
+            cur.execute("EXPLAIN QUERY PLAN " + sql, (1,))
+            assert any("USING INDEX" in row["detail"] for row in cur.fetchall()), sql
+
+
+def test_untagged_game_bucket_is_refreshed(db):
+    clip = {**make_clips(1)[0], "game_id": None, "result": "Turnover"}
+    db.upsert_clip(clip)
+    assert [row["possessions"] for row in db.fetch_rollups(("game_id",)) if row["game_id"] is None] == [1]
+    db.remove_clip(clip["id"])
+    assert not [row for row in db.fetch_rollups(("game_id",)) if row["game_id"] is None]
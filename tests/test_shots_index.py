@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.synthetic import make_clips
+
+FILTER_PATHS = [
+    {},
+    {"game_id": 2},
+    {"quarter": 3},
+    {"game_id": 2, "quarter": 3},
+    {"opponent": "Belmont"},
+    {"coverage": "Switch"},
+    {"player_designation": "primary"},
+]
+
+
+@pytest.fixture
+def shots_db(db):
+    clips = make_clips(240)
+    for clip in clips:
+        db.upsert_clip(clip)
+    with db.db_cursor() as cur:
+        cur.execute("ANALYZE")
+    return db, clips
+
+
+def plan(db, filters):
+    with db.db_cursor() as cur:
+        cur.execute("EXPLAIN QUERY PLAN " + db.shots_query(filters)[0], db.shots_query(filters)[1])
+        return [row["detail"] for row in cur.fetchall()]
+
+
+@pytest.mark.parametrize("filters", FILTER_PATHS, ids=lambda f: "+".join(f) or "unfiltered")
+def test_fetch_shots_never_scans_the_table(shots_db, filters):
+    db, _ = shots_db
+    steps = plan(db, filters)
+    assert "SCAN clips" not in steps, steps
+    assert any("INDEX" in step for step in steps), steps
+
+
+@pytest.mark.parametrize("filters", FILTER_PATHS[:4], ids=lambda f: "+".join(f) or "unfiltered")
+def test_shot_location_filters_are_covered_by_shots_index(shots_db, filters):
+    db, _ = shots_db
+    steps = plan(db, filters)
+    assert any("COVERING INDEX idx_clips_shots" in step for step in steps), steps
+    if "game_id" in filters:
+        assert any(step.startswith("SEARCH") for step in steps), steps
+
+
+def test_fetch_shots_matches_located_shot_clips(shots_db):
+    db, clips = shots_db
+    expected = [c for c in clips if c["has_shot"] == "Yes" and c["shot_x"] and c["shot_y"] and c["game_id"] == 2]
+    assert len(db.fetch_shots({"game_id": 2})) == len(expected) > 0
+
+
+CLIP_FILTER_INDEXES = [
+    ({"opponent": "Belmont"}, "idx_clips_opponent_quarter (opponent=?)"),
+    ({"opponent": "Belmont", "quarter": 3}, "idx_clips_opponent_quarter (opponent=? AND quarter=?)"),
+    ({"coverage": "Switch"}, "idx_clips_coverage_result (coverage=?)"),
+    ({"coverage": "Switch", "result": "Turnover"}, "idx_clips_coverage_result (coverage=? AND result=?)"),
+    ({"result": "Turnover"}, "idx_clips_result (result=?)"),
+    ({"has_shot": "Yes"}, "idx_clips_has_shot (has_shot=?)"),
+    ({"has_shot": "No", "game_id": 2}, "idx_clips_has_shot (has_shot=? AND game_id=?)"),
+]
+
+
+@pytest.mark.parametrize("filters,index", CLIP_FILTER_INDEXES, ids=lambda v: "+".join(v) if isinstance(v, dict) else "")
+def test_clip_list_filters_search_their_index(shots_db, filters, index):
+    db, clips = shots_db
+    with db.db_cursor() as cur:
+        cur.execute("EXPLAIN QUERY PLAN " + db.clips_query(filters)[0], db.clips_query(filters)[1])
+        steps = [row["detail"] for row in cur.fetchall()]
+    assert f"SEARCH clips USING INDEX {index}" in steps, steps
+    expected = [c for c in clips if all(str(c[k]) == str(v) for k, v in filters.items())]
+    assert len(list(db.iter_clips(filters))) == len(expected)
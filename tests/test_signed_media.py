@@ -0,0 +1,60 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import auth
+from media_urls import seconds_left, sign_path
+
+CLIP = "G1_Q1_P1_belmont_20251101_000000.mp4"
+BODY = b"\x00\x00\x00\x18ftypmp42" * 100
+
+
+@pytest.fixture
+def client(db, tmp_path, monkeypatch):
+    import media_server
+
+    clips = tmp_path / "Clips"
+    clips.mkdir()
+    (clips / CLIP).write_bytes(BODY)
+    (clips / "G1_Q1_P2_belmont_20251101_000100.mp4").write_bytes(BODY)
+    monkeypatch.setattr(media_server, "CLIPS_DIR", clips)
+    # Cloud auth rules for the clip routes: no token means 401
+    monkeypatch.setattr(auth, "is_cloud", lambda: True)
+    return media_server.app.test_client()
+
+
+def test_signed_url_is_served_without_a_token(client):
+    url = sign_path(f"/clips/{CLIP}")
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+
+    left = seconds_left(parse_qs(urlsplit(url).query)["exp"][0])
+    scope, max_age, immutable = [part.strip() for part in response.headers["Cache-Control"].split(",")]
+    assert (scope, immutable) == ("public", "immutable")
+    assert left - 2 <= int(max_age.split("=")[1]) <= left
+
+
+def test_legacy_path_has_its_own_signature(client):
+    assert client.get(sign_path(f"/legacy/Clips/{CLIP}")).status_code == 200
+    signed_for_clips = urlsplit(sign_path(f"/clips/{CLIP}")).query
+    assert client.get(f"/legacy/Clips/{CLIP}?{signed_for_clips}").status_code == 401
+
+
+@pytest.mark.parametrize("case", ["unsigned", "expired", "tampered", "other file"])
+def test_bad_signatures_fall_through_to_require_auth(client, case):
+    path = f"/clips/{CLIP}"
+    if case == "unsigned":
+        url = path
+    elif case == "expired":
+        url = sign_path(path, ttl=60, now=time.time() - 7 * 86400)
+    elif case == "tampered":
+        url = sign_path(path)
+        url = url[:-1] + ("A" if url[-1] != "A" else "B")
+    else:
+        query = urlsplit(sign_path("/clips/G1_Q1_P2_belmont_20251101_000100.mp4")).query
+        url = f"{path}?{query}"
+    response = client.get(url)
+    assert response.status_code == 401
+    assert response.get_json() == {"error": "Authentication required"}
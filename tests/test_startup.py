@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+import media_server
+
+
+@pytest.fixture
+def fresh_start(monkeypatch):
+    monkeypatch.setattr(media_server, "_started", threading.Event())
+    monkeypatch.setattr(media_server, "_run_heavy_migrations", lambda: None)
+    monkeypatch.setattr(media_server.ui_assets, "lookup", lambda rel: None)
+    return monkeypatch
+
+
+def test_concurrent_first_requests_wait_for_the_schema(fresh_start):
+    schema_ready = threading.Event()
+    calls = []
+
+    def slow_init_db():
+        calls.append(1)
+        time.sleep(0.2)
+        schema_ready.set()
+
+    fresh_start.setattr(media_server, "init_db", slow_init_db)
+    saw_schema = []
+
+    def first_request():
+        media_server.ensure_started()
+        saw_schema.append(schema_ready.is_set())
+
+    threads = [threading.Thread(target=first_request) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert saw_schema == [True] * 16
+
+
+def test_failed_init_db_is_retried(fresh_start):
+    attempts = []
+
+    def flaky_init_db():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("database is starting up")
+
+    fresh_start.setattr(media_server, "init_db", flaky_init_db)
+    media_server.ensure_started()
+    assert not media_server._started.is_set()
+    media_server.ensure_started()
+    media_server.ensure_started()
+    assert media_server._started.is_set() and len(attempts) == 2
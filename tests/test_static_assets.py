@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+from flask import Flask
+
+from static_assets import StaticIndex, send_asset
+
+app = Flask(__name__)
+
+
+def write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_rebuilt_index_html_is_served_with_new_length_and_etag(tmp_path):
+    write(tmp_path / 'index.html', 'old' * 300, mtime=1_000_000)
+    index = StaticIndex(tmp_path, recheck_seconds=0)
+    old = index.lookup('index.html')
+
+    write(tmp_path / 'index.html', 'new build' * 250)
+    new = index.lookup('index.html')
+    assert new.size == len('new build' * 250)
+    with app.test_request_context('/'):
+        response = send_asset(new)
+        assert response.content_length == new.size
+        assert response.headers['ETag'] != send_asset(old).headers['ETag']
+
+
+def test_asset_edited_in_place_is_reindexed(tmp_path):
+    write(tmp_path / 'index.html', 'x')
+    write(tmp_path / 'robots.txt', 'a', mtime=1_000_000)
+    index = StaticIndex(tmp_path, recheck_seconds=0)
+    assert index.lookup('robots.txt').size == 1
+    write(tmp_path / 'robots.txt', 'abc')
+    assert index.lookup('robots.txt').size == 3
+
+
+def test_deleted_asset_is_dropped(tmp_path):
+    write(tmp_path / 'index.html', 'x')
+    write(tmp_path / 'robots.txt', 'a')
+    write(tmp_path / 'assets' / 'index-Abcdefgh.js', 'js')
+    index = StaticIndex(tmp_path, recheck_seconds=0)
+    asset = index.lookup('assets/index-Abcdefgh.js')
+    (tmp_path / 'robots.txt').unlink()
+    (tmp_path / 'assets' / 'index-Abcdefgh.js').unlink()
+    assert index.lookup('robots.txt') is None
+    # Hashed assets aren't re-stat'ed; the response for the stale entry is a miss
+    with app.test_request_context('/'):
+        assert send_asset(index.lookup('assets/index-Abcdefgh.js')) is None
+        assert send_asset(asset) is None
+
+
+def test_lookups_between_rechecks_do_not_stat(tmp_path, monkeypatch):
+    write(tmp_path / 'index.html', 'x')
+    write(tmp_path / 'assets' / 'index-Abcdefgh.js', 'js')
+    index = StaticIndex(tmp_path, recheck_seconds=60)
+    index.lookup('index.html')
+    stats = []
+    real_stat = Path.stat
+    monkeypatch.setattr(Path, 'stat', lambda self, **kw: stats.append(self) or real_stat(self, **kw))
+
+    for _ in range(5):
+        assert index.lookup('assets/index-Abcdefgh.js') is not None
+        assert index.lookup('no/such/route') is None
+        assert index.lookup('index.html') is not None
+    assert stats == []
+
+    write(tmp_path / 'index.html', 'new build', mtime=2_000_000)
+    assert index.lookup('index.html').size == 1
+    index.reload()
+    assert index.lookup('index.html').size == len('new build')
@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import type { DataMode } from '../lib/data'
-import { createCloudAdapter, createLocalAdapter } from '../lib/data'
+import { createCloudAdapter, createLocalAdapter, watchClipChanges } from '../lib/data'
 import {
   DASHBOARD_STORAGE_KEY,
   loadCachedClips,
@@ -112,6 +112,26 @@ const ReactClipsPanel = ({ dataMode, onOpenClip, refreshKey = 0 }: ReactClipsPan
     }
   }, [adapterFactory, refreshKey])
 
+  // Live updates: apply clip change deltas pushed by the server (not while showing search results)
+  useEffect(() => {
+    if (semanticSearchEnabled) return
+    return watchClipChanges(adapterFactory(), (changes, full) => {
+      const removed = new Set(changes.deleted)
+      const updated = new Map(changes.upserts.map((clip) => [clip.id, toClipSummary(clip)]))
+      setClips((prev) => {
+        if (full) return Array.from(updated.values())
+        const next = prev
+          .filter((clip) => !removed.has(clip.id))
+          .map((clip) => {
+            const summary = updated.get(clip.id)
+            updated.delete(clip.id)
+            return summary ?? clip
+          })
+        return [...next, ...updated.values()]
+      })
+    })
+  }, [adapterFactory, semanticSearchEnabled])
+
   const availableLocations = useMemo(() => {
     const values = new Set<string>()
     clips
@@ -183,8 +183,8 @@ const ReactTaggerNative = () => {
           setVideoSrc(editClip.videoUrl)
 
           // Extract the filename from the video URL for the path
-          // videoUrl is like "/legacy/Clips/G1_Q1_P1_belmont_timestamp.mp4"
-          const filename = editClip.videoUrl.split('/').pop() || editClip.filename || ''
+          // videoUrl is like "/legacy/Clips/G1_Q1_P1_belmont_timestamp.mp4?exp=...&sig=..."
+          const filename = editClip.videoUrl.split('?')[0].split('/').pop() || editClip.filename || ''
           if (filename) {
             // Don't set currentVideoPath to the extracted clip - we need the original game video
             // If we have sourceVideo, use that; otherwise user will need to load the game video manually
@@ -0,0 +1,101 @@
+import type { ClipChanges } from '../types'
+import type { DataProvider } from './index'
+
+export type ClipEventType = 'upsert' | 'delete' | 'resync'
+
+const RETRY_MS = 3000
+
+// EventSource can't send an Authorization header, so the stream is read with fetch.
+// The server closes streams after a few minutes; we reconnect after `retry` ms.
+export const openClipEventStream = (
+  url: string,
+  headers: HeadersInit,
+  onEvent: (type: ClipEventType) => void,
+): (() => void) => {
+  const controller = new AbortController()
+  let retryMs = RETRY_MS
+  let reconnecting = false
+
+  const dispatch = (block: string) => {
+    let type = 'message'
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) type = line.slice(6).trim()
+      else if (line.startsWith('retry:')) retryMs = Number(line.slice(6).trim()) || retryMs
+    }
+    if (type === 'upsert' || type === 'delete' || type === 'resync') onEvent(type)
+  }
+
+  const connect = async () => {
+    while (!controller.signal.aborted) {
+      try {
+        const response = await fetch(url, { headers, signal: controller.signal })
+        if (!response.ok || !response.body) throw new Error(`Clip events failed with status ${response.status}`)
+        // Anything may have changed while we were disconnected
+        if (reconnecting) onEvent('resync')
+        reconnecting = true
+        const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+        let buffer = ''
+        for (;;) {
+          const { value, done } = await reader.read()
+          if (done) break
+          buffer += value.replace(/\r\n/g, '\n')
+          let end = buffer.indexOf('\n\n')
+          while (end >= 0) {
+            dispatch(buffer.slice(0, end))
+            buffer = buffer.slice(end + 2)
+            end = buffer.indexOf('\n\n')
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return
+        console.warn('Clip event stream dropped', err)
+      }
+      await new Promise((resolve) => setTimeout(resolve, retryMs))
+    }
+  }
+
+  connect()
+  return () => controller.abort()
+}
+
+// Follows the event stream and hands each /api/clips/changes delta to `onChanges`.
+// The first call has no cursor, so it returns a full snapshot (`full` is true).
+export const watchClipChanges = (
+  adapter: DataProvider,
+  onChanges: (changes: ClipChanges, full: boolean) => void,
+): (() => void) => {
+  let cursor: string | null = null
+  let running = false
+  let pending = false
+  let stopped = false
+
+  const pull = async () => {
+    if (running) {
+      pending = true
+      return
+    }
+    running = true
+    try {
+      do {
+        pending = false
+        const since = cursor
+        const changes = await adapter.listClipChanges(since)
+        if (stopped) return
+        cursor = changes.cursor ?? since
+        onChanges(changes, changes.full)
+      } while (pending && !stopped)
+    } catch (err) {
+      console.warn('Clip delta sync failed', err)
+    } finally {
+      running = false
+    }
+  }
+
+  const unsubscribe = adapter.subscribeClipEvents(() => {
+    pull()
+  })
+  return () => {
+    stopped = true
+    unsubscribe()
+  }
+}
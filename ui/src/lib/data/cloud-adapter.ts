@@ -1,5 +1,6 @@
-import type { Clip, Game, ExtractionJob, PaginatedResponse } from '../types'
+import type { Clip, ClipChanges, Game, ExtractionJob, PaginatedResponse } from '../types'
 import type { ClipListParams, DataAdapter } from './index'
+import { openClipEventStream, type ClipEventType } from './clip-events'
 import { normalizeClip } from './transformers'
 
 // Use relative URLs when in production (same domain), absolute in dev
@@ -105,6 +106,24 @@ export class CloudAdapter implements DataAdapter {
     }
   }
 
+  async listClipChanges(since?: string | null): Promise<ClipChanges> {
+    const query = since ? `?since=${encodeURIComponent(since)}` : ''
+    const response = await this.fetchAPI(`/api/clips/changes${query}`)
+    if (!response.ok) throw new Error('Failed to fetch clip changes')
+
+    const data = await response.json()
+    return {
+      cursor: data?.cursor ?? null,
+      full: Boolean(data?.full),
+      upserts: Array.isArray(data?.clips) ? data.clips.map(normalizeClip) : [],
+      deleted: Array.isArray(data?.deleted) ? data.deleted : [],
+    }
+  }
+
+  subscribeClipEvents(onEvent: (type: ClipEventType) => void): () => void {
+    return openClipEventStream(`${API_BASE}/api/clips/events`, this.getAuthHeaders(), onEvent)
+  }
+
   async getClip(id: string): Promise<Clip | null> {
     const response = await this.fetchAPI(`/api/clip/${id}`)
     if (!response.ok) return null
@@ -1,4 +1,5 @@
-import type { Clip, ExtractionJob, Game, PaginatedResponse } from '../types'
+import type { Clip, ClipChanges, ExtractionJob, Game, PaginatedResponse } from '../types'
+import type { ClipEventType } from './clip-events'
 
 export type ClipListParams = {
   gameId?: string
@@ -11,6 +12,8 @@ export type DataProvider = {
   health(): Promise<boolean>
   listGames(): Promise<Game[]>
   listClips(params?: ClipListParams): Promise<PaginatedResponse<Clip>>
+  listClipChanges(since?: string | null): Promise<ClipChanges>
+  subscribeClipEvents(onEvent: (type: ClipEventType) => void): () => void
   getClip(id: string): Promise<Clip | null>
   saveClip(clip: Clip): Promise<Clip>
   updateClip(
@@ -50,3 +53,4 @@ export type AdapterFactory = () => DataAdapter
 
 export { LocalAdapter, createLocalAdapter } from './local-adapter'
 export { CloudAdapter, createCloudAdapter } from './cloud-adapter'
+export { watchClipChanges } from './clip-events'
@@ -1,7 +1,8 @@
 import { getConfig } from '../config'
-import type { Clip, Game, ExtractionJob, PaginatedResponse } from '../types'
+import type { Clip, ClipChanges, Game, ExtractionJob, PaginatedResponse } from '../types'
 import type { ClipListParams, DataAdapter } from './index'
 import { normalizeClip, syncClipToCache } from './transformers'
+import { openClipEventStream, type ClipEventType } from './clip-events'
 
 export class LocalAdapter implements DataAdapter {
   readonly mode = 'local' as const
@@ -99,6 +100,25 @@ export class LocalAdapter implements DataAdapter {
     }
   }
 
+  async listClipChanges(since?: string | null): Promise<ClipChanges> {
+    const query = since ? `?since=${encodeURIComponent(since)}` : ''
+    const response = await fetch(this.buildUrl(`/api/clips/changes${query}`))
+    if (!response.ok) {
+      throw new Error(`Clip changes failed with status ${response.status}`)
+    }
+    const data = await response.json()
+    return {
+      cursor: data?.cursor ?? null,
+      full: Boolean(data?.full),
+      upserts: Array.isArray(data?.clips) ? data.clips.map(normalizeClip) : [],
+      deleted: Array.isArray(data?.deleted) ? data.deleted : [],
+    }
+  }
+
+  subscribeClipEvents(onEvent: (type: ClipEventType) => void): () => void {
+    return openClipEventStream(this.buildUrl('/api/clips/events'), {}, onEvent)
+  }
+
   async getClip(id: string): Promise<Clip | null> {
     if (!id) return null
     const response = await fetch(this.buildUrl(`/api/clip/${encodeURIComponent(id)}`))
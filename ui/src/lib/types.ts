@@ -113,6 +113,14 @@ export type PaginatedResponse<T> = {
   pageSize: number
 }
 
+export type ClipChanges = {
+  cursor: string | null
+  // Every clip was returned (no cursor, or one the server no longer recognises)
+  full: boolean
+  upserts: Clip[]
+  deleted: string[]
+}
+
 export type TagFields = {
   gameNum: string
   gameLocation: string